@@ -0,0 +1,85 @@
+# Batch mode for the commander cube generators: load card data once, generate N cubes.
+#
+#   python 2CubeBatch.py --variant 20 --count 8
+#   python 2CubeBatch.py --variant hipster --count 4 --seed 1234 --out cubes/weekend
+#
+# Every cube gets its own seed (derived from --seed, or random), is written as a
+# 2CommanderCubeList-style file, and is recorded in manifest.json together with its
+# chosen commanders. Each distinct commander page is fetched from EDHREC only once
+# for the whole batch.
+import argparse
+import json
+import os
+import random
+import time
+
+from commandercube import VARIANTS, CubeData, build_cube, plan_cube
+from edhrec import EDHRECCache, fetch_pages, make_scheduler
+
+# Paths
+current_directory = os.path.dirname(os.path.abspath(__file__))
+default_output_dir = os.path.join(current_directory, "2CubeBatch")
+
+EDHREC_CONCURRENCY = 8  # parallel EDHREC requests
+
+
+def cube_seeds(count, base_seed=None):
+    """`count` independent 32-bit seeds, reproducible when `base_seed` is given."""
+    seeder = random.Random(base_seed) if base_seed is not None else random.SystemRandom()
+    return [seeder.getrandbits(32) for _ in range(count)]
+
+
+def run_batch(variant, count, base_seed=None, output_dir=default_output_dir, cube_data=None, edhrec_cache=None,
+              edhrec_scheduler=None):
+    """Generate `count` cubes of `variant` into `output_dir` and return the manifest dict."""
+    started = time.time()
+    os.makedirs(output_dir, exist_ok=True)
+    cube_data = cube_data or CubeData()
+    seeds = cube_seeds(count, base_seed)
+
+    # Choose every cube's commanders first, so the batch can share one fetch
+    plans = []
+    for seed in seeds:
+        rng = random.Random(seed)
+        plans.append((seed, rng, plan_cube(cube_data, variant, rng)))
+
+    distinct_commanders = list(dict.fromkeys(c for _, _, chosen in plans for c in chosen))
+    print(f"🔍 Fetching {len(distinct_commanders)} distinct commander pages for {count} cubes...")
+    edhrec_pages = fetch_pages(distinct_commanders, concurrency=EDHREC_CONCURRENCY, cache=edhrec_cache,
+                               scheduler=edhrec_scheduler)
+
+    manifest = {"variant": variant, "base_seed": base_seed, "cubes": []}
+    for i, (seed, rng, chosen_commanders) in enumerate(plans, start=1):
+        cube = build_cube(cube_data, variant, chosen_commanders, edhrec_pages, rng)
+        file_name = f"2CommanderCubeList_{i:03d}.txt"
+        cube.write(os.path.join(output_dir, file_name))
+        manifest["cubes"].append({
+            "file": file_name,
+            "seed": seed,
+            "commanders": chosen_commanders,
+            "cards": len(cube),
+        })
+        print(f"✅ Cube {i}/{count}: {len(cube)} cards → {file_name}")
+
+    elapsed = time.time() - started
+    manifest["elapsed_seconds"] = round(elapsed, 2)
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    print(f"✅ {count} cubes in {elapsed:.1f}s ({count / max(elapsed, 1e-6) * 60:.1f} cubes/min) → {output_dir}")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate many commander cubes from one data load.")
+    parser.add_argument("--variant", choices=sorted(VARIANTS), default="10",
+                        help="10 = 2Cube10Commanders, 20 = 2Cube20Commanders, hipster = 2CubeHipster10Commanders")
+    parser.add_argument("--count", type=int, default=4, help="number of cubes")
+    parser.add_argument("--seed", type=int, default=None, help="base seed for reproducible batches")
+    parser.add_argument("--out", default=default_output_dir, help="output directory")
+    args = parser.parse_args()
+
+    edhrec_cache = EDHRECCache()  # persistent page cache (edhrec_cache.sqlite)
+    edhrec_scheduler = make_scheduler(EDHREC_CONCURRENCY)  # adaptive pacing, retries and per-run request stats
+    run_batch(args.variant, args.count, args.seed, args.out, edhrec_cache=edhrec_cache, edhrec_scheduler=edhrec_scheduler)
+    print(f"📦 EDHREC cache: {edhrec_cache.summary()}")
+    print(f"📡 EDHREC requests: {edhrec_scheduler.summary()}")
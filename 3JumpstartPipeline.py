@@ -0,0 +1,77 @@
+# Whole Jumpstart pipeline in one process: selection -> half-decks -> lands.
+#
+#   python 3JumpstartPipeline.py                 # build from the edited 3CommanderSelection.txt
+#   python 3JumpstartPipeline.py --select        # deal a fresh selection and build every deck from it
+#   python 3JumpstartPipeline.py --select --seed 7
+#   python 3JumpstartPipeline.py --select --seed 7 --workers 8   # same decks, pairs built in parallel
+#
+# The card data is loaded once and deck objects are handed from stage to stage;
+# 3CommanderSelection.txt, the deck records (3CommanderHalfDecks.jsonl, 3JumpstartDecks.jsonl)
+# and the rendered 3CommanderHalfDecks.txt / 3JumpstartDecks.txt are still written, so the standalone 3GenerateJumpstartPacks.py / 3JumpstartBuilder.py /
+# 3JumpstartLandAdder.py scripts can pick up from any stage.
+import argparse
+import random
+import time
+
+from edhrec import EDHRECCache, EDHRECClient, fetch_pages, make_scheduler
+from jumpstart import (DECK_RECORDS_PATH, DECKS_PATH, HALF_DECK_RECORDS_PATH, HALF_DECKS_PATH, SELECTION_PATH,
+                       JumpstartData, build_half_decks, finish_decks, format_final_decks, format_half_decks,
+                       generate_selection, pair_commanders, read_commander_pool, read_selection,
+                       selection_commanders, write_selection, write_text)
+
+EDHREC_CONCURRENCY = 8  # parallel EDHREC requests
+
+
+def run_pipeline(select=False, seed=None, data=None, edhrec_cache=None, workers=1, edhrec_scheduler=None):
+    """Run every Jumpstart stage in-process and return the finished deck dicts."""
+    started = time.time()
+    rng = random.Random(seed)
+    data = data or JumpstartData()
+
+    if select:
+        selection = generate_selection(read_commander_pool(), rng=rng)
+        write_selection(selection)
+        print(f"✅ Commander selections have been written to {SELECTION_PATH}")
+        commanders = selection_commanders(selection)
+    else:
+        commanders = read_selection()
+    if not commanders:
+        print("❌ No commanders found!")
+        return []
+    print(f"✅ Found {len(commanders)} commanders!")
+
+    paired_commanders = pair_commanders(commanders)
+    if workers > 1:
+        # Each worker fetches its own pair's pages, so fetching overlaps building the other pairs
+        with EDHRECClient(EDHREC_CONCURRENCY, cache=edhrec_cache, scheduler=edhrec_scheduler) as client:
+            decks = build_half_decks(data, paired_commanders, client.fetch_page, rng, workers,
+                                     path=HALF_DECK_RECORDS_PATH)
+    else:
+        paired = [commander for pair in paired_commanders for commander in pair]
+        edhrec_pages = fetch_pages(paired, concurrency=EDHREC_CONCURRENCY, cache=edhrec_cache,
+                                   scheduler=edhrec_scheduler)
+        decks = build_half_decks(data, paired_commanders, edhrec_pages, rng, path=HALF_DECK_RECORDS_PATH)
+    write_text(HALF_DECKS_PATH, format_half_decks(decks), HALF_DECK_RECORDS_PATH)
+    print(f"✅ Half-decks saved to {HALF_DECKS_PATH}!")
+
+    decks = finish_decks(data, decks, rng, path=DECK_RECORDS_PATH)
+    write_text(DECKS_PATH, format_final_decks(decks))
+    print(f"✅ {len(decks)} final decks saved to {DECKS_PATH} in {time.time() - started:.1f}s!")
+    return decks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Jumpstart selection, half-deck and land stages in one process.")
+    parser.add_argument("--select", action="store_true",
+                        help="deal a new 3CommanderSelection.txt and build from all of it (no manual edit step)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible selections and decks")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="commander pairs fetched and built at once (the same decks for any value)")
+    args = parser.parse_args()
+
+    edhrec_cache = EDHRECCache()  # persistent page cache (edhrec_cache.sqlite)
+    edhrec_scheduler = make_scheduler(EDHREC_CONCURRENCY)  # adaptive pacing, retries and per-run request stats
+    run_pipeline(args.select, args.seed, edhrec_cache=edhrec_cache, workers=args.workers,
+                 edhrec_scheduler=edhrec_scheduler)
+    print(f"📦 EDHREC cache: {edhrec_cache.summary()}")
+    print(f"📡 EDHREC requests: {edhrec_scheduler.summary()}")
@@ -1,69 +1,72 @@
-import json
-import random
+import os
 
-# Load the JSON data from the AllPrintings.json file
-with open(r'C:\Users\felix\Desktop\MTGJSON\AllPrintings.json', encoding="utf8") as user_file:
-    all_data = json.load(user_file)
+import numpy as np
 
-# Define set codes for specific categories
-commander_sets = {'CMD', 'C13', 'C14', 'C15', 'C16', 'C17', 'C18', 'C19', 'C20', 'C21', 'CMA', 'CM2', 'VOC', 'WHO', 'DMC', 'PIP', 'AFC', 'KHC', 'MOC', 'MIC', 'MKC', 'NEC', 'NCC', 'OTC', 'ONC', 'SCD', 'LTC', 'BRC', 'LCC', '40K', 'WOC', 'ZNC'}
-masters_draft_innovation_sets = {'ACR', 'BBD', 'CMR', 'CLB', 'CNS', 'CN2', 'DBL', 'JMP', 'J22', 'MH1', 'H1R', 'MH2', 'MH3', 'AKR', 'CMM', 'DMR', '2XM', '2X2', 'EMA', 'IMA', 'KLR', 'A25', 'MMA', 'MM2', 'MM3', 'RVR', 'TSR', 'PLST', 'UMA', 'SLX', 'VMA'}
+from cardindex import open_index
+from cardtable import load_table
+from tracing import count, span
+
+# --- config ---
+SEED = None  # set an int for a reproducible cube
+CATEGORY_QUOTAS = (  # (output header, cards), drawn in this order
+    ("Legendary creatures", 48),
+    ("Lands", 32),
+    ("Commander Set Cards", 75),
+    ("Draft or Masters Set Cards", 75),
+    ("Random Cards", 250),
+)
 
-# Extract all cards into a single list and classify them by set
-all_cards = []
-commander_cards = []
-masters_draft_cards = []
-for set_info in all_data['data'].values():
-    for card in set_info['cards']:
-        if 'Basic' not in card.get('supertypes', []):  # Exclude basic lands
-            all_cards.append(card)
-            if set_info['code'] in commander_sets:
-                commander_cards.append(card)
-            elif set_info['code'] in masters_draft_innovation_sets:
-                masters_draft_cards.append(card)
+# Paths
+current_directory = os.path.dirname(os.path.abspath(__file__))
+mtgjson_file_path = os.path.join(current_directory, 'AllPrintings.json')
+output_file_path = os.path.join(current_directory, '4RNGCube.txt')
 
-def filter_cards(cards, condition):
-    return [card for card in cards if condition(card)]
+# Open the card index for the AllPrintings.json file (built on first use)
+card_index = open_index(mtgjson_file_path)
 
-def create_commander_cube():
-    selected_cards = set()  # To keep track of all selected card names to ensure uniqueness
-    def sample_cards(source, count):
-        sample = []
-        while len(sample) < min(count, len(source)):
-            card = random.choice(source)
-            if card['name'] not in selected_cards:  # Check for uniqueness
-                sample.append(card)
-                selected_cards.add(card['name'])
-        return sample
+# Define set codes for specific categories
+commander_sets = {'CMD', 'C13', 'C14', 'C15', 'C16', 'C17', 'C18', 'C19', 'C20', 'C21', 'CMA', 'CM2', 'VOC', 'WHO', 'DMC', 'PIP', 'AFC', 'KHC', 'MOC', 'MIC', 'MKC', 'NEC', 'NCC', 'OTC', 'ONC', 'SCD', 'LTC', 'BRC', 'LCC', '40K', 'WOC', 'ZNC'}
+masters_draft_innovation_sets = {'ACR', 'BBD', 'CMR', 'CLB', 'CNS', 'CN2', 'DBL', 'JMP', 'J22', 'MH1', 'H1R', 'MH2', 'MH3', 'AKR', 'CMM', 'DMR', '2XM', '2X2', 'EMA', 'IMA', 'KLR', 'A25', 'MMA', 'MM2', 'MM3', 'RVR', 'TSR', 'PLST', 'UMA', 'SLX', 'VMA'}
 
-    # Filter and sample legendary creatures from all cards, not just commander sets
-    all_legendary_creatures = filter_cards(all_cards, lambda x: 'Legendary' in x.get('supertypes', []) and 'Creature' in x.get('types', []))
-    selected_legends = sample_cards(all_legendary_creatures, 48)
+# Columnar card table: one row per card name, so reprints are never oversampled
+card_table = load_table(card_index)
+nonbasic = ~card_table.is_basic()  # Exclude basic lands
 
-    # Continue with other specific categories
-    selected_lands = sample_cards([c for c in all_cards if 'Land' in c.get('types', [])], 32)
-    selected_commander_cards = sample_cards(commander_cards, 75)
-    selected_masters_draft_cards = sample_cards(masters_draft_cards, 75)
-    remaining_cards = [c for c in all_cards if c['name'] not in selected_cards]
-    selected_other_cards = sample_cards(remaining_cards, 250)
+# Category masks over the deduplicated card names, in CATEGORY_QUOTAS order
+category_masks = (
+    nonbasic & card_table.is_legendary() & card_table.has_type('Creature'),  # from all cards, not just commander sets
+    nonbasic & card_table.has_type('Land'),
+    nonbasic & card_table.in_sets(commander_sets),
+    # Masters reprints also printed in a commander set stay eligible; `selected` keeps them unique
+    nonbasic & card_table.in_sets(masters_draft_innovation_sets),
+    nonbasic,
+)
 
-    return selected_legends, selected_lands, selected_commander_cards, selected_masters_draft_cards, selected_other_cards
+def create_commander_cube(rng):
+    """Draw each category quota with one without-replacement draw.
+    Cards taken by an earlier category are excluded from the later ones, so every name is unique
+    and the cube takes a bounded amount of time even when a category is nearly exhausted.
+    """
+    selected = np.zeros(len(card_table), dtype=bool)
+    categories = []
+    for (header, quota), mask in zip(CATEGORY_QUOTAS, category_masks):
+        candidates = np.flatnonzero(mask & ~selected)
+        with span("sampling", category=header, quota=quota, candidates=len(candidates)):
+            rows = rng.choice(candidates, size=min(quota, len(candidates)), replace=False)
+        selected[rows] = True
+        categories.append((header, [card_table.names[i] for i in rows]))
+        count(f"cards_added.{header}", len(rows))
+    return categories
 
 # Generate the cube
-legendary_creatures, lands, commander_cards, draft_masters_cards, other_cards = create_commander_cube()
+categories = create_commander_cube(np.random.default_rng(SEED))
 
 # Output to a text file
-output_file_path = r'C:\Users\felix\Desktop\RandomCubeGenerator\RNGCube.txt'
-with open(output_file_path, 'w', encoding='utf-8') as file:
-    file.write("Legendary creatures:\n")
-    file.writelines(f"{legend['name']}\n" for legend in legendary_creatures)
-    file.write("\nLands:\n")
-    file.writelines(f"{land['name']}\n" for land in lands)
-    file.write("\nCommander Set Cards:\n")
-    file.writelines(f"{card['name']}\n" for card in commander_cards)
-    file.write("\nDraft or Masters Set Cards:\n")
-    file.writelines(f"{card['name']}\n" for card in draft_masters_cards)
-    file.write("\nRandom Cards:\n")
-    file.writelines(f"{card['name']}\n" for card in other_cards)
+with span("output_write", path=output_file_path), open(output_file_path, 'w', encoding='utf-8') as file:
+    for i, (header, cards) in enumerate(categories):
+        if i:
+            file.write("\n")
+        file.write(f"{header}:\n")
+        file.writelines(f"{card}\n" for card in cards)
 
-print("Output written to RNGCommanderCube.txt")
+print(f"Output written to {output_file_path}")
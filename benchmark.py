@@ -0,0 +1,314 @@
+"""Benchmark the generators' hot stages on synthetic data.
+
+Synthesizes an AllPrintings-shaped dataset (see synthetic_mtgjson.py) and EDHREC-shaped
+commander pages, then times each stage the generators spend their time in and
+records wall time and peak RSS per stage as JSON:
+
+    python benchmark.py --scale 0.1                       # JSON report on stdout
+    python benchmark.py --scale 0.1 --scale 1 --scale 5 --out bench/head.json
+    python benchmark.py compare bench/base.json bench/head.json
+
+Each scale runs in its own process so peak RSS is not inherited from a bigger run.
+Datasets are generated once per scale/seed under bench_data/ and reused.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from tracing import current_rss, process_peak_rss
+
+current_directory = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_DIR = os.path.join(current_directory, "bench_data")
+
+# Bump when stages are added, renamed or measure something different
+BENCHMARK_VERSION = 3
+
+RSS_SAMPLE_INTERVAL = 0.005  # seconds between RSS samples while a stage runs
+EDHREC_CARDS_PER_LIST = 60   # roughly what a real commander page lists per section
+JUMPSTART_PAIRS = 10
+NAME_LOOKUPS = 3000          # names per spelling variant in the name_lookup stages
+
+
+class RSSSampler:
+    """Background thread tracking the highest RSS seen between start() and stop()."""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.peak = current_rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def stop(self) -> int:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+        return self.peak
+
+
+class StageTimer:
+    """Times named stages; generator output during a stage is discarded."""
+
+    def __init__(self, log=sys.stderr):
+        self.stages = {}
+        self.log = log
+
+    @contextlib.contextmanager
+    def stage(self, name: str, iterations: int = 1):
+        gc.collect()
+        sampler = RSSSampler()
+        rss_start = current_rss()
+        sampler.start()
+        started = time.perf_counter()
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+        wall = time.perf_counter() - started
+        peak = sampler.stop()
+        self.stages[name] = {
+            "wall_s": round(wall, 6),
+            "iterations": iterations,
+            "per_iteration_ms": round(wall * 1000 / max(iterations, 1), 4),
+            "rss_start_mb": round(rss_start / 2**20, 2),
+            "peak_rss_mb": round(peak / 2**20, 2),
+            "peak_rss_delta_mb": round((peak - rss_start) / 2**20, 2),
+        }
+        print(f"  {name:<22} {wall:9.3f}s  peak {peak / 2**20:8.1f} MB", file=self.log)
+
+
+def _remove(*paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def run_scale(scale: float, seed: int = 0, data_dir: str = DEFAULT_DATA_DIR, repeat: int = 3) -> dict:
+    """Benchmark every stage on the `scale` dataset; returns one run record."""
+    from synthetic_mtgjson import prepare_dataset
+
+    out_dir = os.path.join(data_dir, f"scale-{scale}-seed-{seed}")
+    print(f"📦 Dataset scale {scale} (seed {seed}) in {out_dir}", file=sys.stderr)
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        dataset = prepare_dataset(out_dir, scale, seed)
+
+    from cardindex import CARD_FIELDS, build_index, default_index_path, open_index
+    from cardstream import load_sets, offsets_path, set_offsets
+    from cardnames import NameResolver
+    from cardtable import ColorIdentityIndex, default_table_path, load_table
+    from commandercube import (CUBE_SIZE, VARIANTS, Cube, CubeData, build_cube, collect_cards_from_sections,
+                               commander_sets, masters_draft_innovation_sets, plan_cube, synergy_cards)
+    from edhrec_standin import synthesize_page
+    from jumpstart import (JumpstartData, add_lands, build_half_decks, extract_cards, generate_selection,
+                           pair_commanders, read_commander_pool, selection_commanders)
+    from sampling import stratified_sample
+
+    mtgjson_path = os.path.join(out_dir, "AllPrintings.json")
+    index_path = default_index_path(mtgjson_path)
+    timer = StageTimer()
+    rng = random.Random(seed)
+
+    # --- card data ---
+    _remove(index_path, index_path + ".tmp")
+    with timer.stage("index_build"):
+        build_index(mtgjson_path)
+    with open_index(mtgjson_path) as card_index:
+        _remove(default_table_path(card_index))
+        with timer.stage("table_build"):
+            load_table(card_index)
+
+    # Filler sets read straight from the JSON through the per-set byte ranges
+    _remove(offsets_path(mtgjson_path))
+    with timer.stage("set_offsets_build"):
+        set_offsets(mtgjson_path)
+    with timer.stage("filler_sets", repeat):
+        for _ in range(repeat):
+            load_sets(mtgjson_path, commander_sets | masters_draft_innovation_sets, fields=CARD_FIELDS)
+
+    with timer.stage("load", repeat):
+        for _ in range(repeat):
+            with open_index(mtgjson_path) as card_index:
+                load_table(card_index)
+
+    card_index = open_index(mtgjson_path)
+    table = load_table(card_index)
+    with timer.stage("identity_map", repeat):
+        for _ in range(repeat):
+            card_index.color_identity_lookup()
+            identity_index = ColorIdentityIndex(table)
+
+    with timer.stage("name_index"):
+        names = NameResolver(table.names)
+        names.candidates("warm up")  # builds the trigram index
+    sample = rng.sample(table.names, min(NAME_LOOKUPS, len(table.names)))
+    variants = {
+        "name_lookup_exact": sample,
+        "name_lookup_normalised": [name.upper() for name in sample],
+        "name_lookup_fuzzy": [name[:len(name) // 2] + name[len(name) // 2 + 1:] for name in sample],  # one letter dropped
+    }
+    for stage, spellings in variants.items():
+        with timer.stage(stage, repeat * len(spellings)):
+            for _ in range(repeat):
+                names.clear_cache()
+                for spelling in spellings:
+                    names.lookup(spelling)
+
+    with timer.stage("cube_data"):
+        cube_data = CubeData(mtgjson_path, os.path.join(out_dir, "2AllCommanders.txt"),
+                             os.path.join(out_dir, "2CubeBasics.txt")).wait()
+
+    # --- commander selection ---
+    pool = read_commander_pool(os.path.join(out_dir, "3AllJumpstartCommanders.txt"))
+    with timer.stage("commander_selection", repeat * (len(VARIANTS) + 1)):
+        for _ in range(repeat):
+            plans = {variant: plan_cube(cube_data, variant, rng) for variant in VARIANTS}
+            selection = generate_selection(pool, rng=rng)
+
+    # --- EDHREC payloads (setup, not timed) ---
+    jumpstart_commanders = selection_commanders(selection)
+    commanders = list(dict.fromkeys([c for chosen in plans.values() for c in chosen] + jumpstart_commanders))
+    pages = {c: synthesize_page(c, identity_index, EDHREC_CARDS_PER_LIST, random.Random(c)) for c in commanders}
+    page_bytes = sum(len(json.dumps(page)) for page in pages.values())
+
+    with timer.stage("edhrec_extraction", repeat * len(pages)):
+        for _ in range(repeat):
+            for commander, page in pages.items():
+                collect_cards_from_sections(page, (), exclude_tags_substrings=["gamechanger"])
+                extract_cards(page)
+                synergy_cards(cube_data, commander, page, Cube(), 40)
+
+    # --- cube filler and whole cubes ---
+    exclude = set(cube_data.cube_basics)
+    with timer.stage("filler_sampling", repeat):
+        for _ in range(repeat):
+            stratified_sample(cube_data.filler_pool, cube_data.filler_strata, CUBE_SIZE - len(exclude),
+                              cube_data.filler_balanced_weights, exclude=exclude, rng=rng)
+
+    with timer.stage("cube_build", repeat * len(VARIANTS)):
+        for _ in range(repeat):
+            for variant, chosen in plans.items():
+                build_cube(cube_data, variant, chosen, pages, rng)
+
+    # --- Jumpstart ---
+    jumpstart_data = JumpstartData(mtgjson_path, os.path.join(out_dir, "3Landbases.txt"))
+    with timer.stage("jumpstart_data"):
+        jumpstart_data.identity_index, jumpstart_data.lands_by_category
+    pairs = pair_commanders(jumpstart_commanders)[:JUMPSTART_PAIRS]
+    with timer.stage("half_decks", repeat * len(pairs)):
+        for _ in range(repeat):
+            decks = build_half_decks(jumpstart_data, pairs, pages, rng)
+    with timer.stage("land_adding", repeat * len(decks)):
+        for _ in range(repeat):
+            for deck in decks:
+                add_lands(jumpstart_data, deck, rng)
+    card_index.close()
+
+    dataset = dict(dataset, edhrec_pages=len(pages), edhrec_bytes=page_bytes)
+    return {
+        "scale": scale,
+        "seed": seed,
+        "repeat": repeat,
+        "dataset": dataset,
+        "stages": timer.stages,
+        "process_peak_rss_mb": round(process_peak_rss() / 2**20, 2),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=current_directory,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_benchmark(scales, seed: int = 0, data_dir: str = DEFAULT_DATA_DIR, repeat: int = 3) -> dict:
+    """Report for all `scales`, each measured in a fresh interpreter."""
+    runs = []
+    for scale in scales:
+        cmd = [sys.executable, os.path.abspath(__file__), "--scale", str(scale), "--seed", str(seed),
+               "--data-dir", data_dir, "--repeat", str(repeat), "--single"]
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, text=True, check=True)
+        runs.append(json.loads(result.stdout))
+    return {
+        "benchmark_version": BENCHMARK_VERSION,
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs,
+    }
+
+
+def compare(base: dict, head: dict, out=sys.stdout):
+    """Print per-stage wall time and peak RSS of `head` relative to `base`."""
+    base_runs = {run["scale"]: run for run in base["runs"]}
+    print(f"{'scale':>6} {'stage':<22} {'base s':>9} {'head s':>9} {'ratio':>7} {'base MB':>9} {'head MB':>9}", file=out)
+    for run in head["runs"]:
+        base_run = base_runs.get(run["scale"])
+        if base_run is None:
+            continue
+        for name, stage in run["stages"].items():
+            base_stage = base_run["stages"].get(name)
+            if base_stage is None:
+                continue
+            ratio = stage["wall_s"] / base_stage["wall_s"] if base_stage["wall_s"] else float("inf")
+            print(f"{run['scale']:>6} {name:<22} {base_stage['wall_s']:9.3f} {stage['wall_s']:9.3f} {ratio:6.2f}x "
+                  f"{base_stage['peak_rss_mb']:9.1f} {stage['peak_rss_mb']:9.1f}", file=out)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["compare"]:
+        parser = argparse.ArgumentParser(description="Compare two benchmark reports.")
+        parser.add_argument("base")
+        parser.add_argument("head")
+        args = parser.parse_args(argv[1:])
+        with open(args.base, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.head, "r", encoding="utf-8") as f:
+            head = json.load(f)
+        compare(base, head)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=float, action="append", help="dataset size relative to the real AllPrintings (repeatable, default 0.1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="iterations of the cheaper stages")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where synthetic datasets are kept")
+    parser.add_argument("--out", default=None, help="write the JSON report here instead of stdout")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)  # one scale, in this process
+    args = parser.parse_args(argv)
+    scales = args.scale or [0.1]
+
+    if args.single:
+        json.dump(run_scale(scales[0], args.seed, args.data_dir, args.repeat), sys.stdout)
+        return
+    report = run_benchmark(scales, args.seed, args.data_dir, args.repeat)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Benchmark report → {args.out}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
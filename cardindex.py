@@ -0,0 +1,412 @@
+"""Compact on-disk card index built from AllPrintings.json.
+
+Parsing the full MTGJSON file costs tens of seconds and several GB of RAM, but the
+generators only need a handful of fields per card. Build the index once with
+
+    python cardindex.py
+
+and every generator opens it through open_index() in milliseconds. The index records
+the MTGJSON meta version and the size/mtime of the AllPrintings.json it was built
+from, and rebuilds itself automatically when that file changes.
+
+The index also keeps one row per set (release date, size, upstream checksum), so
+mtgjson_refresh.py can patch changed sets in place with patch_index() instead of
+re-downloading the whole of AllPrintings.json.
+
+AllPrintings.json may be replaced by a compressed copy (see cardstream.find_mtgjson).
+
+    python cardindex.py pack [AllPrintings.json] [--format xz|gz|zst|bz2]
+
+writes AllPrintings.packed.json.xz: the sets and cards reduced to the fields the
+generators, the index and the refresh mirror use, then compressed. It is a fraction of
+the size of the full file and builds the same index, so runners only need to check out
+(and read) that.
+"""
+import argparse
+import os
+import json
+import sqlite3
+import sys
+import time
+
+from cardstream import (COMPRESSED_SUFFIXES, find_mtgjson, is_available, iter_sets, open_text, packed_path, plain_path,
+                        read_meta, source_fingerprint)
+from tracing import span
+
+# Paths
+current_directory = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MTGJSON_PATH = os.path.join(current_directory, "AllPrintings.json")
+
+# Bump when the table layout or the projected fields change; old indexes get rebuilt
+SCHEMA_VERSION = 2
+
+# source_fingerprint of an index created by a refresh rather than built from a local file
+REFRESH_SOURCE = "mtgjson_refresh"
+
+# Card fields kept in the index (everything the generators look at)
+CARD_FIELDS = ("name", "colorIdentity", "types", "supertypes", "layout", "legalities", "leadershipSkills", "text")
+
+# Set fields kept in the index (what a refresh compares against the upstream set list)
+SET_FIELDS = ("code", "name", "releaseDate", "totalSetSize")
+
+# Set fields kept in a packed AllPrintings (SET_FIELDS plus what iter_sets callers and the refresh mirror read)
+PACKED_SET_FIELDS = ("baseSetSize", "code", "name", "releaseDate", "totalSetSize", "type")
+
+COLOR_ORDER = "WUBRG"
+
+# Printing rows buffered between inserts while streaming
+BATCH_SIZE = 10000
+
+
+def identity_key(color_identity) -> str:
+    """Canonical WUBRG-ordered string for a colour identity ("" for colourless)."""
+    return "".join(c for c in COLOR_ORDER if c in color_identity)
+
+
+def default_index_path(mtgjson_path: str) -> str:
+    # Compressed and packed copies share the index of the plain file
+    return os.path.splitext(plain_path(mtgjson_path))[0] + ".sqlite"
+
+
+def _create_schema(conn):
+    conn.executescript("""
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE cards (
+            name TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            identity TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE printings (
+            set_code TEXT NOT NULL,
+            name TEXT NOT NULL,
+            layout TEXT,
+            PRIMARY KEY (set_code, name)
+        ) WITHOUT ROWID;
+        CREATE TABLE sets (
+            code TEXT PRIMARY KEY,
+            name TEXT,
+            release_date TEXT,
+            total_set_size INTEGER,
+            checksum TEXT
+        );
+        CREATE INDEX cards_identity ON cards (identity);
+        CREATE INDEX printings_name ON printings (name);
+    """)
+
+
+def _set_row(set_code: str, set_data: dict) -> tuple:
+    return (set_code, set_data.get("name"), set_data.get("releaseDate"), set_data.get("totalSetSize"))
+
+
+def _card_row(card: dict, position: int) -> tuple:
+    return (
+        card["name"],
+        position,
+        identity_key(card.get("colorIdentity", [])),
+        json.dumps(card, separators=(",", ":")),
+    )
+
+
+def build_index(mtgjson_path: str = DEFAULT_MTGJSON_PATH, index_path: str = None) -> str:
+    """Build the index for `mtgjson_path` and return its path.
+
+    The file is streamed (see cardstream), so building needs memory for the projected
+    fields only. The index is written to a temporary file and moved into place, so
+    readers never see a half-built index.
+    """
+    index_path = index_path or default_index_path(mtgjson_path)
+    tmp_path = index_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    print(f"🛠️ Building card index from {mtgjson_path}...")
+    started = time.time()
+    fingerprint = source_fingerprint(mtgjson_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        _create_schema(conn)
+        seen = set()
+        card_count = 0
+        printing_count = 0
+        printing_rows = []
+        # Stream the file one set at a time; only the projected fields are ever held
+        for set_code, set_data in iter_sets(mtgjson_path, fields=CARD_FIELDS, set_fields=SET_FIELDS):
+            conn.execute("INSERT OR REPLACE INTO sets VALUES (?, ?, ?, ?, NULL)", _set_row(set_code, set_data))
+            for card in set_data["cards"]:
+                name = card.get("name")
+                if not name:
+                    continue
+                printing_rows.append((set_code, name, card.get("layout")))
+                # One row per name; the first printing encountered wins
+                if name not in seen:
+                    seen.add(name)
+                    conn.execute("INSERT INTO cards VALUES (?, ?, ?, ?)", _card_row(card, card_count))
+                    card_count += 1
+            if len(printing_rows) >= BATCH_SIZE:
+                conn.executemany("INSERT OR IGNORE INTO printings VALUES (?, ?, ?)", printing_rows)
+                printing_count += len(printing_rows)
+                printing_rows = []
+        conn.executemany("INSERT OR IGNORE INTO printings VALUES (?, ?, ?)", printing_rows)
+        printing_count += len(printing_rows)
+
+        meta = read_meta(mtgjson_path)
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("schema_version", str(SCHEMA_VERSION)),
+            ("meta_version", meta.get("version", "")),
+            ("meta_date", meta.get("date", "")),
+            ("source_fingerprint", fingerprint),
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, index_path)
+    print(f"✅ Indexed {card_count} cards / {printing_count} printings in {time.time() - started:.1f}s → {index_path}")
+    return index_path
+
+
+class CardIndex:
+    """Read-only view over a built card index. Card dicts use MTGJSON field names."""
+
+    def __init__(self, index_path: str):
+        self.path = index_path
+        self.conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+        self.meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def meta_version(self) -> str:
+        return self.meta.get("meta_version", "")
+
+    def card(self, name: str):
+        """Return the card dict for `name`, or None if unknown."""
+        row = self.conn.execute("SELECT data FROM cards WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def color_identity(self, name: str):
+        """Return the colour identity list for `name`, or None if unknown."""
+        card = self.card(name)
+        return card.get("colorIdentity", []) if card else None
+
+    def cards(self, identity: str = None):
+        """Yield one card dict per unique name, in AllPrintings order.
+        `identity`: optional WUBRG-ordered identity string to restrict to (see identity_key).
+        """
+        if identity is None:
+            rows = self.conn.execute("SELECT data FROM cards ORDER BY position")
+        else:
+            rows = self.conn.execute("SELECT data FROM cards WHERE identity = ? ORDER BY position", (identity,))
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def names(self) -> list:
+        """Every card name, in AllPrintings order."""
+        return [name for (name,) in self.conn.execute("SELECT name FROM cards ORDER BY position")]
+
+    def color_identity_lookup(self) -> dict:
+        """Map of card name -> colour identity list (WUBRG order), read without decoding the card data."""
+        return {name: list(identity) for name, identity in self.conn.execute("SELECT name, identity FROM cards")}
+
+    def set_codes(self) -> set:
+        return {code for (code,) in self.conn.execute("SELECT DISTINCT set_code FROM printings")}
+
+    def sets(self) -> dict:
+        """Map of set code -> {"name", "releaseDate", "totalSetSize", "checksum"}."""
+        rows = self.conn.execute("SELECT code, name, release_date, total_set_size, checksum FROM sets")
+        return {
+            code: {"name": name, "releaseDate": release_date, "totalSetSize": total_set_size, "checksum": checksum}
+            for code, name, release_date, total_set_size, checksum in rows
+        }
+
+    def names_in_sets(self, set_codes, exclude_layouts=("token",)) -> set:
+        """Unique card names printed in any of `set_codes`, skipping printings with an excluded layout."""
+        names = set()
+        for code in set_codes:
+            for name, layout in self.conn.execute("SELECT name, layout FROM printings WHERE set_code = ?", (code,)):
+                if layout not in exclude_layouts:
+                    names.add(name)
+        return names
+
+    def printings(self):
+        """Yield (set_code, card dict) for every printing, grouped by set."""
+        rows = self.conn.execute(
+            "SELECT p.set_code, c.data FROM printings p JOIN cards c ON c.name = p.name ORDER BY p.set_code"
+        )
+        for set_code, data in rows:
+            yield set_code, json.loads(data)
+
+
+def patch_index(index_path: str, set_updates=(), removed_sets=(), checksums=None, meta=None) -> set:
+    """Patch a card index in place, one set at a time, and return the card names touched.
+
+    `set_updates` yields (set_code, set_dict) like cardstream.iter_sets, with the cards
+    projected to CARD_FIELDS; each replaces that set's printings. Card data keeps the first
+    printing seen, as in build_index: it is only written for new names and for names that
+    had a printing in a removed or replaced set. `removed_sets` are dropped. `checksums`
+    maps set code -> upstream checksum to record, `meta` updates meta_version/meta_date.
+    Names left without any printing are removed; new names are appended after the
+    existing ones. A missing index is created empty (source REFRESH_SOURCE), so a refresh
+    can also bootstrap one.
+
+    Everything happens in one transaction, so readers see the old or the new index.
+    """
+    conn = sqlite3.connect(index_path)
+    try:
+        if not conn.execute("SELECT name FROM sqlite_master WHERE name = 'meta'").fetchone():
+            _create_schema(conn)
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("schema_version", str(SCHEMA_VERSION)),
+                ("source_fingerprint", REFRESH_SOURCE),
+            ])
+        touched = set()
+        dropped = set()  # names whose stored card data may come from a dropped printing
+        rewritten = set()  # names whose card data this patch has written
+        next_position = conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM cards").fetchone()[0]
+
+        def drop_set(set_code):
+            names = [name for (name,) in conn.execute("SELECT name FROM printings WHERE set_code = ?", (set_code,))]
+            touched.update(names)
+            dropped.update(names)
+            conn.execute("DELETE FROM printings WHERE set_code = ?", (set_code,))
+            conn.execute("DELETE FROM sets WHERE code = ?", (set_code,))
+
+        for set_code in removed_sets:
+            drop_set(set_code)
+
+        for set_code, set_data in set_updates:
+            drop_set(set_code)
+            conn.execute("INSERT INTO sets VALUES (?, ?, ?, ?, NULL)", _set_row(set_code, set_data))
+            for card in set_data["cards"]:
+                name = card.get("name")
+                if not name:
+                    continue
+                conn.execute("INSERT OR IGNORE INTO printings VALUES (?, ?, ?)", (set_code, name, card.get("layout")))
+                touched.add(name)
+                row = conn.execute("SELECT position FROM cards WHERE name = ?", (name,)).fetchone()
+                if row is None:
+                    conn.execute("INSERT INTO cards VALUES (?, ?, ?, ?)", _card_row(card, next_position))
+                    next_position += 1
+                elif name in dropped and name not in rewritten:
+                    conn.execute("INSERT OR REPLACE INTO cards VALUES (?, ?, ?, ?)", _card_row(card, row[0]))
+                else:
+                    continue
+                rewritten.add(name)
+
+        # Cards whose last printing went away
+        conn.execute("DELETE FROM cards WHERE name NOT IN (SELECT name FROM printings)")
+
+        for set_code, checksum in (checksums or {}).items():
+            conn.execute("UPDATE sets SET checksum = ? WHERE code = ?", (checksum, set_code))
+        if touched:
+            # Lets caches keyed on the index (see cardtable.load_table) notice the patch
+            revision = conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('revision', ?)", (str(int(revision[0]) + 1 if revision else 1),))
+        if meta:
+            conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                ("meta_version", meta.get("version", "")),
+                ("meta_date", meta.get("date", "")),
+            ])
+        conn.commit()
+    finally:
+        conn.close()
+    return touched
+
+
+def index_is_current(index_path: str, mtgjson_path: str) -> bool:
+    """True if `index_path` exists, has the current schema and matches `mtgjson_path`.
+    A missing AllPrintings.json (or a Git LFS pointer in its place) counts as current so
+    runners can ship the index alone. So does an index a refresh created (REFRESH_SOURCE)
+    unless the local file is newer than the MTGJSON release it was patched to.
+    """
+    if not os.path.exists(index_path):
+        return False
+    try:
+        conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return False
+    if meta.get("schema_version") != str(SCHEMA_VERSION):
+        return False
+    if not is_available(mtgjson_path):
+        return True
+    if meta.get("source_fingerprint") == REFRESH_SOURCE:
+        return read_meta(mtgjson_path).get("date", "") <= meta.get("meta_date", "")
+    return meta.get("source_fingerprint") == source_fingerprint(mtgjson_path)
+
+
+def open_index(mtgjson_path: str = DEFAULT_MTGJSON_PATH, index_path: str = None) -> CardIndex:
+    """Open the card index for `mtgjson_path`, (re)building it first if it is missing or stale.
+    A compressed or packed copy stands in for a missing `mtgjson_path` (see cardstream.find_mtgjson)."""
+    index_path = index_path or default_index_path(mtgjson_path)
+    mtgjson_path = find_mtgjson(mtgjson_path)
+    with span("data_load", index=index_path) as s:
+        if not index_is_current(index_path, mtgjson_path):
+            if not is_available(mtgjson_path):
+                raise FileNotFoundError(f"No card index at {index_path} and no {mtgjson_path} to build it from")
+            with span("index_build", source=mtgjson_path, bytes=os.path.getsize(mtgjson_path)):
+                build_index(mtgjson_path, index_path)
+            s.set(rebuilt=True)
+        return CardIndex(index_path)
+
+
+def pack(mtgjson_path: str = DEFAULT_MTGJSON_PATH, out_path: str = None, compression: str = ".xz") -> str:
+    """Write a compressed AllPrintings holding only CARD_FIELDS and PACKED_SET_FIELDS; return its path.
+
+    Streams set by set like build_index, so memory stays bounded by one projected set.
+    """
+    mtgjson_path = find_mtgjson(mtgjson_path)
+    out_path = out_path or packed_path(mtgjson_path, compression)
+    tmp_path = out_path + ".tmp" + (os.path.splitext(out_path)[1])
+    print(f"📦 Packing {mtgjson_path}...")
+    started = time.time()
+    set_count = 0
+    with open_text(tmp_path, "w") as f:
+        f.write('{"meta":')
+        json.dump(read_meta(mtgjson_path), f, ensure_ascii=False, separators=(",", ":"))
+        f.write(',"data":{')
+        for set_code, set_data in iter_sets(mtgjson_path, fields=CARD_FIELDS, set_fields=PACKED_SET_FIELDS):
+            if set_count:
+                f.write(",")
+            json.dump(set_code, f)
+            f.write(":")
+            json.dump(set_data, f, ensure_ascii=False, separators=(",", ":"))
+            set_count += 1
+        f.write("}}")
+    os.replace(tmp_path, out_path)
+    size, packed_size = os.path.getsize(mtgjson_path), os.path.getsize(out_path)
+    print(f"✅ Packed {set_count} sets in {time.time() - started:.1f}s: {size / 1e6:.1f} MB → "
+          f"{packed_size / 1e6:.1f} MB ({out_path})")
+    return out_path
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    command = argv.pop(0) if argv[:1] in (["build"], ["pack"]) else "build"
+    parser = argparse.ArgumentParser(description="Build the card index, or pack AllPrintings.json for runners.",
+                                     usage="%(prog)s [build|pack] [mtgjson] [options]")
+    parser.add_argument("mtgjson", nargs="?", default=DEFAULT_MTGJSON_PATH, help="AllPrintings.json or a compressed copy")
+    parser.add_argument("--format", choices=[suffix[1:] for suffix in COMPRESSED_SUFFIXES], default="xz",
+                        help="pack: compression of the packed copy (zst needs the zstandard package)")
+    parser.add_argument("--out", default=None, help="pack: file to write (default: AllPrintings.packed.json.<format>)")
+    args = parser.parse_args(argv)
+    if command == "pack":
+        pack(args.mtgjson, args.out, "." + args.format)
+    else:
+        build_index(find_mtgjson(args.mtgjson), default_index_path(args.mtgjson))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Card name resolution: external spellings -> card index names.
+
+Names from EDHREC cardviews, decklists and hand-edited files such as
+3CommanderSelection.txt differ from MTGJSON in accents, quotes, case, " // " halves of
+split / adventure / modal double-faced cards, and typos. NameResolver is built once
+over every card name and answers in three tiers:
+
+    exact        the name as written                                  confidence 1.0
+    normalised   name_key(): accents, case, quotes, "/" vs " // ",    confidence 1.0
+                 spacing, or the front face of a multi-face card
+    fuzzy        trigram index for candidates, ranked by edit          confidence < 1.0
+                 similarity of the normalised keys
+
+Answers are memoised, so repeated names cost a dict lookup. The trigram index is
+only built on the first fuzzy query. Machine-made names (EDHREC) should be resolved
+with min_confidence=1.0; hand-typed ones can use the fuzzy default:
+
+    names = NameResolver(card_table.names)
+    names.resolve_name("Lim-Dul's Vault")          # "Lim-Dûl's Vault"
+    names.lookup("Sol Rnig")                       # ("Sol Ring", 0.875)
+"""
+import re
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+
+import numpy as np
+
+# Lowest confidence resolve_name / resolve accept by default (typos of a letter or two)
+DEFAULT_MIN_CONFIDENCE = 0.85
+# Trigram candidates per fuzzy query; those within FUZZY_MARGIN of the best trigram
+# score are re-ranked by edit similarity
+FUZZY_CANDIDATES = 8
+FUZZY_MARGIN = 0.15
+
+# Name normalisation: accents, quotes and split-card separators
+NAME_TRANSLATION = str.maketrans({"’": "'", "‘": "'", "“": '"', "”": '"', "–": "-", "—": "-"})
+SPLIT_SEPARATOR = re.compile(r"\s*/{1,2}\s*")
+
+
+def name_key(name: str) -> str:
+    """Lookup key for a card name: no accents, case-folded, "//" between faces, single spaces."""
+    if not name.isascii():
+        name = unicodedata.normalize("NFKD", name.translate(NAME_TRANSLATION))
+        name = "".join(c for c in name if not unicodedata.combining(c))
+    if "/" in name:
+        name = SPLIT_SEPARATOR.sub(" // ", name)
+    return " ".join(name.split()).casefold()
+
+
+def trigrams(key: str) -> set:
+    """Character trigrams of a name key, padded so short names and word starts count."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameResolver:
+    """Resolves external spellings to card index names (see the module docstring)."""
+
+    def __init__(self, names):
+        self.names = set()
+        self.by_key = {}
+        faces = {}
+        for name in names:
+            self.names.add(name)
+            self.by_key.setdefault(name_key(name), name)
+            if " // " in name:
+                faces.setdefault(name_key(name.split(" // ")[0]), name)
+        for key, name in faces.items():
+            self.by_key.setdefault(key, name)
+        self._memo = {}
+        self._keys = None
+        self._key_sizes = None
+        self._postings = None  # published last: once set, the whole trigram index is ready
+        self._index_lock = threading.Lock()
+
+    @classmethod
+    def from_index(cls, card_index):
+        return cls(card_index.names())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def clear_cache(self):
+        """Forget the memoised answers (the trigram index is kept)."""
+        self._memo.clear()
+
+    # --- lookups ---
+
+    def lookup(self, name: str) -> tuple:
+        """(card name, confidence) of the best match for `name`, or (None, 0.0)."""
+        found = self._memo.get(name)
+        if found is None:
+            if name in self.names:
+                found = (name, 1.0)
+            else:
+                key = name_key(name)
+                exact = self.by_key.get(key)
+                found = (exact, 1.0) if exact else next(iter(self._fuzzy(key, 1)), (None, 0.0))
+            self._memo[name] = found
+        return found
+
+    def resolve_name(self, name: str, min_confidence: float = DEFAULT_MIN_CONFIDENCE):
+        """Card name for `name`, or None if nothing matches with `min_confidence`."""
+        match, confidence = self.lookup(name)
+        return match if confidence >= min_confidence else None
+
+    def canonical(self, name: str) -> str:
+        """`name` spelled as in the card index when it is the same card (no fuzzy guesses), else unchanged."""
+        if name in self.names:
+            return name
+        return self.by_key.get(name_key(name), name)
+
+    def resolve(self, raw_names, min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> tuple:
+        """({raw name: card name} for every resolvable name, set of unresolved raw names)."""
+        resolved = {}
+        unresolved = set()
+        for raw in set(raw_names):
+            name = self.resolve_name(raw, min_confidence)
+            if name is None:
+                unresolved.add(raw)
+            else:
+                resolved[raw] = name
+        return resolved, unresolved
+
+    def candidates(self, name: str, limit: int = 5) -> list:
+        """Up to `limit` fuzzy matches for `name` as [(card name, confidence)], best first."""
+        return self._fuzzy(name_key(name), limit)
+
+    # --- trigram index ---
+
+    def _trigram_index(self) -> dict:
+        """The trigram postings, built once on first use; safe to call from several threads."""
+        if self._postings is None:
+            with self._index_lock:
+                if self._postings is None:
+                    self._build_trigram_index()
+        return self._postings
+
+    def _build_trigram_index(self):
+        self._keys = list(self.by_key)
+        postings = {}
+        sizes = np.empty(len(self._keys), dtype=np.int32)
+        for key_id, key in enumerate(self._keys):
+            grams = trigrams(key)
+            sizes[key_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(key_id)
+        self._key_sizes = sizes
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def _fuzzy(self, key: str, limit: int) -> list:
+        if not key:
+            return []
+        postings = self._trigram_index()
+        grams = trigrams(key)
+        lists = [postings[gram] for gram in grams if gram in postings]
+        if not lists:
+            return []
+        # Dice coefficient of the trigram sets picks the candidates...
+        shared = np.bincount(np.concatenate(lists), minlength=len(self._keys))
+        dice = 2 * shared / (len(grams) + self._key_sizes)
+        top = min(max(limit, FUZZY_CANDIDATES), len(dice))
+        candidates = np.argpartition(-dice, top - 1)[:top]
+        candidates = candidates[np.argsort(-dice[candidates], kind="stable")]
+        # ... and edit similarity of the keys ranks the close ones
+        matcher = SequenceMatcher(None, autojunk=False)
+        matcher.set_seq2(key)
+        floor = dice[candidates[0]] - FUZZY_MARGIN
+        scored = {}
+        for rank, key_id in enumerate(candidates):
+            if not shared[key_id] or (rank >= limit and dice[key_id] < floor):
+                break
+            other = self._keys[key_id]
+            matcher.set_seq1(other)
+            confidence = min(round(matcher.ratio(), 3), 0.999)
+            name = self.by_key[other]
+            if confidence > scored.get(name, 0.0):
+                scored[name] = confidence
+        return sorted(scored.items(), key=lambda item: (-item[1], item[0]))[:limit]
@@ -0,0 +1,407 @@
+"""Streaming, constant-memory reader for AllPrintings.json.
+
+json.load materializes the whole ~500 MB MTGJSON document as Python dicts. The
+readers here walk the file incrementally instead and only ever hold one set entry (or
+one card) plus the fields the caller asked for:
+
+    for set_code, card in iter_cards(path, fields=("name", "colorIdentity")):
+        ...
+
+Peak memory is bounded by the size of the projection, not the size of the file.
+
+The file may also be compressed (AllPrintings.json.zst, .xz, .gz or .bz2, as MTGJSON
+publishes it, or a copy packed by "python cardindex.py pack"); it is then decompressed
+as a stream straight into the parser. find_mtgjson() picks whichever copy is on disk.
+
+Reading a few sets need not walk the whole file: a sidecar (AllPrintings.offsets.json,
+built on first use and rebuilt when the file changes) records the byte range of every
+set, and iter_sets(set_codes=...) / load_sets() seek to those ranges and parse only
+them. Compressed files cannot be seeked and are walked as before.
+"""
+import bz2
+import gzip
+import io
+import json
+import lzma
+import mmap
+import os
+from contextlib import nullcontext
+
+from tracing import span
+
+CHUNK_SIZE = 1 << 20  # characters read from the file per refill
+
+# Compressed variants, most preferred first (zstd needs the optional zstandard package)
+COMPRESSED_SUFFIXES = (".zst", ".xz", ".gz", ".bz2")
+LFS_POINTER_PREFIX = b"version https://git-lfs"
+PACKED_INFIX = ".packed"  # AllPrintings.packed.json.xz: projected copy written by cardindex.pack
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Pull parser over a text stream that decodes one JSON value at a time."""
+
+    def __init__(self, file):
+        self.file = file
+        self.buf = ""
+        self.pos = 0
+        self.offset = 0  # characters dropped from the front of buf so far
+        self.eof = False
+
+    def _fill(self, min_size=CHUNK_SIZE) -> bool:
+        """Drop consumed text and read at least `min_size` more characters. False at EOF."""
+        if self.eof:
+            return False
+        chunk = self.file.read(min_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def tell(self) -> int:
+        """Characters consumed from the start of the file."""
+        return self.offset + self.pos
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ("" at EOF)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Malformed MTGJSON: expected {char!r} near offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Decode and return the next complete JSON value."""
+        self.peek()
+        want = CHUNK_SIZE
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Value runs past the buffer; grow geometrically so big values stay linear
+                if not self._fill(want):
+                    raise
+                want *= 2
+                continue
+            # A scalar that ends exactly at the buffer edge may be truncated ("12" of "123")
+            if end == len(self.buf) and self._fill(want):
+                continue
+            self.pos = end
+            return value
+
+    def skip(self):
+        self.value()
+
+    def members(self):
+        """Iterate the keys of the object at the cursor; the caller consumes each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+    def items(self):
+        """Iterate the elements of the array at the cursor; the caller consumes each one."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def compression_of(path: str):
+    """The compressed suffix of `path` (".xz", ...), or None for plain JSON."""
+    suffix = os.path.splitext(path)[1]
+    return suffix if suffix in COMPRESSED_SUFFIXES else None
+
+
+def open_text(path: str, mode: str = "r"):
+    """Open `path` as UTF-8 text ("r" or "w"), compressing or decompressing by suffix."""
+    suffix = compression_of(path)
+    if suffix is None:
+        return open(path, mode, encoding="utf-8")
+    if suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if suffix == ".xz":
+        return lzma.open(path, mode + "t", encoding="utf-8")
+    if suffix == ".bz2":
+        return bz2.open(path, mode + "t", encoding="utf-8")
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(f"Reading {path} needs the zstandard package (pip install zstandard), "
+                          f"or use the .xz/.gz copy instead") from None
+    raw = open(path, mode + "b")
+    if mode == "r":
+        stream = zstandard.ZstdDecompressor().stream_reader(raw)
+    else:
+        stream = zstandard.ZstdCompressor(level=19, threads=-1).stream_writer(raw)
+    return io.TextIOWrapper(stream, encoding="utf-8")
+
+
+def text_stream(raw, compression=None):
+    """UTF-8 text reader over the binary stream `raw` (e.g. an HTTP response body),
+    decompressing by `compression` (a COMPRESSED_SUFFIXES entry or None). The caller closes `raw`."""
+    if compression is None:
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    if compression == ".gz":
+        return gzip.open(raw, "rt", encoding="utf-8")
+    if compression == ".xz":
+        return lzma.open(raw, "rt", encoding="utf-8")
+    if compression == ".bz2":
+        return bz2.open(raw, "rt", encoding="utf-8")
+    import zstandard
+    return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw, closefd=False), encoding="utf-8")
+
+
+def _open_source(mtgjson):
+    """A path is opened (and closed again); an already open text stream is used as is."""
+    return open_text(mtgjson) if isinstance(mtgjson, str) else nullcontext(mtgjson)
+
+
+def plain_path(path: str) -> str:
+    """`path` without its compressed suffix and packed infix (AllPrintings.packed.json.xz -> AllPrintings.json)."""
+    if compression_of(path):
+        path = os.path.splitext(path)[0]
+    base, ext = os.path.splitext(path)
+    if base.endswith(PACKED_INFIX):
+        base = base[:-len(PACKED_INFIX)]
+    return base + ext
+
+
+def packed_path(path: str, suffix: str = ".xz") -> str:
+    base, ext = os.path.splitext(plain_path(path))
+    return base + PACKED_INFIX + ext + suffix
+
+
+def is_available(path: str) -> bool:
+    """True if `path` exists and holds data, not a Git LFS pointer left by a checkout that skipped it."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(LFS_POINTER_PREFIX)) != LFS_POINTER_PREFIX
+    except OSError:
+        return False
+
+
+def find_mtgjson(path: str) -> str:
+    """The copy of `path` to read: `path` itself if available, else its packed copy, else a
+    compressed full copy. Returns `path` unchanged when none is available."""
+    if is_available(path):
+        return path
+    candidates = [packed_path(path, suffix) for suffix in COMPRESSED_SUFFIXES]
+    candidates += [plain_path(path) + suffix for suffix in COMPRESSED_SUFFIXES]
+    for candidate in candidates:
+        if is_available(candidate):
+            return candidate
+    return path
+
+
+def source_fingerprint(mtgjson_path: str) -> str:
+    st = os.stat(mtgjson_path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+# --- per-set byte ranges ---
+
+def offsets_path(mtgjson_path: str) -> str:
+    return os.path.splitext(plain_path(mtgjson_path))[0] + ".offsets.json"
+
+
+def build_set_offsets(mtgjson_path: str) -> dict:
+    """Map of set code -> (start, end) byte range of the set's object in `mtgjson_path`."""
+    offsets = {}
+    # Latin-1 maps every byte to one character, so character positions are byte offsets;
+    # the JSON structure is ASCII and multi-byte UTF-8 inside strings is carried through
+    with open(mtgjson_path, "r", encoding="latin-1", newline="") as f:
+        reader = _Reader(f)
+        for key in reader.members():
+            if key != "data":
+                reader.skip()
+                continue
+            for set_code in reader.members():
+                reader.peek()
+                start = reader.tell()
+                reader.skip()
+                offsets[set_code] = (start, reader.tell())
+    return offsets
+
+
+def set_offsets(mtgjson_path: str, sidecar_path: str = None):
+    """Byte ranges of every set in `mtgjson_path` (see build_set_offsets), read from the
+    sidecar or (re)built and saved there when it is missing or stale. None for compressed files."""
+    if compression_of(mtgjson_path):
+        return None
+    sidecar_path = sidecar_path or offsets_path(mtgjson_path)
+    fingerprint = source_fingerprint(mtgjson_path)
+    try:
+        with open(sidecar_path, "r", encoding="utf-8") as f:
+            sidecar = json.load(f)
+        if sidecar.get("fingerprint") == fingerprint:
+            return {code: tuple(byte_range) for code, byte_range in sidecar["sets"].items()}
+    except (OSError, ValueError, KeyError):
+        pass
+    with span("set_offsets_build", source=mtgjson_path) as s:
+        offsets = build_set_offsets(mtgjson_path)
+        s.set(sets=len(offsets))
+    tmp_path = sidecar_path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "sets": offsets}, f, separators=(",", ":"))
+        os.replace(tmp_path, sidecar_path)
+    except OSError:
+        pass  # read-only checkout: use the offsets without keeping them
+    return offsets
+
+
+def load_sets(mtgjson_path: str, set_codes, fields=None, set_fields=("code", "name", "type", "releaseDate"),
+              use_mmap: bool = False) -> dict:
+    """Map of set code -> set_dict (as iter_sets yields it) for the `set_codes` present in the file.
+
+    Only those sets' byte ranges are read and parsed, through a memory map if `use_mmap`;
+    compressed files fall back to a walk that skips the other sets.
+    """
+    offsets = set_offsets(mtgjson_path)
+    if offsets is None:
+        return dict(iter_sets(mtgjson_path, fields, set_fields, set_codes))
+    return dict(_read_slices(mtgjson_path, offsets, set_codes, fields, set_fields, use_mmap))
+
+
+def _read_slices(mtgjson_path, offsets, set_codes, fields, set_fields, use_mmap=False):
+    """Yield (set_code, set_dict) for the wanted sets, parsing only their byte ranges, in file order."""
+    wanted = sorted((offsets[code], code) for code in set(set_codes) if code in offsets)
+    if not wanted:
+        return
+    with open(mtgjson_path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if use_mmap else None
+        try:
+            for (start, end), set_code in wanted:
+                if mapped is not None:
+                    raw = mapped[start:end]
+                else:
+                    f.seek(start)
+                    raw = f.read(end - start)
+                full = json.loads(raw)
+                set_data = {key: full[key] for key in set_fields if key in full}
+                set_data["cards"] = [project(card, fields) for card in full.get("cards", ())]
+                yield set_code, set_data
+        finally:
+            if mapped is not None:
+                mapped.close()
+
+
+def project(card: dict, fields) -> dict:
+    """Keep only `fields` of `card` (all of them if `fields` is None)."""
+    if fields is None:
+        return card
+    return {field: card[field] for field in fields if field in card}
+
+
+def read_meta(mtgjson_path: str) -> dict:
+    """Return the top-level "meta" object without reading the card data."""
+    with _open_source(mtgjson_path) as f:
+        reader = _Reader(f)
+        for key in reader.members():
+            if key == "meta":
+                return reader.value()
+            reader.skip()
+    return {}
+
+
+def iter_sets(mtgjson_path: str, fields=None, set_fields=("code", "name", "type", "releaseDate"), set_codes=None):
+    """Yield (set_code, set_dict) one set at a time.
+
+    set_dict holds `set_fields` of the set plus "cards", a list of card dicts projected
+    to `fields` (None keeps every field). `set_codes` restricts the walk to those sets;
+    other sets are skipped without being kept in memory, and in a plain file without
+    being parsed at all (see set_offsets).
+
+    `mtgjson_path` may also be an open text stream (see text_stream), read from its
+    current position; the same holds for iter_cards and read_meta.
+    """
+    if set_codes is not None and isinstance(mtgjson_path, str):
+        offsets = set_offsets(mtgjson_path)
+        if offsets is not None:
+            yield from _read_slices(mtgjson_path, offsets, set_codes, fields, set_fields)
+            return
+    # Set keys may follow "cards" in the file, so a set is only complete once the walk
+    # has moved on to the next one
+    pending = None
+    for set_code, set_data, cards in _walk(mtgjson_path, fields, set_fields, set_codes):
+        if pending:
+            yield pending
+        set_data["cards"] = list(cards)
+        pending = (set_code, set_data)
+    if pending:
+        yield pending
+
+
+def iter_cards(mtgjson_path: str, fields=None, set_codes=None):
+    """Yield (set_code, card) for every printing, one card at a time, in file order."""
+    if set_codes is not None:
+        for set_code, set_data in iter_sets(mtgjson_path, fields, (), set_codes):
+            for card in set_data["cards"]:
+                yield set_code, card
+        return
+    for set_code, _, cards in _walk(mtgjson_path, fields, (), set_codes):
+        for card in cards:
+            yield set_code, card
+
+
+def _walk(mtgjson_path, fields, set_fields, set_codes):
+    """Yield (set_code, partial set dict, card iterator) for each wanted set.
+
+    The card iterator must be exhausted before the next set is requested.
+    """
+    set_codes = set(set_codes) if set_codes is not None else None
+    with _open_source(mtgjson_path) as f:
+        reader = _Reader(f)
+        for key in reader.members():
+            if key != "data":
+                reader.skip()
+                continue
+            for set_code in reader.members():
+                if set_codes is not None and set_code not in set_codes:
+                    reader.skip()
+                    continue
+                set_data = {}
+                for set_key in reader.members():
+                    if set_key == "cards":
+                        cards = _iter_array(reader, fields)
+                        yield set_code, set_data, cards
+                        for _ in cards:  # drain anything the consumer left behind
+                            pass
+                    elif set_key in set_fields:
+                        set_data[set_key] = reader.value()
+                    else:
+                        reader.skip()
+
+
+def _iter_array(reader, fields):
+    for _ in reader.items():
+        yield project(reader.value(), fields)
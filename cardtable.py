@@ -0,0 +1,297 @@
+"""Columnar NumPy view of the card index with bitmask filtering.
+
+One row per unique card name. Colour identity, types and supertypes are bitmasks,
+layout and commander legality are small ints, and set membership is a sparse
+(CSR-style) index from set code to rows. Filters become a single vectorized mask
+expression instead of a Python loop over every printing:
+
+    t = load_table(card_index)
+    mask = (t.is_legendary() & t.has_type("Creature") & t.identity_within("WUB")
+            & t.in_sets(commander_sets) & ~t.layout_is("token"))
+    names = t.select(mask)
+
+The table is cached next to the card index and rebuilt whenever the index is
+rebuilt or patched.
+"""
+import os
+import random
+
+import numpy as np
+
+from cardindex import COLOR_ORDER
+from tracing import span
+
+# Bump when the columns or bit assignments change; old caches get rebuilt
+TABLE_VERSION = 1
+
+COLOR_BITS = {c: 1 << i for i, c in enumerate(COLOR_ORDER)}
+TYPE_BITS = {t: 1 << i for i, t in enumerate((
+    "Artifact", "Battle", "Conspiracy", "Creature", "Dungeon", "Enchantment", "Instant", "Kindred",
+    "Land", "Phenomenon", "Plane", "Planeswalker", "Scheme", "Sorcery", "Tribal", "Vanguard",
+))}
+SUPERTYPE_BITS = {t: 1 << i for i, t in enumerate(("Basic", "Elite", "Host", "Legendary", "Ongoing", "Snow", "World"))}
+LEGALITY_CODES = {"Legal": 1, "Restricted": 2, "Banned": 3}  # 0 = not legal / not listed
+
+
+def bitmask(values, bits) -> int:
+    """OR together the bits of `values` (unknown values are ignored)."""
+    mask = 0
+    for value in values:
+        mask |= bits.get(value, 0)
+    return mask
+
+
+def identity_mask(colors) -> int:
+    """5-bit WUBRG mask for an iterable of colour letters (or a string like "WUB")."""
+    return bitmask(colors, COLOR_BITS)
+
+
+def identity_from_mask(mask: int) -> str:
+    """Inverse of identity_mask: WUBRG-ordered identity string."""
+    return "".join(c for c in COLOR_ORDER if mask & COLOR_BITS[c])
+
+
+class CardTable:
+    """Column arrays over the unique card names of a card index."""
+
+    def __init__(self, names, identity, types, supertypes, layout, commander, layouts, set_codes, set_offsets, set_rows):
+        self.names = names              # list of card names, row order = index position
+        self.identity = identity        # uint8 WUBRG mask
+        self.types = types              # uint16 TYPE_BITS mask
+        self.supertypes = supertypes    # uint8 SUPERTYPE_BITS mask
+        self.layout = layout            # uint8 code into self.layouts
+        self.commander = commander      # uint8 LEGALITY_CODES value for the commander format
+        self.layouts = layouts          # list of layout names
+        self.set_codes = set_codes      # list of set codes, CSR row order
+        self.set_offsets = set_offsets  # int64, rows of set i are set_rows[set_offsets[i]:set_offsets[i + 1]]
+        self.set_rows = set_rows        # int32 card rows
+        self._row_by_name = None
+        self._set_position = {code: i for i, code in enumerate(set_codes)}
+
+    def __len__(self):
+        return len(self.names)
+
+    # --- masks ---
+
+    def identity_is(self, colors):
+        return self.identity == identity_mask(colors)
+
+    def identity_within(self, colors):
+        """Cards whose identity is a subset of `colors` (colourless included)."""
+        return (self.identity & ~np.uint8(identity_mask(colors))) == 0
+
+    def has_type(self, *types):
+        """Cards that have every one of `types`."""
+        mask = bitmask(types, TYPE_BITS)
+        return (self.types & mask) == mask
+
+    def has_any_type(self, *types):
+        return (self.types & bitmask(types, TYPE_BITS)) != 0
+
+    def has_supertype(self, *supertypes):
+        mask = bitmask(supertypes, SUPERTYPE_BITS)
+        return (self.supertypes & mask) == mask
+
+    def is_legendary(self):
+        return self.has_supertype("Legendary")
+
+    def is_basic(self):
+        return self.has_supertype("Basic")
+
+    def layout_is(self, *layouts):
+        codes = [self.layouts.index(layout) for layout in layouts if layout in self.layouts]
+        return np.isin(self.layout, codes)
+
+    def commander_legal(self):
+        return self.commander == LEGALITY_CODES["Legal"]
+
+    def in_sets(self, set_codes):
+        """Cards printed in any of `set_codes`."""
+        mask = np.zeros(len(self), dtype=bool)
+        for code in set_codes:
+            i = self._set_position.get(code)
+            if i is not None:
+                mask[self.set_rows[self.set_offsets[i]:self.set_offsets[i + 1]]] = True
+        return mask
+
+    # --- selection ---
+
+    def rows(self, mask):
+        return np.flatnonzero(mask)
+
+    def select(self, mask) -> list:
+        """Card names for the rows in `mask`, in index order."""
+        return [self.names[i] for i in np.flatnonzero(mask)]
+
+    def row(self, name: str):
+        """Row of `name`, or None if unknown."""
+        if self._row_by_name is None:
+            self._row_by_name = {name: i for i, name in enumerate(self.names)}
+        return self._row_by_name.get(name)
+
+    # --- persistence ---
+
+    def save(self, path: str, fingerprint: str):
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            version=np.array([TABLE_VERSION]),
+            fingerprint=np.array([fingerprint]),
+            names=np.array(["\n".join(self.names)]),
+            layouts=np.array(["\n".join(self.layouts)]),
+            set_codes=np.array(["\n".join(self.set_codes)]),
+            identity=self.identity, types=self.types, supertypes=self.supertypes,
+            layout=self.layout, commander=self.commander,
+            set_offsets=self.set_offsets, set_rows=self.set_rows,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str):
+        """Load a cached table, or return None if it is missing or stale."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if int(data["version"][0]) != TABLE_VERSION or str(data["fingerprint"][0]) != fingerprint:
+                    return None
+                return cls(
+                    names=str(data["names"][0]).split("\n"),
+                    identity=data["identity"], types=data["types"], supertypes=data["supertypes"],
+                    layout=data["layout"], commander=data["commander"],
+                    layouts=str(data["layouts"][0]).split("\n"),
+                    set_codes=str(data["set_codes"][0]).split("\n"),
+                    set_offsets=data["set_offsets"], set_rows=data["set_rows"],
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def build_table(card_index) -> CardTable:
+    """Build a CardTable from an open CardIndex."""
+    names = []
+    identity, types, supertypes, layout, commander = [], [], [], [], []
+    layouts = []
+    layout_codes = {}
+    for card in card_index.cards():
+        names.append(card["name"])
+        identity.append(identity_mask(card.get("colorIdentity", [])))
+        types.append(bitmask(card.get("types", []), TYPE_BITS))
+        supertypes.append(bitmask(card.get("supertypes", []), SUPERTYPE_BITS))
+        card_layout = card.get("layout", "")
+        if card_layout not in layout_codes:
+            layout_codes[card_layout] = len(layouts)
+            layouts.append(card_layout)
+        layout.append(layout_codes[card_layout])
+        commander.append(LEGALITY_CODES.get(card.get("legalities", {}).get("commander"), 0))
+
+    row_by_name = {name: i for i, name in enumerate(names)}
+    set_codes, set_offsets, set_rows = [], [0], []
+    rows = card_index.conn.execute("SELECT set_code, name FROM printings ORDER BY set_code, name")
+    for set_code, name in rows:
+        if not set_codes or set_codes[-1] != set_code:
+            if set_codes:
+                set_offsets.append(len(set_rows))
+            set_codes.append(set_code)
+        set_rows.append(row_by_name[name])
+    set_offsets.append(len(set_rows))
+    if not set_codes:
+        set_offsets = [0]
+
+    return CardTable(
+        names=names,
+        identity=np.array(identity, dtype=np.uint8),
+        types=np.array(types, dtype=np.uint16),
+        supertypes=np.array(supertypes, dtype=np.uint8),
+        layout=np.array(layout, dtype=np.uint8),
+        commander=np.array(commander, dtype=np.uint8),
+        layouts=layouts,
+        set_codes=set_codes,
+        set_offsets=np.array(set_offsets, dtype=np.int64),
+        set_rows=np.array(set_rows, dtype=np.int32),
+    )
+
+
+def default_table_path(card_index) -> str:
+    return os.path.splitext(card_index.path)[0] + ".table.npz"
+
+
+def load_table(card_index, table_path: str = None) -> CardTable:
+    """Load the cached table for `card_index`, building (and caching) it if needed."""
+    table_path = table_path or default_table_path(card_index)
+    meta = card_index.meta
+    fingerprint = f"{meta.get('source_fingerprint', '')}:{meta.get('schema_version', '')}:{meta.get('revision', '0')}"
+    with span("table_load", path=table_path) as s:
+        table = CardTable.load(table_path, fingerprint)
+        if table is None:
+            table = build_table(card_index)
+            table.save(table_path, fingerprint)
+            s.set(rebuilt=True)
+        s.set(rows=len(table))
+    return table
+
+
+# Card kinds bucketed by ColorIdentityIndex
+CARD_KINDS = ("land", "nonland", "nonbasic_land")
+REJECTION_SLACK = 8  # ColorIdentityIndex.sample draws beyond 2 * count before it filters the bucket
+
+
+class ColorIdentityIndex:
+    """Inverted index: exact colour identity x card kind -> deduplicated name list.
+
+    All 32 identities are precomputed, so lookups and random top-ups are O(1) instead
+    of a scan over every printing. Also keeps a name -> identity hash map.
+    """
+
+    def __init__(self, table: CardTable):
+        self.identity_by_name = {name: int(mask) for name, mask in zip(table.names, table.identity)}
+        is_land = table.has_type("Land")
+        kind_masks = {
+            "land": is_land,
+            "nonland": ~is_land,
+            "nonbasic_land": is_land & ~table.is_basic(),
+        }
+        self.buckets = {}
+        for kind, mask in kind_masks.items():
+            rows = np.flatnonzero(mask)
+            identities = table.identity[rows]
+            order = np.argsort(identities, kind="stable")
+            bounds = np.searchsorted(identities[order], np.arange(33))
+            for identity in range(32):
+                bucket_rows = rows[order[bounds[identity]:bounds[identity + 1]]]
+                self.buckets[(identity, kind)] = [table.names[i] for i in bucket_rows]
+
+    def identity(self, name: str):
+        """Colour identity of `name` as a set of colour letters, or None if unknown."""
+        mask = self.identity_by_name.get(name)
+        return set(identity_from_mask(mask)) if mask is not None else None
+
+    def names(self, colors, kind: str) -> list:
+        """All card names of `kind` whose identity is exactly `colors`."""
+        return self.buckets[(identity_mask(colors), kind)]
+
+    def sample(self, colors, kind: str, count: int, exclude=(), rng=random):
+        """Up to `count` random names of `kind` with identity exactly `colors`, skipping `exclude`.
+
+        Draws by rejection, so a small top-up from a large bucket does not copy the bucket.
+        Filters instead when `exclude` may cover most of it or too many draws are rejected.
+        """
+        bucket = self.names(colors, kind)
+        if not exclude:
+            return rng.sample(bucket, min(count, len(bucket)))
+        if not isinstance(exclude, (set, frozenset, dict)):
+            exclude = set(exclude)
+        picks, tried = [], set()
+        if 2 * count < len(bucket) and len(exclude) < len(bucket) // 2:
+            for _ in range(2 * count + REJECTION_SLACK):
+                i = rng.randrange(len(bucket))
+                if i in tried:
+                    continue
+                tried.add(i)
+                if bucket[i] not in exclude:
+                    picks.append(bucket[i])
+                    if len(picks) == count:
+                        return picks
+        # Draw the rest from what is left; each name is still equally likely
+        rest = [name for i, name in enumerate(bucket) if i not in tried and name not in exclude]
+        return picks + rng.sample(rest, min(count - len(picks), len(rest)))
@@ -0,0 +1,357 @@
+"""Shared building blocks of the 2Cube* commander cube generators.
+
+CubeData loads everything a cube needs (card index, card table, commander list,
+CubeBasics, filler pool) once, so one process can build any number of cubes from
+a single load. The card data loads in the background while the commanders are
+chosen and their EDHREC pages fetched, so startup costs max(load, fetch) rather
+than load + fetch. The VARIANTS table describes the three generators:
+
+    "10"      2Cube10Commanders.py        10 multicolour commanders, 40 EDHREC cards each
+    "20"      2Cube20Commanders.py        20 commanders, 20 EDHREC cards each
+    "hipster" 2CubeHipster10Commanders.py 10 multicolour commanders, 47 cards from every
+                                          non-gamechanger section, second pass to 480
+
+Every random choice goes through the `rng` passed in, so a cube is reproducible
+from its seed.
+"""
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from cardindex import open_index
+from cardnames import NameResolver
+from cardtable import load_table
+from sampling import card_strata, color_balanced_weights, stratified_sample
+from tracing import count, span
+
+current_directory = os.path.dirname(os.path.abspath(__file__))
+CUBE_BASICS_PATH = os.path.join(current_directory, "2CubeBasics.txt")
+ALL_COMMANDERS_PATH = os.path.join(current_directory, "2AllCommanders.txt")
+MTGJSON_PATH = os.path.join(current_directory, "AllPrintings.json")
+
+commander_sets = {"C16", "C17", "C18", "C19", "C20", "C21", "C22", "C23", "CMA", "CMR", "CLB", "ONC", "VOC", "PIP"}
+masters_draft_innovation_sets = {"2XM", "A25", "EMA", "IMA", "MM3", "MM2", "MMA", "UMA", "40K", "JMP", "BBD", "CMM"}
+
+CUBE_SIZE = 500
+FILLER_BALANCE_COLORS = True  # give each colour an equal share of the filler
+SYNERGY_TAGS = {"topcards", "highsynergycards"}
+SUPPORT_TAGS = {"creatures", "instants", "sorceries", "enchantments", "utilityartifacts", "utilitylands"}
+
+
+def read_commanders(path: str = ALL_COMMANDERS_PATH) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        all_lines = f.readlines()
+    return [line.strip() for line in all_lines if line.strip() and not line.endswith(":")]
+
+
+def read_cube_basics(path: str = CUBE_BASICS_PATH) -> list:
+    basics = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            card = line.strip()
+            if card:
+                basics.append(card[2:] if card.startswith("1 ") else card)
+    return basics
+
+
+class CubeData:
+    """Card data shared by every cube built in this process.
+
+    The commander list is read right away, CubeBasics on first use (the hipster
+    variant never adds it, so it need not exist there); the card index and
+    everything built from it load on a background thread. Reading one of those
+    attributes waits for it. The identity map comes first, so the colour filter of
+    choose_commanders only waits for the index, not for the table and filler pool.
+    """
+
+    def __init__(self, mtgjson_path: str = MTGJSON_PATH, all_commanders_path: str = ALL_COMMANDERS_PATH,
+                 cube_basics_path: str = CUBE_BASICS_PATH):
+        self.all_commanders = read_commanders(all_commanders_path)
+        self._cube_basics_path = cube_basics_path
+        self._cube_basics = None
+        # One worker runs both steps in order (the index connection stays on its thread)
+        loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cube_data_load")
+        self._identities_loaded = loader.submit(self._load_identities, mtgjson_path)
+        self._cards_loaded = loader.submit(self._load_cards)
+        loader.shutdown(wait=False)
+
+    def _load_identities(self, mtgjson_path: str):
+        with span("cube_data_load", step="identities"):
+            self._card_index = open_index(mtgjson_path)
+            # Map of card name -> color identity
+            with span("identity_map"):
+                self._color_identity_lookup = self._card_index.color_identity_lookup()
+
+    def _load_cards(self):
+        self._identities_loaded.result()
+        with span("cube_data_load", step="cards"):
+            self._card_table = load_table(self._card_index)
+            # Reconciles EDHREC spellings ("Bonecrusher Giant", accents, ...) with the card data
+            self._names = NameResolver(self._card_table.names)
+            # Filler pool from sets, with its strata precomputed for every fill
+            with span("filler_pool") as s:
+                filler_mask = self._card_table.in_sets(commander_sets | masters_draft_innovation_sets) & ~self._card_table.layout_is("token")
+                self._filler_pool = self._card_table.select(filler_mask)
+                self._filler_strata = card_strata(self._card_table, self._filler_pool)
+                self._filler_balanced_weights = color_balanced_weights(self._filler_strata)
+                s.set(cards=len(self._filler_pool))
+
+    def wait(self):
+        """Block until all card data is loaded (re-raising a failed load)."""
+        self._cards_loaded.result()
+        return self
+
+    @property
+    def cube_basics(self) -> list:
+        if self._cube_basics is None:
+            self._cube_basics = read_cube_basics(self._cube_basics_path)
+        return self._cube_basics
+
+    @property
+    def color_identity_lookup(self) -> dict:
+        self._identities_loaded.result()
+        return self._color_identity_lookup
+
+    @property
+    def card_table(self):
+        return self.wait()._card_table
+
+    @property
+    def names(self) -> NameResolver:
+        return self.wait()._names
+
+    @property
+    def filler_pool(self):
+        return self.wait()._filler_pool
+
+    @property
+    def filler_strata(self):
+        return self.wait()._filler_strata
+
+    @property
+    def filler_balanced_weights(self):
+        return self.wait()._filler_balanced_weights
+
+
+class Cube:
+    """Ordered, duplicate-free card list."""
+
+    def __init__(self):
+        self.unique_cards = set()
+        self.cube_list = []
+
+    def __len__(self):
+        return len(self.cube_list)
+
+    def add_card(self, card_name: str, source: str = None) -> bool:
+        """Add `card_name` unless it is already in the cube; `source` labels it in trace counts."""
+        if card_name and card_name not in self.unique_cards:
+            self.unique_cards.add(card_name)
+            self.cube_list.append(card_name)
+            if source:
+                count(f"cards_added.{source}")
+            return True
+        return False
+
+    def write(self, path: str):
+        with span("output_write", path=path, cards=len(self.cube_list)):
+            with open(path, "w", encoding="utf-8") as f:
+                for card in self.cube_list:
+                    f.write(f"{card}\n")
+
+
+def choose_commanders(data: CubeData, rng, count: int, min_colors: int = 0) -> list:
+    """Shuffle the commander list and take the first `count` with at least `min_colors` colours."""
+    all_commanders = list(data.all_commanders)
+    rng.shuffle(all_commanders)
+    if min_colors:
+        # Lazily, so only the commanders looked at before `count` are found need an identity
+        all_commanders = (cmd for cmd in all_commanders if len(commander_identity(data, cmd)) >= min_colors)
+    return list(islice(all_commanders, count))
+
+
+def commander_identity(data: CubeData, commander: str) -> list:
+    """Colour identity of `commander` ([] if unknown); only a name missing from the index waits for the name resolver."""
+    identity = data.color_identity_lookup.get(commander)
+    if identity is None:
+        identity = data.color_identity_lookup.get(data.names.canonical(commander), [])
+    return identity
+
+
+# --- EDHREC extraction ---
+
+def synergy_cards(data: CubeData, commander: str, page: dict, cube: Cube, limit: int) -> list:
+    """Top/high-synergy cards of a commander page, topped up from support categories, up to `limit`."""
+    print(f"🔍 EDHREC: {commander}")
+    if not page:
+        return []
+    with span("extraction", commander=commander) as s:
+        cards = _synergy_cards(data, commander, page, cube, limit)
+        s.set(cards=len(cards))
+    return cards
+
+
+def _synergy_cards(data: CubeData, commander: str, page: dict, cube: Cube, limit: int) -> list:
+    try:
+        # Color identity from MTGJSON fallback
+        identity = commander_identity(data, commander)
+        color_identity = "".join(sorted(identity)) if identity else "Colorless"
+
+        # Tags: from panels > taglinks
+        taglinks = page.get("panels", {}).get("taglinks", [])
+        top_tag = taglinks[0]["value"] if taglinks else "Unknown"
+
+        print(f"🎨 Identity: {color_identity} | 🏷️ Top Tag: {top_tag}")
+
+        # Extract cards
+        json_dict = page.get("container", {}).get("json_dict", {})
+        all_cards = []
+        seen = set()
+
+        def add_unique(cards):
+            for card in cards:
+                name = data.names.canonical(card["name"])
+                if name not in cube.unique_cards and name not in seen:
+                    all_cards.append(name)
+                    seen.add(name)
+
+        for section in json_dict.get("cardlists", []):
+            tag = section.get("tag", "").lower()
+            if tag in SYNERGY_TAGS:
+                add_unique(section.get("cardviews", []))
+
+        # If fewer than `limit` synergy cards, pull from support categories
+        if len(all_cards) < limit:
+            print(f"✅ Fetching extra cards for this commander")
+            for section in json_dict.get("cardlists", []):
+                tag = section.get("tag", "").lower()
+                if tag in SUPPORT_TAGS:
+                    add_unique(section.get("cardviews", []))
+                if len(all_cards) >= limit:
+                    break
+
+        return all_cards[:limit]
+
+    except Exception as e:
+        print(f"❌ Error for {commander}: {e}")
+        return []
+
+
+def collect_cards_from_sections(data: dict, unique_cards=(), *, exclude_tags_substrings=None, names=None) -> list:
+    """Collect unique card names from all cardlists, optionally excluding tags containing any substring.
+    `exclude_tags_substrings`: iterable of lowercase substrings; if any is in section.tag.lower(), skip it.
+    `names`: optional NameResolver to spell the cards as in the card data.
+    """
+    if exclude_tags_substrings is None:
+        exclude_tags_substrings = []
+
+    json_dict = (data or {}).get("container", {}).get("json_dict", {})
+    out = []
+    seen_local = set()
+
+    for section in json_dict.get("cardlists", []):
+        tag = section.get("tag", "")
+        tag_l = tag.lower()
+        if any(sub in tag_l for sub in exclude_tags_substrings):
+            continue
+        for cv in section.get("cardviews", []):
+            name = cv.get("name")
+            if name and names is not None:
+                name = names.canonical(name)
+            if name and name not in seen_local and name not in unique_cards:
+                out.append(name)
+                seen_local.add(name)
+
+    return out
+
+
+# --- cube builders ---
+
+def build_synergy_cube(data: CubeData, chosen_commanders, pages: dict, rng, per_commander: int,
+                       balance_colors: bool = FILLER_BALANCE_COLORS) -> Cube:
+    """CubeBasics + commanders + up to `per_commander` EDHREC cards each, filled to CUBE_SIZE from the filler pool."""
+    cube = Cube()
+    for card_name in data.cube_basics:
+        cube.add_card(card_name, "basics")
+
+    # Add commanders to cube
+    for commander in chosen_commanders:
+        cube.add_card(commander, "commander")
+
+    # Add synergy/support cards
+    for commander in chosen_commanders:
+        for card in synergy_cards(data, commander, pages.get(commander), cube, per_commander):
+            cube.add_card(card, "edhrec")
+
+    # Fill to CUBE_SIZE: one without-replacement draw, colour-balanced if requested
+    weights = data.filler_balanced_weights if balance_colors else None
+    with span("filler_sampling", wanted=CUBE_SIZE - len(cube), balanced=balance_colors):
+        filler = stratified_sample(data.filler_pool, data.filler_strata, CUBE_SIZE - len(cube), weights,
+                                   exclude=cube.unique_cards, rng=rng)
+    for card in filler:
+        cube.add_card(card, "filler")
+    return cube
+
+
+def build_hipster_cube(data: CubeData, chosen_commanders, pages: dict, rng, per_commander: int = 47,
+                       target_min: int = 480) -> Cube:
+    """Commanders + up to `per_commander` cards from every non-gamechanger section, second pass to `target_min`."""
+    cube = Cube()
+
+    # Add commanders to cube (the commanders themselves)
+    for commander in chosen_commanders:
+        cube.add_card(commander, "commander")
+
+    # --- First pass: add up to `per_commander` extras per commander ---
+    # Top cards are NOT forced separately; they are just part of the pool.
+    for commander in chosen_commanders:
+        print(f"[EDHREC] {commander}")
+        page = pages.get(commander)
+        if not page:
+            continue
+        # Keep the first `per_commander` while preserving EDHREC's default ordering
+        with span("extraction", commander=commander):
+            extras = collect_cards_from_sections(page, cube.unique_cards, exclude_tags_substrings=["gamechanger"],
+                                                 names=data.names)
+        for card in extras[:per_commander]:
+            cube.add_card(card, "edhrec")
+
+    # --- Second pass if short of target_min: fill ONLY with commander-played cards (no game changers) ---
+    if len(cube) < target_min:
+        print(f"[WARN] Cube below {target_min} after first pass ({len(cube)}). Running a second pass from commander decks...")
+        for commander in chosen_commanders:
+            if len(cube) >= target_min:
+                break
+            page = pages.get(commander)
+            if page:
+                with span("extraction", commander=commander, second_pass=True):
+                    more = collect_cards_from_sections(page, cube.unique_cards, exclude_tags_substrings=["gamechanger"],
+                                                       names=data.names)
+                for card in more:
+                    if len(cube) >= target_min:
+                        break
+                    cube.add_card(card, "edhrec_second_pass")
+    return cube
+
+
+VARIANTS = {
+    "10": {"commanders": 10, "min_colors": 2, "builder": build_synergy_cube, "options": {"per_commander": 40}},
+    "20": {"commanders": 20, "min_colors": 0, "builder": build_synergy_cube, "options": {"per_commander": 20}},
+    "hipster": {"commanders": 10, "min_colors": 2, "builder": build_hipster_cube, "options": {}},
+}
+
+
+def plan_cube(data: CubeData, variant: str, rng=random) -> list:
+    """Choose the commanders of one cube of `variant`."""
+    spec = VARIANTS[variant]
+    return choose_commanders(data, rng, spec["commanders"], spec["min_colors"])
+
+
+def build_cube(data: CubeData, variant: str, chosen_commanders, pages: dict, rng=random) -> Cube:
+    """Build one cube of `variant` around `chosen_commanders` from pre-fetched EDHREC `pages`."""
+    spec = VARIANTS[variant]
+    with span("cube_build", variant=variant, commanders=len(chosen_commanders)) as s:
+        cube = spec["builder"](data, chosen_commanders, pages, rng, **spec["options"])
+        s.set(cards=len(cube))
+    return cube
@@ -0,0 +1,236 @@
+"""Bulk decklist parsing and card name resolution.
+
+Reads decklists exported by the usual tools and resolves their card names against the
+card index in one batched pass:
+
+    Arena       Deck / Sideboard / Commander / Companion headers, "4 Lightning Bolt (M11) 149",
+                sideboard after a blank line
+    MTGO        "4 Lightning Bolt" with the sideboard after a blank line or "SB: 2 Duress",
+                and .dek XML files
+    Moxfield    "1x Sol Ring (C21) 263 *F*", "SIDEBOARD:" / "COMMANDER:" headers
+    plain       one name per line, optional "4" / "4x" counts, "//" and "#" comments
+
+Directories are walked recursively and .zip / .tar(.gz|.bz2|.xz) archives are read in
+place. From the command line, report throughput and unresolved names:
+
+    python decklists.py 1matches/ exports.zip --unresolved 20
+"""
+import argparse
+import os
+import re
+import tarfile
+import time
+import xml.etree.ElementTree as ElementTree
+import zipfile
+from collections import Counter
+
+from cardindex import DEFAULT_MTGJSON_PATH, open_index
+from cardnames import NameResolver
+
+DECKLIST_EXTENSIONS = (".txt", ".dek", ".dck", ".deck")
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+# Sections whose cards are played in a game (the rest: sideboard, maybeboard)
+PLAYED_SECTIONS = ("commander", "companion", "main")
+
+SECTION_HEADERS = {
+    "about": "about",
+    "commander": "commander",
+    "commanders": "commander",
+    "companion": "companion",
+    "deck": "main",
+    "main": "main",
+    "mainboard": "main",
+    "maindeck": "main",
+    "sideboard": "sideboard",
+    "side": "sideboard",
+    "sb": "sideboard",
+    "maybeboard": "maybeboard",
+    "considering": "maybeboard",
+}
+
+# One tokenizer for every line format: optional "SB:", count, name, (SET) number, *F* markers
+CARD_LINE = re.compile(r"""
+    ^(?P<sb>SB:\s*)?
+    (?:(?P<count>\d+)\s*[xX]?\s+)?
+    (?P<name>.+?)
+    (?:\s+[(\[](?P<set>[A-Za-z0-9]{2,6})(?::(?P<colon_number>[^\])]+))?[)\]](?:\s+(?P<number>[\w★-]+))?)?
+    (?:\s+\*[A-Za-z]+\*)*
+    \s*$
+""", re.VERBOSE)
+HEADER_LINE = re.compile(r"^(?://|#)?\s*([A-Za-z]+)\s*(?:\(\d+\))?\s*:?\s*$")
+
+
+def _new_decklist() -> dict:
+    return {section: {} for section in ("commander", "companion", "main", "sideboard", "maybeboard")}
+
+
+def _add(decklist: dict, section: str, name: str, count: int):
+    cards = decklist[section]
+    cards[name] = cards.get(name, 0) + count
+
+
+def parse_text(text: str) -> dict:
+    """{section: {name: count}} for a text decklist in any of the supported formats."""
+    decklist = _new_decklist()
+    section = "main"
+    blank_after_cards = False
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            # Arena and MTGO put the sideboard after a blank line, without a header
+            blank_after_cards = blank_after_cards or bool(decklist.get(section))
+            continue
+        header = None if line[0].isdigit() else HEADER_LINE.match(line)
+        if header and header.group(1).lower() in SECTION_HEADERS:
+            section = SECTION_HEADERS[header.group(1).lower()]
+            blank_after_cards = False
+            continue
+        if line.startswith(("//", "#")):
+            # A commented group ("// Spells") after a blank line is more of the same section
+            blank_after_cards = False
+            continue
+        if section == "about":
+            continue
+        card = CARD_LINE.match(line)
+        if not card:
+            continue
+        target = section
+        if card.group("sb"):
+            target = "sideboard"
+        elif blank_after_cards and section == "main":
+            section = target = "sideboard"
+        _add(decklist, target, card.group("name"), int(card.group("count") or 1))
+    return decklist
+
+
+def parse_dek(data: bytes) -> dict:
+    """{section: {name: count}} for an MTGO .dek XML file."""
+    decklist = _new_decklist()
+    for card in ElementTree.fromstring(data).iter("Cards"):
+        name = card.get("Name")
+        if name:
+            section = "sideboard" if card.get("Sideboard", "false").lower() == "true" else "main"
+            _add(decklist, section, name, int(card.get("Quantity") or 1))
+    return decklist
+
+
+def parse_decklist(data, file_name: str = "") -> dict:
+    """Parse decklist bytes or text; .dek files (or anything starting with "<") as MTGO XML."""
+    if isinstance(data, bytes):
+        if file_name.lower().endswith(".dek") or data.lstrip().startswith(b"<"):
+            return parse_dek(data)
+        data = data.decode("utf-8-sig", errors="replace")
+    return parse_text(data)
+
+
+def played_names(decklist: dict) -> set:
+    """Names in the sections that are actually played (commander, companion, main deck)."""
+    return {name for section in PLAYED_SECTIONS for name in decklist[section]}
+
+
+# --- sources ---
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def is_decklist(path: str) -> bool:
+    return path.lower().endswith(DECKLIST_EXTENSIONS) and not os.path.basename(path).startswith(".")
+
+
+def iter_archive(path: str):
+    """Yield (member name, bytes) for every decklist in a zip (by name) or tar (in archive order) archive."""
+    if path.lower().endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            for info in sorted(archive.infolist(), key=lambda info: info.filename):
+                if not info.is_dir() and is_decklist(info.filename):
+                    yield info.filename, archive.read(info)
+        return
+    # Streamed: seeking back in a compressed tar would decompress it again from the start
+    with tarfile.open(path, "r|*") as archive:
+        for member in archive:
+            if member.isfile() and is_decklist(member.name):
+                yield member.name, archive.extractfile(member).read()
+
+
+def iter_sources(paths):
+    """Yield (source name, bytes) for decklist files, directories (recursively) and archives."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for file_name in sorted(files):
+                    yield from iter_sources([os.path.join(root, file_name)])
+        elif is_archive(path):
+            for member, data in iter_archive(path):
+                yield f"{path}/{member}", data
+        elif is_decklist(path):
+            with open(path, "rb") as file:
+                yield path, file.read()
+
+
+def load_decklists(paths, resolver: NameResolver) -> tuple:
+    """Parse every decklist under `paths` and resolve all names in one pass (see cardnames).
+
+    Returns ([(source, {section: {card name: count}})], report); unresolved names are
+    dropped from the decklists and counted in report["unresolved"] (name -> decklists),
+    fuzzy matches are listed in report["corrected"] (raw name -> card name).
+    """
+    started = time.perf_counter()
+    parsed = [(source, parse_decklist(data, source)) for source, data in iter_sources(paths)]
+    parse_time = time.perf_counter() - started
+
+    raw_names = {name for _, decklist in parsed for cards in decklist.values() for name in cards}
+    resolved, unresolved = resolver.resolve(raw_names)
+    corrected = {raw: name for raw, name in resolved.items() if resolver.lookup(raw)[1] < 1.0}
+
+    missing = Counter()
+    decklists = []
+    for source, decklist in parsed:
+        clean = _new_decklist()
+        for section, cards in decklist.items():
+            for raw, count in cards.items():
+                if raw in resolved:
+                    _add(clean, section, resolved[raw], count)
+                else:
+                    missing[raw] += 1
+        decklists.append((source, clean))
+
+    elapsed = time.perf_counter() - started
+    report = {
+        "decklists": len(decklists),
+        "names": len(raw_names),
+        "unresolved": missing,
+        "corrected": corrected,
+        "parse_s": round(parse_time, 3),
+        "total_s": round(elapsed, 3),
+        "decklists_per_s": round(len(decklists) / elapsed, 1) if elapsed else 0.0,
+    }
+    return decklists, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse decklists in bulk and resolve their card names.")
+    parser.add_argument("paths", nargs="+", help="decklist files, directories or .zip/.tar archives")
+    parser.add_argument("--mtgjson", default=DEFAULT_MTGJSON_PATH, help="local AllPrintings.json (or its card index)")
+    parser.add_argument("--unresolved", type=int, default=10, metavar="N", help="show the N most common unresolved names")
+    args = parser.parse_args(argv)
+
+    with open_index(args.mtgjson) as card_index:
+        resolver = NameResolver.from_index(card_index)
+    decklists, report = load_decklists(args.paths, resolver)
+    print(f"✅ {report['decklists']} decklists, {report['names']} distinct names in {report['total_s']:.2f}s "
+          f"({report['decklists_per_s']} decklists/s, parsing {report['parse_s']:.2f}s)")
+    if report["corrected"]:
+        print(f"🔤 {len(report['corrected'])} names matched by spelling similarity, e.g. "
+              + ", ".join(f"{raw} → {name}" for raw, name in list(report["corrected"].items())[:5]))
+    unresolved = report["unresolved"]
+    if unresolved:
+        print(f"⚠️ {len(unresolved)} unresolved names in {sum(unresolved.values())} decklist entries:")
+        for name, count in unresolved.most_common(args.unresolved):
+            print(f"   {count:>5}  {name}")
+
+
+if __name__ == "__main__":
+    main()
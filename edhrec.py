@@ -0,0 +1,342 @@
+"""Shared EDHREC fetch layer.
+
+Commander pages are fetched concurrently through a thread pool over one
+connection-pooled requests.Session, so a 20-commander cube pays for roughly one
+round trip (and one TLS handshake per pooled connection) instead of 20 serial ones.
+Results always come back in the order the commanders were given, so the cube
+composition never depends on network timing.
+
+An optional EDHRECCache keeps responses on disk between runs: bodies are stored
+compressed per commander slug, expire after a TTL and are then revalidated with
+ETag / If-Modified-Since. 404s and failures are remembered for a shorter time so
+dead slugs stop costing a round trip on every run.
+
+Every request goes through a ratelimit.RequestScheduler, which adapts the number of
+requests in flight to how EDHREC responds, honours Retry-After, retries throttled
+and failed requests within a time budget and stops asking while EDHREC is down.
+Pass one scheduler to several clients to share its limit and per-run statistics.
+
+Commander slugs come from edhrec_slugs.json when it lists the commander (built and
+verified offline by edhrec_slugs.py); commanders it marks dead are never requested.
+Names it does not list fall back to format_commander_name(). A stand-in base URL
+uses its own table (edhrec_slugs.<host>.json), never the one verified against EDHREC.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ratelimit import DEFAULT_TIME_BUDGET, CircuitOpenError, RequestScheduler
+from tracing import count, span
+
+# Override with the EDHREC_BASE_URL environment variable, e.g. to point every generator
+# at a local stand-in (see edhrec_standin.py)
+DEFAULT_BASE_URL = "https://json.edhrec.com"
+EDHREC_BASE_URL = os.environ.get("EDHREC_BASE_URL", DEFAULT_BASE_URL).rstrip("/")
+DEFAULT_CONCURRENCY = 8
+REQUEST_TIMEOUT = 10
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "edhrec_cache.sqlite")
+DEFAULT_TTL = 7 * 24 * 3600           # pages change slowly
+DEFAULT_NEGATIVE_TTL = 24 * 3600      # 404s: the slug probably does not exist
+DEFAULT_FAILURE_TTL = 15 * 60         # timeouts, 5xx, throttling: retry soon
+
+DEFAULT_SLUG_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "edhrec_slugs.json")
+
+SLUG_DROPPED = re.compile(r"[^a-z0-9\s-]")
+SLUG_SEPARATORS = re.compile(r"[\s-]+")
+
+
+def format_commander_name(name: str) -> str:
+    """EDHREC slug by the naming rules: front face, no accents or punctuation, words joined by "-"."""
+    name = unicodedata.normalize('NFKD', name.split(" // ")[0]).encode('ASCII', 'ignore').decode('utf-8')
+    return SLUG_SEPARATORS.sub("-", SLUG_DROPPED.sub("", name.lower())).strip("-")
+
+
+_slug_table = None
+_slug_table_lock = threading.Lock()
+
+
+def slug_table_path(base_url: str = EDHREC_BASE_URL) -> str:
+    """edhrec_slugs.json for EDHREC itself; a stand-in's table gets its own file next to it."""
+    base_url = base_url.rstrip("/")
+    if base_url == DEFAULT_BASE_URL:
+        return DEFAULT_SLUG_TABLE_PATH
+    host = re.sub(r"[^A-Za-z0-9.-]+", "_", urlsplit(base_url).netloc)
+    return os.path.splitext(DEFAULT_SLUG_TABLE_PATH)[0] + f".{host}.json"
+
+
+def load_slug_table(path: str = DEFAULT_SLUG_TABLE_PATH, base_url: str = EDHREC_BASE_URL) -> dict:
+    """{commander: slug, or None if every candidate slug is dead} from edhrec_slugs.json.
+    Empty without a table, or when the table was verified against another base URL."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        table = json.load(f)
+    if table.get("base_url", "").rstrip("/") != base_url.rstrip("/"):
+        return {}
+    return table["slugs"]
+
+
+def slug_table() -> dict:
+    """The slug table of EDHREC_BASE_URL, loaded on first use."""
+    global _slug_table
+    if _slug_table is None:
+        with _slug_table_lock:
+            if _slug_table is None:
+                _slug_table = load_slug_table(slug_table_path(EDHREC_BASE_URL), EDHREC_BASE_URL)
+    return _slug_table
+
+
+def commander_slug(commander: str):
+    """EDHREC slug of `commander` from the slug table (None if known dead), else by the naming rules."""
+    table = slug_table()
+    if commander in table:
+        return table[commander]
+    return format_commander_name(commander)
+
+
+def commander_url(commander: str, base_url: str = EDHREC_BASE_URL) -> str:
+    return slug_url(commander_slug(commander) or format_commander_name(commander), base_url)
+
+
+def slug_url(slug: str, base_url: str = EDHREC_BASE_URL) -> str:
+    return f"{base_url}/pages/commanders/{slug}.json"
+
+
+def make_session(pool_size: int = DEFAULT_CONCURRENCY) -> requests.Session:
+    """requests.Session whose connection pool can keep `pool_size` connections alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def make_scheduler(concurrency: int = DEFAULT_CONCURRENCY, time_budget: float = DEFAULT_TIME_BUDGET) -> RequestScheduler:
+    """RequestScheduler for EDHREC requests: timeouts and dropped connections are retried."""
+    return RequestScheduler(concurrency, time_budget, name="edhrec",
+                            transient=(requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+
+
+class EDHRECCache:
+    """Persistent on-disk cache of EDHREC commander pages, keyed by slug.
+
+    Safe to share between the fetch threads of one client. Hit/miss counters are kept
+    in `stats`.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL, failure_ttl: float = DEFAULT_FAILURE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.failure_ttl = failure_ttl
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "negative_hits": 0, "stale_served": 0}
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                slug TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+        count(f"edhrec_cache.{stat}")
+
+    def get(self, slug: str):
+        """Return the cached entry for `slug` as a dict, or None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT status, body, etag, last_modified, fetched_at FROM pages WHERE slug = ?", (slug,)
+            ).fetchone()
+        if not row:
+            return None
+        status, body, etag, last_modified, fetched_at = row
+        return {
+            "status": status,
+            "data": json.loads(zlib.decompress(body)) if body else None,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": fetched_at,
+        }
+
+    def is_fresh(self, entry: dict) -> bool:
+        if entry["status"] == 200:
+            ttl = self.ttl
+        elif entry["status"] == 404:
+            ttl = self.negative_ttl
+        else:
+            ttl = self.failure_ttl
+        return time.time() - entry["fetched_at"] < ttl
+
+    def put(self, slug: str, status: int, data=None, etag=None, last_modified=None):
+        body = zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8")) if data is not None else None
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (slug, status, body, etag, last_modified, time.time()),
+            )
+            self.conn.commit()
+
+    def touch(self, slug: str):
+        """Mark a revalidated entry as fresh again."""
+        with self._lock:
+            self.conn.execute("UPDATE pages SET fetched_at = ? WHERE slug = ?", (time.time(), slug))
+            self.conn.commit()
+
+    def summary(self) -> str:
+        return ", ".join(f"{key}={value}" for key, value in self.stats.items())
+
+
+class EDHRECClient:
+    """Fetches EDHREC commander pages over a pooled session with bounded concurrency.
+    Reads through `cache` (an EDHRECCache) when one is given; requests are paced by
+    `scheduler` (see make_scheduler; one per client by default).
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, base_url: str = EDHREC_BASE_URL, session=None, cache=None,
+                 scheduler=None):
+        self.concurrency = max(1, concurrency)
+        self.base_url = base_url
+        self.session = session or make_session(self.concurrency)
+        self.cache = cache
+        self.scheduler = scheduler or make_scheduler(self.concurrency)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def fetch_page(self, commander: str):
+        """Fetch and return the parsed EDHREC commander page JSON, or None on failure."""
+        slug = commander_slug(commander)
+        if slug is None:
+            count("edhrec.dead_slugs")
+            print(f"⏭️ {commander} has no EDHREC page (edhrec_slugs.json), not requesting it")
+            return None
+        return self.fetch_slug(slug, commander)[0]
+
+    def cache_key(self, slug: str) -> str:
+        if self.base_url != DEFAULT_BASE_URL:
+            return f"{self.base_url}|{slug}"  # keep stand-in pages apart from real ones
+        return slug
+
+    def fetch_slug(self, slug: str, label: str = None) -> tuple:
+        """(page JSON or None, HTTP status or None) of the page at `slug`, read through the cache.
+        The status is the cached one on a cache hit; `label` names the page in messages."""
+        label = label or slug
+        if self.cache is None:
+            fetched = self._fetch(slug, label)
+            return fetched[:2] if fetched else (None, None)
+
+        key = self.cache_key(slug)
+        entry = self.cache.get(key)
+        if entry and self.cache.is_fresh(entry):
+            self.cache.count("hits" if entry["status"] == 200 else "negative_hits")
+            return entry["data"], entry["status"]
+        self.cache.count("misses")
+
+        cached = entry if entry and entry["data"] is not None else None
+        headers = {}
+        if cached and cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        fetched = self._fetch(slug, label, headers)
+        if fetched is None:
+            # Never sent (circuit open): nothing was learned about the page, so nothing is cached
+            if cached:
+                self.cache.count("stale_served")
+                return cached["data"], None
+            return None, None
+        data, status, res = fetched
+        if status == 304 and cached:
+            self.cache.count("revalidated")
+            self.cache.touch(key)
+            return cached["data"], 200
+        if data is not None:
+            self.cache.put(key, 200, data, res.headers.get("ETag"), res.headers.get("Last-Modified"))
+            return data, status
+        if cached and status != 404:
+            # Upstream trouble: keep the stale copy rather than dropping the commander's cards
+            self.cache.count("stale_served")
+            return cached["data"], status
+        self.cache.put(key, status or 0)
+        return None, status
+
+    def _fetch(self, slug: str, label: str, headers=None):
+        """GET the page at `slug`. Returns (data or None, HTTP status or None, response or None),
+        or None when the scheduler's circuit breaker refused to send the request."""
+        url = slug_url(slug, self.base_url)
+        res = None
+        with span("edhrec_fetch", commander=label, conditional=bool(headers)) as s:
+            try:
+                res = self.scheduler.request(
+                    lambda: self.session.get(url, timeout=REQUEST_TIMEOUT, headers=headers or None))
+                s.set(status=res.status_code, bytes=len(res.content))
+                if res.status_code == 304:
+                    return None, 304, res
+                res.raise_for_status()
+            except CircuitOpenError as e:
+                print(f"⏸️ EDHREC skipped for {label}: {e}")
+                s.set(error=type(e).__name__)
+                return None
+            except requests.exceptions.RequestException as e:
+                print(f"❌ EDHREC error for {label}: {e}")
+                s.set(error=type(e).__name__)
+                return None, res.status_code if res is not None else None, res
+            try:
+                return res.json(), res.status_code, res
+            except ValueError as e:
+                # A 200 without a readable page is a failure, not a page: no status, so it is
+                # cached under failure_ttl (or a stale copy is served) rather than as fresh
+                print(f"❌ EDHREC sent an unreadable page for {label}: {e}")
+                s.set(error=type(e).__name__)
+                return None, None, res
+
+    def fetch_pages(self, commanders) -> dict:
+        """Fetch every distinct commander page concurrently.
+        Returns {commander: page JSON or None}, keyed in the order the commanders were given.
+        """
+        commanders = list(dict.fromkeys(commanders))
+        if not commanders:
+            return {}
+        with span("edhrec_fetch_all", commanders=len(commanders), concurrency=self.concurrency) as s, \
+                ThreadPoolExecutor(max_workers=min(self.concurrency, len(commanders))) as pool:
+            # Executor.map yields results in submission order regardless of completion order
+            pages = dict(zip(commanders, pool.map(self.fetch_page, commanders)))
+            s.set(missing=sum(page is None for page in pages.values()))
+        return pages
+
+
+def fetch_pages(commanders, concurrency: int = DEFAULT_CONCURRENCY, base_url: str = EDHREC_BASE_URL, cache=None,
+                scheduler=None) -> dict:
+    """One-shot helper: fetch `commanders` concurrently over a fresh pooled session."""
+    with EDHRECClient(concurrency, base_url, cache=cache, scheduler=scheduler) as client:
+        return client.fetch_pages(commanders)
@@ -0,0 +1,145 @@
+"""Build edhrec_slugs.json: a verified EDHREC slug for every commander we ever request.
+
+format_commander_name() derives a slug from the naming rules, but EDHREC does not
+always follow them (punctuation, "&", double-faced and reversible cards), and every
+wrong guess costs a round trip and leaves the commander without cards. This tool runs
+once, offline from the generators: every commander in 2AllCommanders.txt and
+3AllJumpstartCommanders.txt gets its candidate slugs tried, most likely first, until
+one has a page. The generators then load the table as a plain hash map (see
+edhrec.commander_slug) and never request a commander whose candidates are all dead.
+
+    python edhrec_slugs.py                      # verify against edhrec_cache.sqlite, then json.edhrec.com
+    python edhrec_slugs.py --offline            # cached answers only; the rest stay unverified
+    EDHREC_BASE_URL=http://127.0.0.1:8765 python edhrec_slugs.py    # against edhrec_standin.py,
+                                                # written to edhrec_slugs.127.0.0.1_8765.json
+
+Verified pages land in the EDHREC cache, so the next generator run starts warm.
+"""
+import argparse
+import json
+import os
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+from edhrec import (DEFAULT_CACHE_PATH, DEFAULT_CONCURRENCY, EDHREC_BASE_URL, EDHRECCache, EDHRECClient,
+                    format_commander_name, make_scheduler, slug_table_path)
+from edhrec_standin import read_commander_lists
+
+SLUG_TABLE_VERSION = 1
+
+VERIFIED = "verified"
+DEAD = "dead"
+UNVERIFIED = "unverified"
+
+
+def legacy_slug(name: str) -> str:
+    """The slug the generators used to request (only commas and apostrophes dropped)."""
+    name = unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode('utf-8')
+    return name.split(" // ")[0].lower().replace(",", "").replace("'", "").replace(" ", "-")
+
+
+def slug_candidates(name: str) -> list:
+    """Slugs EDHREC may use for `name`, most likely first."""
+    candidates = [format_commander_name(name)]
+    if "&" in name:
+        candidates.append(format_commander_name(name.replace("&", "and")))
+    if " // " in name:
+        # Pages of both faces joined, as for some split and modal cards
+        candidates.append(format_commander_name(name.replace(" // ", " ")))
+    candidates.append(legacy_slug(name))
+    return [slug for slug in dict.fromkeys(candidates) if slug]
+
+
+def cached_status(client: EDHRECClient, slug: str):
+    """Status of the cached page at `slug` (200 / 404 / other), or None if never fetched."""
+    entry = client.cache.get(client.cache_key(slug)) if client.cache else None
+    if entry is None:
+        return None
+    return 200 if entry["data"] is not None else entry["status"]
+
+
+def verify(client: EDHRECClient, name: str, offline: bool = False) -> tuple:
+    """(slug, VERIFIED | DEAD | UNVERIFIED) for `name`.
+
+    Candidates are tried in order: the first with a page wins; when every candidate
+    answers 404 the commander is dead (slug None); otherwise the most likely slug not
+    known to be dead is kept unverified.
+    """
+    candidates = slug_candidates(name)
+    unknown = []
+    for slug in candidates:
+        status = cached_status(client, slug)
+        if status is None and not offline:
+            data, status = client.fetch_slug(slug, name)
+            status = 200 if data is not None else status
+        if status == 200:
+            return slug, VERIFIED
+        if status != 404:
+            unknown.append(slug)
+    if unknown:
+        return unknown[0], UNVERIFIED
+    return None, DEAD
+
+
+def build_slug_table(commanders, client: EDHRECClient, offline: bool = False) -> dict:
+    """The edhrec_slugs.json document for `commanders`."""
+    with ThreadPoolExecutor(max_workers=client.concurrency) as pool:
+        results = list(pool.map(lambda name: verify(client, name, offline), commanders))
+    slugs = {}
+    statuses = {VERIFIED: [], DEAD: [], UNVERIFIED: []}
+    for name, (slug, status) in zip(commanders, results):
+        slugs[name] = slug
+        statuses[status].append(name)
+    return {
+        "version": SLUG_TABLE_VERSION,
+        "base_url": client.base_url,
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "counts": {status: len(names) for status, names in statuses.items()},
+        "dead": statuses[DEAD],
+        "unverified": statuses[UNVERIFIED],
+        "slugs": slugs,
+    }
+
+
+def write_slug_table(table: dict, path: str):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(table, f, indent=1, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and verify the EDHREC slug table of every commander.")
+    parser.add_argument("--out", default=None,
+                        help="slug table to write (default: edhrec_slugs.json, or edhrec_slugs.<host>.json for a stand-in)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="EDHREC page cache to verify against first")
+    parser.add_argument("--base-url", default=EDHREC_BASE_URL, help="EDHREC (or stand-in) to ask for uncached slugs")
+    parser.add_argument("--offline", action="store_true", help="use cached answers only, send no requests")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="parallel requests")
+    args = parser.parse_args(argv)
+    args.out = args.out or slug_table_path(args.base_url)
+
+    commanders = read_commander_lists()
+    print(f"🔍 Verifying EDHREC slugs of {len(commanders)} commanders...")
+    cache = EDHRECCache(args.cache)
+    scheduler = make_scheduler(args.concurrency)
+    try:
+        with EDHRECClient(args.concurrency, args.base_url, cache=cache, scheduler=scheduler) as client:
+            table = build_slug_table(commanders, client, args.offline)
+    finally:
+        cache.close()
+    write_slug_table(table, args.out)
+
+    counts = table["counts"]
+    corrected = sum(1 for name, slug in table["slugs"].items() if slug and slug != format_commander_name(name))
+    print(f"✅ {counts[VERIFIED]} verified ({corrected} differ from the naming rules), {counts[DEAD]} dead, "
+          f"{counts[UNVERIFIED]} unverified → {args.out}")
+    if not args.offline:
+        print(f"📡 EDHREC requests: {scheduler.summary()}")
+    for name in table["dead"][:20]:
+        print(f"   ⚰️ {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""Local EDHREC stand-in server for offline load testing.
+
+Serves /pages/commanders/<slug>.json in the shape the generators consume
+(container.json_dict.cardlists[].cardviews, panels.taglinks) from a fixtures
+directory, with configurable latency, error rate and 429 throttling. Pages carry an
+ETag and Last-Modified, and conditional requests get 304 like the real site. The
+fixtures are not committed; make them first:
+
+    python edhrec_standin.py record              # copy pages from edhrec_cache.sqlite into fixtures
+    python edhrec_standin.py synthesize          # generate pages for every commander from card data
+    python edhrec_standin.py serve --latency 0.2 --error-rate 0.05 --rate-limit 20
+
+Then point any generator at it:
+
+    EDHREC_BASE_URL=http://127.0.0.1:8765 python 2Cube20Commanders.py
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import signal
+import threading
+import time
+import zlib
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from edhrec import DEFAULT_CACHE_PATH, commander_slug, format_commander_name
+
+current_directory = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES_DIR = os.path.join(current_directory, "edhrec_fixtures")
+DEFAULT_PORT = 8765
+
+PAGE_PREFIX = "/pages/commanders/"
+
+# Section tags of a commander page, as read by the generators
+CARDLIST_TAGS = {
+    "highsynergycards": "High Synergy Cards",
+    "topcards": "Top Cards",
+    "gamechangers": "Game Changers",
+    "creatures": "Creatures",
+    "instants": "Instants",
+    "sorceries": "Sorceries",
+    "utilityartifacts": "Utility Artifacts",
+    "enchantments": "Enchantments",
+    "planeswalkers": "Planeswalkers",
+    "utilitylands": "Utility Lands",
+    "manaartifacts": "Mana Artifacts",
+    "lands": "Lands",
+}
+
+
+class StandinConfig:
+    """Behaviour knobs of the stand-in; changeable while the server runs."""
+
+    def __init__(self, fixtures_dir=DEFAULT_FIXTURES_DIR, latency=0.0, jitter=0.0, error_rate=0.0,
+                 rate_limit=None, retry_after=1, seed=None):
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency          # seconds added to every response
+        self.jitter = jitter            # extra uniform random latency, seconds
+        self.error_rate = error_rate    # fraction of requests answered with 500
+        self.rate_limit = rate_limit    # requests per second before answering 429 (None = unlimited)
+        self.retry_after = retry_after  # Retry-After header sent with 429s
+        self.rng = random.Random(seed)
+
+
+class _TokenBucket:
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: StandinConfig):
+        super().__init__(address, _Handler)
+        self.config = config
+        self.bucket = _TokenBucket(config.rate_limit) if config.rate_limit else None
+        self.stats = {"requests": 0, "200": 0, "304": 0, "404": 0, "429": 0, "500": 0}
+        self.stats_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key: str):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandinServer
+
+    def log_message(self, format, *args):
+        pass  # keep load tests quiet; see server.stats
+
+    def do_GET(self):
+        config = self.server.config
+        self.server.count("requests")
+        delay = config.latency + (config.rng.uniform(0, config.jitter) if config.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if self.server.bucket and not self.server.bucket.take():
+            self.server.count("429")
+            self._send(429, b"", {"Retry-After": str(config.retry_after)})
+            return
+        if config.error_rate and config.rng.random() < config.error_rate:
+            self.server.count("500")
+            self._send(500, b"")
+            return
+
+        fixture = self._load_fixture()
+        if fixture is None:
+            self.server.count("404")
+            self._send(404, b"")
+            return
+        body, modified = fixture
+        validators = {"ETag": '"' + hashlib.sha1(body).hexdigest() + '"',
+                      "Last-Modified": formatdate(modified, usegmt=True)}
+        if self._not_modified(validators["ETag"], modified):
+            self.server.count("304")
+            self._send(304, b"", validators)
+            return
+        self.server.count("200")
+        self._send(200, body, {"Content-Type": "application/json", **validators})
+
+    def _not_modified(self, etag: str, modified: int) -> bool:
+        """Conditional GET: If-None-Match, when sent, takes precedence over If-Modified-Since."""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return modified <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False  # unparseable dates are ignored, as HTTP requires
+        return False
+
+    def _load_fixture(self):
+        """(body, modification time in whole seconds) of the requested page's fixture, or None."""
+        path = self.path.split("?", 1)[0]
+        if not path.startswith(PAGE_PREFIX) or not path.endswith(".json"):
+            return None
+        slug = path[len(PAGE_PREFIX):-len(".json")]
+        if "/" in slug or slug.startswith("."):
+            return None
+        fixture = os.path.join(self.server.config.fixtures_dir, slug + ".json")
+        if not os.path.exists(fixture):
+            return None
+        with open(fixture, "rb") as f:
+            return f.read(), int(os.fstat(f.fileno()).st_mtime)
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+def start_standin(config: StandinConfig = None, host="127.0.0.1", port=0) -> StandinServer:
+    """Start a stand-in in a background thread and return it (port 0 picks a free port).
+    Stop it with server.shutdown().
+    """
+    server = StandinServer((host, port), config or StandinConfig())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --- fixtures ---
+
+def write_fixture(fixtures_dir, slug, page: dict):
+    os.makedirs(fixtures_dir, exist_ok=True)
+    with open(os.path.join(fixtures_dir, slug + ".json"), "w", encoding="utf-8") as f:
+        json.dump(page, f, separators=(",", ":"))
+
+
+def record_from_cache(fixtures_dir=DEFAULT_FIXTURES_DIR, cache_path=DEFAULT_CACHE_PATH) -> int:
+    """Copy every cached 200 page from the EDHREC cache into `fixtures_dir`."""
+    import sqlite3
+
+    conn = sqlite3.connect(f"file:{cache_path}?mode=ro", uri=True)
+    count = 0
+    try:
+        for slug, body in conn.execute("SELECT slug, body FROM pages WHERE status = 200 AND body IS NOT NULL"):
+            if "|" in slug:
+                continue  # pages cached from another stand-in
+            write_fixture(fixtures_dir, slug, json.loads(zlib.decompress(body)))
+            count += 1
+    finally:
+        conn.close()
+    return count
+
+
+def synthesize_page(commander: str, identity_index, cards_per_list=20, rng=None) -> dict:
+    """Commander page in EDHREC's shape, filled with cards of the commander's colour identity."""
+    rng = rng or random.Random(format_commander_name(commander))
+    identity = identity_index.identity(commander) or set()
+    colors = "".join(identity)
+    # Cards from every sub-identity of the commander, like real EDHREC recommendations
+    nonlands, lands = [], []
+    for mask in range(32):
+        sub = {c for i, c in enumerate("WUBRG") if mask & (1 << i)}
+        if sub <= set(colors):
+            nonlands += identity_index.names(sub, "nonland")
+            lands += identity_index.names(sub, "nonbasic_land")
+    cardlists = []
+    for tag, header in CARDLIST_TAGS.items():
+        pool = lands if "lands" in tag else nonlands
+        picks = rng.sample(pool, min(cards_per_list, len(pool)))
+        cardlists.append({
+            "tag": tag,
+            "header": header,
+            "cardviews": [{"name": name, "sanitized": format_commander_name(name)} for name in picks],
+        })
+    return {
+        "header": f"{commander} (Commander)",
+        "panels": {"taglinks": [{"value": rng.choice(["Tokens", "Counters", "Spellslinger", "Voltron", "Aristocrats"]), "count": rng.randint(100, 5000)}]},
+        "container": {"json_dict": {"card": {"name": commander}, "cardlists": cardlists}},
+    }
+
+
+def synthesize_fixtures(commanders, fixtures_dir=DEFAULT_FIXTURES_DIR, mtgjson_path=None, cards_per_list=20) -> int:
+    """Write a synthetic page for each commander, drawn from the card index."""
+    from cardindex import DEFAULT_MTGJSON_PATH, open_index
+    from cardtable import ColorIdentityIndex, load_table
+
+    with open_index(mtgjson_path or DEFAULT_MTGJSON_PATH) as card_index:
+        identity_index = ColorIdentityIndex(load_table(card_index))
+    for commander in commanders:
+        write_fixture(fixtures_dir, commander_slug(commander) or format_commander_name(commander),
+                      synthesize_page(commander, identity_index, cards_per_list))
+    return len(commanders)
+
+
+def read_commander_lists():
+    """Every commander named in 2AllCommanders.txt and 3AllJumpstartCommanders.txt."""
+    commanders = []
+    for file_name in ("2AllCommanders.txt", "3AllJumpstartCommanders.txt"):
+        path = os.path.join(current_directory, file_name)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                commanders += [line.strip() for line in f if line.strip() and not line.strip().endswith(":")]
+    return list(dict.fromkeys(commanders))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES_DIR, help="fixtures directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the stand-in server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    serve.add_argument("--jitter", type=float, default=0.0, help="extra random latency, seconds")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500 responses")
+    serve.add_argument("--rate-limit", type=float, default=None, help="requests/second before 429s")
+    serve.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on 429")
+    serve.add_argument("--seed", type=int, default=None)
+
+    record = commands.add_parser("record", help="copy cached EDHREC pages into the fixtures directory")
+    record.add_argument("--cache", default=DEFAULT_CACHE_PATH)
+
+    synth = commands.add_parser("synthesize", help="generate pages for all commanders from card data")
+    synth.add_argument("--mtgjson", default=None, help="AllPrintings.json (default: next to the scripts)")
+    synth.add_argument("--cards-per-list", type=int, default=20)
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        print(f"✅ Recorded {record_from_cache(args.fixtures, args.cache)} pages into {args.fixtures}")
+    elif args.command == "synthesize":
+        count = synthesize_fixtures(read_commander_lists(), args.fixtures, args.mtgjson, args.cards_per_list)
+        print(f"✅ Synthesized {count} pages into {args.fixtures}")
+    else:
+        config = StandinConfig(args.fixtures, args.latency, args.jitter, args.error_rate,
+                               args.rate_limit, args.retry_after, args.seed)
+        if not os.path.isdir(args.fixtures) or not any(name.endswith(".json") for name in os.listdir(args.fixtures)):
+            print(f"⚠️ No fixtures in {args.fixtures}: every page will be a 404. Run "
+                  f"\"python edhrec_standin.py synthesize\" (or \"record\") first.")
+        server = StandinServer((args.host, args.port), config)
+        print(f"🚀 EDHREC stand-in on {server.base_url} (fixtures: {args.fixtures})", flush=True)
+        signal.signal(signal.SIGTERM, signal.default_int_handler)  # stop cleanly under job runners
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            print(f"📊 {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
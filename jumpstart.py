@@ -0,0 +1,563 @@
+"""Jumpstart stages as in-process functions.
+
+The three Jumpstart scripts used to hand off through text files and a subprocess:
+3GenerateJumpstartPacks.py wrote 3CommanderSelection.txt, 3JumpstartBuilder.py
+wrote 3CommanderHalfDecks.txt and then started 3JumpstartLandAdder.py in a second
+interpreter, which reloaded the card data and re-parsed the half-decks. Here each
+stage is a function. The stages share one JumpstartData and pass deck dicts
+directly:
+
+    {"commanders": [commander1, commander2],
+     "identities": ["WU", "B"],              # per commander, None if unknown
+     "color_identity": "WUB",                # combined, WUBRG-ordered
+     "cards": [...half-deck cards...], "sources": ["edhrec" | "mtgjson", ...],
+     "half_sizes": [34, 34],
+     "lands": [...], "basics": [...]}        # added by the land stage
+
+Between the standalone scripts the decks travel as the same dicts, one JSON record
+per line, appended as each deck is done: 3CommanderHalfDecks.jsonl from the
+half-deck stage and 3JumpstartDecks.jsonl from the land stage, which reads the
+half-decks one record at a time. 3CommanderHalfDecks.txt and 3JumpstartDecks.txt
+are rendered from the records once a stage is finished, and the hash of the rendered
+half-deck text is kept next to its records (3CommanderHalfDecks.jsonl.sha256); a
+3CommanderHalfDecks.txt that no longer matches it was hand-edited and is parsed instead.
+"""
+import hashlib
+import json
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from cardindex import COLOR_ORDER, open_index
+from cardnames import DEFAULT_MIN_CONFIDENCE, NameResolver
+from cardtable import ColorIdentityIndex, load_table
+from edhrec import commander_slug
+from tracing import count, span
+
+current_directory = os.path.dirname(os.path.abspath(__file__))
+ALL_JUMPSTART_COMMANDERS_PATH = os.path.join(current_directory, '3AllJumpstartCommanders.txt')
+SELECTION_PATH = os.path.join(current_directory, '3CommanderSelection.txt')
+HALF_DECKS_PATH = os.path.join(current_directory, '3CommanderHalfDecks.txt')
+LANDS_PATH = os.path.join(current_directory, '3Landbases.txt')
+DECKS_PATH = os.path.join(current_directory, '3JumpstartDecks.txt')
+HALF_DECK_RECORDS_PATH = os.path.join(current_directory, '3CommanderHalfDecks.jsonl')
+DECK_RECORDS_PATH = os.path.join(current_directory, '3JumpstartDecks.jsonl')
+MTGJSON_PATH = os.path.join(current_directory, 'AllPrintings.json')
+
+DECK_SEPARATOR = "=" * 40
+
+# Where a half-deck card came from
+SOURCE_EDHREC = "edhrec"
+SOURCE_MTGJSON = "mtgjson"  # random top-up of the commander's colour identity
+
+# Always store color identity in **W, U, B, R, G order**
+color_identity_mapping = {
+    "W": "White", "U": "Blue", "B": "Black", "R": "Red", "G": "Green",
+    "WU": "Azorius", "UB": "Dimir", "BR": "Rakdos", "RG": "Gruul", "WG": "Selesnya",
+    "WB": "Orzhov", "UR": "Izzet", "BG": "Golgari", "WR": "Boros", "UG": "Simic",
+    "WUB": "Esper", "UBR": "Grixis", "BRG": "Jund", "WRG": "Naya", "WUG": "Bant",
+    "WBG": "Abzan", "WUR": "Jeskai", "UBG": "Sultai", "WBR": "Mardu", "URG": "Temur",
+    "WUBR": "NoGreen", "WBRG": "NoBlue", "UBRG": "NoWhite", "WUBG": "NoRed", "WURG": "NoBlack"
+}
+
+# Basic land types
+basic_lands = {
+    "W": "Plains", "U": "Island", "B": "Swamp", "R": "Mountain", "G": "Forest"
+}
+
+# EDHREC cardlist tags -> half-deck categories
+EDHREC_CATEGORIES = {
+    "highsynergycards": "High Synergy Cards",
+    "topcards": "Top Cards",
+    "utilitylands": "Utility Lands",
+    "creatures": "Creatures",
+    "instants": "Instants",
+    "sorceries": "Sorceries",
+    "enchantments": "Enchantments",
+    "utilityartifacts": "Utility Artifacts",
+    "manaartifacts": "Mana Artifacts",
+}
+
+# Half-deck card types -> identity index buckets ("land" top-ups are nonbasic)
+CARD_TYPE_KINDS = {"land": "nonbasic_land", "nonland": "nonland"}
+
+
+def sorted_identity(color_identity) -> str:
+    """WUBRG-ordered identity string."""
+    return "".join(c for c in COLOR_ORDER if c in color_identity)
+
+
+class JumpstartData:
+    """Card data and land bases shared by every Jumpstart stage in this process."""
+
+    def __init__(self, mtgjson_path: str = MTGJSON_PATH, lands_path: str = LANDS_PATH):
+        self.mtgjson_path = mtgjson_path
+        self.lands_path = lands_path
+        self._table = None
+        self._identity_index = None
+        self._names = None
+        self._lands_by_category = None
+        self._reported = set()
+
+    @property
+    def table(self):
+        if self._table is None:
+            with open_index(self.mtgjson_path) as card_index:
+                self._table = load_table(card_index)
+        return self._table
+
+    @property
+    def identity_index(self) -> ColorIdentityIndex:
+        if self._identity_index is None:
+            with span("identity_map", cards=len(self.table)):
+                self._identity_index = ColorIdentityIndex(self.table)
+        return self._identity_index
+
+    @property
+    def names(self) -> NameResolver:
+        if self._names is None:
+            self._names = NameResolver(self.table.names)
+        return self._names
+
+    @property
+    def lands_by_category(self) -> dict:
+        if self._lands_by_category is None:
+            self._lands_by_category = load_lands(self.lands_path)
+        return self._lands_by_category
+
+    def card_name(self, name: str) -> str:
+        """`name` as spelled in the card data, allowing for typos in hand-edited files (unchanged if unknown)."""
+        match, confidence = self.names.lookup(name)
+        if match is None or confidence < DEFAULT_MIN_CONFIDENCE:
+            return name
+        if confidence < 1.0 and name not in self._reported:
+            self._reported.add(name)
+            print(f"🔤 Reading {name!r} as {match!r} ({confidence:.0%} match)")
+        return match
+
+    def color_identity(self, commander_name: str):
+        """Colour identity set of a commander, or None if unknown."""
+        return self.identity_index.identity(self.card_name(commander_name))
+
+
+# --- stage 1: commander selection ---
+
+def read_commander_pool(path: str = ALL_JUMPSTART_COMMANDERS_PATH) -> list:
+    """Commander names of 3AllJumpstartCommanders.txt, ignoring the colour category headers."""
+    commanders = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and ":" not in line:
+                commanders.append(line)
+    return commanders
+
+
+def generate_selection(commanders, num_players=4, commanders_per_player=4, draft_picks=5, rng=random) -> dict:
+    """Assign commanders to players plus a two-round draft variant.
+    Returns {"Player1": [...], ..., "DraftVariant": [...], "Round 2": [...]}.
+    """
+    # Ensure we have enough commanders
+    if len(commanders) < 20:
+        raise ValueError("Not enough commanders in the file for a proper selection.")
+
+    # Randomly shuffle commanders
+    commanders = list(commanders)
+    rng.shuffle(commanders)
+
+    selection = {f"Player{i+1}": [] for i in range(num_players)}
+
+    # Distribute commanders among players
+    for i in range(num_players * commanders_per_player):
+        player = f"Player{(i % num_players) + 1}"
+        selection[player].append(commanders.pop())
+
+    # Draft Variant - Pick random commanders for two rounds
+    draft_round_1 = rng.sample(commanders, draft_picks)
+    selection["DraftVariant"] = draft_round_1
+    selection["Round 2"] = rng.sample([c for c in commanders if c not in draft_round_1], draft_picks)
+    return selection
+
+
+def write_selection(selection: dict, path: str = SELECTION_PATH):
+    with open(path, 'w', encoding='utf-8') as output_file:
+        for group, picks in selection.items():
+            output_file.write(f"{group}:\n")
+            output_file.write("\n".join(picks))
+            output_file.write("\n\n")
+
+
+def read_selection(path: str = SELECTION_PATH) -> list:
+    """Commanders left in 3CommanderSelection.txt after players removed the ones they passed on."""
+    commanders = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not any(keyword in line for keyword in ["Player", "DraftVariant", "Round"]):
+                commanders.append(line)
+    return commanders
+
+
+def selection_commanders(selection: dict) -> list:
+    """Flatten a selection dict in file order (what read_selection returns for an untouched file)."""
+    return [commander for picks in selection.values() for commander in picks]
+
+
+def pair_commanders(commanders) -> list:
+    """Pair up commanders (2 per deck); an unpaired trailing commander is dropped."""
+    return [commanders[i:i+2] for i in range(0, len(commanders) - 1, 2)]
+
+
+# --- stage 2: half-decks ---
+
+def extract_cards(data, names: NameResolver = None) -> dict:
+    """Categorized card names of an EDHREC commander page (empty categories for None).
+    `names`: optional NameResolver to spell the cards as in the card data."""
+    json_dict = (data or {}).get("container", {}).get("json_dict", {})
+    categorized_cards = {category: [] for category in EDHREC_CATEGORIES.values()}
+
+    for cardlist in json_dict.get("cardlists", []):
+        tag = cardlist.get("tag", "").lower()
+        header = EDHREC_CATEGORIES.get(tag, None)
+        if header and "cardviews" in cardlist:
+            for card in cardlist["cardviews"]:
+                categorized_cards[header].append(names.canonical(card["name"]) if names else card["name"])
+
+    return categorized_cards
+
+
+def get_random_cards_by_color(data: JumpstartData, color_identity, count=10, card_type=None, exclude=(), rng=random):
+    """Gets random cards that match a given color identity and type, skipping names in `exclude`."""
+    kind = CARD_TYPE_KINDS.get(card_type)
+    matching_cards = data.identity_index.names(color_identity, kind) if kind else []
+
+    if len(matching_cards) < count:
+        print(f"⚠️ WARNING: Not enough matching {card_type} cards for {color_identity}. Found {len(matching_cards)}.")
+
+    if not kind:
+        return []
+    with span("random_fill", card_type=card_type, wanted=count):
+        return data.identity_index.sample(color_identity, kind, count, exclude=exclude, rng=rng)
+
+
+def build_half_deck(data: JumpstartData, deck: dict, commander_name: str, rng=random) -> tuple:
+    """Builds a half-deck: 4 utility lands, all synergy/top cards, and 30 total nonlands.
+    If not enough cards exist, fetches random cards from MTGJSON.
+    Returns (cards, sources) where sources[i] is "edhrec" or "mtgjson" for cards[i]."""
+    half_deck = []
+
+    # Add utility lands (if not enough, fetch from MTGJSON)
+    utility_lands = rng.sample(deck["Utility Lands"], min(4, len(deck["Utility Lands"])))
+    sources = [SOURCE_EDHREC] * len(utility_lands)
+    if len(utility_lands) < 4:
+        missing_lands = 4 - len(utility_lands)
+        color_identity = data.color_identity(commander_name) or set()
+        print(f"⚠️ {commander_name} missing {missing_lands} utility lands, adding from MTGJSON...")
+        utility_lands += get_random_cards_by_color(data, color_identity, missing_lands, card_type="land",
+                                                   exclude=utility_lands, rng=rng)
+        sources += [SOURCE_MTGJSON] * (len(utility_lands) - len(sources))
+
+    half_deck += utility_lands
+    half_deck += deck["Top Cards"]
+    half_deck += deck["High Synergy Cards"]
+
+    # Add nonlands until there are 30 total nonland cards
+    nonland_pool = (deck["Creatures"] + deck["Instants"] + deck["Sorceries"] +
+                    deck["Enchantments"] + deck["Utility Artifacts"])
+    rng.shuffle(nonland_pool)
+
+    needed_nonlands = 30 - (len(deck["Top Cards"]) + len(deck["High Synergy Cards"]))
+    half_deck += nonland_pool[:needed_nonlands]
+    sources += [SOURCE_EDHREC] * (len(half_deck) - len(sources))
+
+    if len(half_deck) < 34:  # 30 nonlands + 4 utility lands
+        # Fetch color identity for missing cards
+        color_identity = data.color_identity(commander_name) or set()
+        missing_count = 34 - len(half_deck)
+        print(f"⚠️ {commander_name} missing {missing_count} nonland cards, adding from MTGJSON...")
+        half_deck += get_random_cards_by_color(data, color_identity, missing_count, card_type="nonland",
+                                               exclude=half_deck, rng=rng)
+        sources += [SOURCE_MTGJSON] * (len(half_deck) - len(sources))
+
+    count("cards_added.edhrec", sources.count(SOURCE_EDHREC))
+    count("cards_added.random_fill", sources.count(SOURCE_MTGJSON))
+    return half_deck, sources
+
+
+def build_deck(data: JumpstartData, commander1: str, commander2: str, page1, page2, rng=random):
+    """Half-deck pair record for two commanders (see the module docstring), or None if both EDHREC pages are missing."""
+    if not page1 and not page2:
+        return None  # Skip if both failed
+    cards1, sources1 = build_half_deck(data, extract_cards(page1, data.names), commander1, rng)
+    cards2, sources2 = build_half_deck(data, extract_cards(page2, data.names), commander2, rng)
+    identities = [data.color_identity(commander) for commander in (commander1, commander2)]
+    return {
+        "commanders": [commander1, commander2],
+        "identities": [sorted_identity(identity) if identity is not None else None for identity in identities],
+        "color_identity": sorted_identity(set().union(*(identity or () for identity in identities))),
+        "cards": cards1 + cards2,
+        "sources": sources1 + sources2,
+        "half_sizes": [len(cards1), len(cards2)],
+    }
+
+
+def pair_seeds(pair_count: int, rng=random) -> list:
+    """One 32-bit seed per commander pair, drawn up front so a pair's deck does not depend on scheduling."""
+    return [rng.getrandbits(32) for _ in range(pair_count)]
+
+
+def iter_half_decks(data: JumpstartData, paired_commanders, pages, rng=random, workers: int = 1):
+    """Yield the half-deck pair (or None) of every commander pair, in pair order.
+
+    `pages` is {commander: EDHREC page} or a function commander -> page such as
+    EDHRECClient.fetch_page, which the workers then call so fetching overlaps building.
+    Every pair draws from its own random.Random seeded from `rng`, so serial and
+    parallel (`workers` > 1, a thread pool sharing `data` read-only) runs build the
+    same decks. Decks are yielded as soon as every earlier pair is done.
+    """
+    fetch = pages if callable(pages) else pages.get
+    seeds = pair_seeds(len(paired_commanders), rng)
+    # Load the lazily built card data before the workers share it
+    data.identity_index, data.names
+
+    def build(job):
+        (commander1, commander2), seed = job
+        page1, page2 = fetch(commander1), fetch(commander2)
+        deck = build_deck(data, commander1, commander2, page1, page2, random.Random(seed))
+        return (commander1, page1), (commander2, page2), deck
+
+    def report(results):
+        for *fetched, deck in results:
+            for commander, page in fetched:
+                print(f"🔍 Fetching: {commander} (EDHREC name: {commander_slug(commander)})")
+                if page is None:
+                    print(f"❌ Failed to fetch {commander}")
+            yield deck
+
+    jobs = zip(paired_commanders, seeds)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Executor.map yields results in submission order regardless of completion order
+            yield from report(pool.map(build, jobs))
+    else:
+        yield from report(map(build, jobs))
+
+
+def build_half_decks(data: JumpstartData, paired_commanders, pages, rng=random, workers: int = 1, path=None) -> list:
+    """Half-deck pairs for every commander pair (see iter_half_decks for `pages` and `workers`).
+    With `path`, each deck record is appended to that JSON Lines file as soon as it is built."""
+    decks = []
+    with span("half_decks", pairs=len(paired_commanders), workers=workers) as s, open_records(path) as output:
+        for deck in iter_half_decks(data, paired_commanders, pages, rng, workers):
+            if deck:
+                decks.append(deck)
+                write_record(output, deck)
+        s.set(decks=len(decks))
+    return decks
+
+
+def format_half_decks(decks) -> str:
+    """3CommanderHalfDecks.txt text for `decks`."""
+    parts = []
+    for deck in decks:
+        commander1, commander2 = deck["commanders"]
+        parts.append(f"Commanders:\n{commander1}\n{commander2}\n\nDeck:\n")
+        parts.append("\n".join(deck["cards"]) + "\n\n")
+        parts.append(DECK_SEPARATOR + "\n\n")
+    return "".join(parts)
+
+
+def parse_half_decks(text: str) -> list:
+    """Deck dicts from 3CommanderHalfDecks.txt text (the inverse of format_half_decks)."""
+    decks = []
+    for section in text.split(f"\n{DECK_SEPARATOR}\n"):
+        lines = section.strip().split("\n")
+        if len(lines) < 3:  # Skip empty sections or malformed data
+            continue
+        cards = lines[lines.index("Deck:") + 1:] if "Deck:" in lines else lines[3:]
+        decks.append({"commanders": [lines[1].strip(), lines[2].strip()], "cards": cards})
+    return decks
+
+
+# --- deck records ---
+
+def open_records(path=None):
+    """JSON Lines file to append deck records to (a no-op context without `path`)."""
+    return open(path, 'w', encoding='utf-8') if path else nullcontext()
+
+
+def write_record(output, deck: dict):
+    if output:
+        output.write(json.dumps(deck, ensure_ascii=False) + "\n")
+        output.flush()
+
+
+def read_records(path: str):
+    """Yield the deck records of a JSON Lines file one at a time."""
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def rendered_hash_path(records_path: str) -> str:
+    """Where the hash of the text rendered from `records_path` is kept (see write_text)."""
+    return records_path + ".sha256"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def read_half_decks(records_path: str = HALF_DECK_RECORDS_PATH, text_path: str = HALF_DECKS_PATH):
+    """Yield half-deck pairs for the land stage: the records, or 3CommanderHalfDecks.txt parsed
+    when it is the only file or differs from the text rendered from the records."""
+    text = None
+    if os.path.exists(text_path):
+        with open(text_path, 'r', encoding='utf-8') as file:
+            text = file.read()
+    if os.path.exists(records_path):
+        rendered = None
+        if os.path.exists(rendered_hash_path(records_path)):
+            with open(rendered_hash_path(records_path), 'r', encoding='ascii') as file:
+                rendered = file.read().strip()
+        if text is None or text_hash(text) == rendered:
+            yield from read_records(records_path)
+            return
+    if text is None:
+        raise FileNotFoundError(f"Neither {records_path} nor {text_path} exists")
+    yield from parse_half_decks(text)
+
+
+# --- stage 3: lands ---
+
+def load_lands(path: str = LANDS_PATH) -> dict:
+    """Reads the lands from 3Landbases.txt and organizes them by category."""
+    with open(path, 'r', encoding='utf-8') as file:
+        lines = file.readlines()
+
+    lands_by_category = {}
+    current_category = None
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.endswith(":"):
+            current_category = line[:-1]  # Remove colon
+            lands_by_category[current_category] = []
+        elif current_category:
+            lands_by_category[current_category].append(line)
+
+    return lands_by_category
+
+
+def get_commander_color_identity(data: JumpstartData, commander_name: str) -> set:
+    """Fetches the color identity of a commander from MTGJSON."""
+    color_identity = data.color_identity(commander_name)
+    if color_identity is not None:
+        print(f"🔹 {commander_name} color identity: {color_identity}")  # Debugging output
+        return color_identity
+    print(f"⚠️ WARNING: Color identity not found for {commander_name}")  # Debugging output
+    return set()  # Return an empty set if not found
+
+
+# Function to determine the land category based on sorted color identity
+def get_land_category(color_identity) -> str:
+    identity = sorted_identity(color_identity)  # Sort in W, U, B, R, G order
+    land_category = color_identity_mapping.get(identity, "Unknown")
+    print(f"🟢 FINAL Combined Color Identity (Sorted): {identity} → Land Category: {land_category}")  # Debugging output
+    return land_category
+
+
+# Function to select 15 lands from 3Landbases.txt
+def select_lands(data: JumpstartData, color_identity, rng=random) -> list:
+    category = get_land_category(color_identity)
+    if category in data.lands_by_category:
+        lands = data.lands_by_category[category]
+        return rng.sample(lands, min(15, len(lands)))
+    return ["Could not find enough lands, please check Lands.txt."]
+
+
+# Function to add basic lands (even split, if uneven one color gets +1)
+def select_basic_lands(color_identity) -> list:
+    color_list = [c for c in COLOR_ORDER if c in color_identity]  # Sort in W, U, B, R, G order
+
+    if len(color_list) == 1:
+        return [basic_lands[color_list[0]]] * 15
+    elif len(color_list) == 2:
+        return [basic_lands[color_list[0]]] * 8 + [basic_lands[color_list[1]]] * 7
+    elif len(color_list) == 3:
+        return [basic_lands[color_list[0]]] * 5 + [basic_lands[color_list[1]]] * 5 + [basic_lands[color_list[2]]] * 5
+    elif len(color_list) == 4:
+        return [basic_lands[color_list[0]]] * 4 + [basic_lands[color_list[1]]] * 4 + [basic_lands[color_list[2]]] * 4 + [basic_lands[color_list[3]]] * 3
+    return ["Basic land selection failed."]
+
+
+def add_lands(data: JumpstartData, deck: dict, rng=random) -> dict:
+    """Add the land base and basics for the deck's combined colour identity (in place)."""
+    commander1, commander2 = deck["commanders"]
+    print(f"🔎 Processing Deck: {commander1} + {commander2}")  # Debugging output
+
+    identities = deck.get("identities")
+    if identities is None:
+        # Parsed from 3CommanderHalfDecks.txt: fetch color identity for both commanders
+        color_identity1 = get_commander_color_identity(data, commander1)
+        color_identity2 = get_commander_color_identity(data, commander2)
+    else:
+        color_identity1, color_identity2 = (set(identity or "") for identity in identities)
+
+    # Ensure both are fetched before merging
+    if not color_identity1:
+        print(f"⚠️ ERROR: {commander1} has no detected color identity, assuming empty set.")
+    if not color_identity2:
+        print(f"⚠️ ERROR: {commander2} has no detected color identity, assuming empty set.")
+
+    # Combine and sort color identities before looking up land category
+    combined_identity = sorted_identity(color_identity1 | color_identity2)
+    print(f"🎨 {commander1} Identity: {color_identity1}, {commander2} Identity: {color_identity2}")
+    print(f"🟢 FINAL Combined Color Identity (Sorted): {combined_identity}")
+
+    deck["color_identity"] = combined_identity
+    with span("land_adding", identity=combined_identity):
+        deck["lands"] = select_lands(data, combined_identity, rng)
+        deck["basics"] = select_basic_lands(combined_identity)
+    count("cards_added.land_base", len(deck["lands"]))
+    count("cards_added.basics", len(deck["basics"]))
+    return deck
+
+
+def finish_decks(data: JumpstartData, decks, rng=random, path=None) -> list:
+    """add_lands for every deck of `decks` (any iterable, e.g. read_half_decks(), taken one at a time).
+    With `path`, each finished deck record is appended to that JSON Lines file as soon as it is done."""
+    finished = []
+    with open_records(path) as output:
+        for deck in decks:
+            finished.append(add_lands(data, deck, rng))
+            write_record(output, deck)
+    return finished
+
+
+def format_final_decks(decks) -> str:
+    """3JumpstartDecks.txt text for decks that went through add_lands."""
+    parts = []
+    for deck in decks:
+        commander1, commander2 = deck["commanders"]
+        lines = ["Commanders:", commander1, commander2, "", "Deck:"] + deck["cards"]
+        parts.append("\n".join(lines) + "\n")
+        parts.append("\n".join(deck["lands"]) + "\n")
+        parts.append("\n".join(deck["basics"]) + "\n")
+        parts.append(f"\n{DECK_SEPARATOR}\n")
+    return "".join(parts)
+
+
+def write_text(path: str, text: str, records_path: str = None):
+    """Write `text` to `path`; `records_path` names the records it was rendered from, whose
+    hash file then records the text so read_half_decks can tell a hand edit."""
+    with span("output_write", path=path, bytes=len(text)):
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        if records_path:
+            with open(rendered_hash_path(records_path), 'w', encoding='ascii') as file:
+                file.write(text_hash(text) + "\n")
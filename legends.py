@@ -0,0 +1,286 @@
+"""Commander catalogs: 2AllCommanders.txt and 3AllJumpstartCommanders.txt.
+
+2AllCommanders.txt lists every commander-legal card that can be a commander;
+3AllJumpstartCommanders.txt groups legendary creatures (and "can be your commander"
+planeswalkers) by mono- or two-colour identity. Both come out of one pass over the
+cards with bitmask matching (identity mask -> bucket is a dict lookup), from the local
+card index or a local AllPrintings.json:
+
+    python legends.py                       # both lists from the card index
+    python legends.py --scan-json           # stream AllPrintings.json instead
+    python legends.py --download            # stream MTGJSON's AllPrintings.json.xz, nothing kept in memory
+    python legends.py --refresh             # patch both lists from changed sets only (mtgjson_refresh)
+    python legends.py --max-colors 3        # add 3-colour buckets (Esper, Grixis, ...)
+
+2GenerateAllLegends.py and 3GenerateJumpstartLegends.py run the same main().
+
+The rules work on single card dicts, so a refresh can re-check just the cards it
+touched and patch both files in place (patch_commander_lists).
+"""
+import argparse
+import os
+import time
+
+import requests
+
+from cardindex import DEFAULT_MTGJSON_PATH, open_index
+from cardstream import find_mtgjson, iter_cards
+from cardtable import SUPERTYPE_BITS, TYPE_BITS, bitmask, identity_mask
+from tracing import span
+
+current_directory = os.path.dirname(os.path.abspath(__file__))
+ALL_COMMANDERS_PATH = os.path.join(current_directory, '2AllCommanders.txt')
+JUMPSTART_COMMANDERS_PATH = os.path.join(current_directory, '3AllJumpstartCommanders.txt')
+
+# What --download streams from the MTGJSON API directory
+DOWNLOAD_FILE_NAME = "AllPrintings.json.xz"
+
+# Card fields the rules look at (what --scan-json keeps of each printing)
+LEGEND_FIELDS = ("name", "colorIdentity", "types", "supertypes", "legalities", "leadershipSkills", "text")
+
+# Define valid mono-color and two-color identities
+COLOR_IDENTITIES = {
+    "White": ["W"],
+    "Blue": ["U"],
+    "Black": ["B"],
+    "Red": ["R"],
+    "Green": ["G"],
+    "Azorius": ["W", "U"],
+    "Dimir": ["U", "B"],
+    "Rakdos": ["B", "R"],
+    "Gruul": ["R", "G"],
+    "Selesnya": ["G", "W"],
+    "Orzhov": ["W", "B"],
+    "Izzet": ["U", "R"],
+    "Golgari": ["B", "G"],
+    "Boros": ["R", "W"],
+    "Simic": ["G", "U"]
+}
+
+# Optional wider buckets, named like the 3Landbases.txt categories
+EXTRA_COLOR_IDENTITIES = {
+    "Esper": ["W", "U", "B"],
+    "Grixis": ["U", "B", "R"],
+    "Jund": ["B", "R", "G"],
+    "Naya": ["W", "R", "G"],
+    "Bant": ["W", "U", "G"],
+    "Abzan": ["W", "B", "G"],
+    "Jeskai": ["W", "U", "R"],
+    "Sultai": ["U", "B", "G"],
+    "Mardu": ["W", "B", "R"],
+    "Temur": ["U", "R", "G"],
+    "NoGreen": ["W", "U", "B", "R"],
+    "NoBlue": ["W", "B", "R", "G"],
+    "NoWhite": ["U", "B", "R", "G"],
+    "NoRed": ["W", "U", "B", "G"],
+    "NoBlack": ["W", "U", "R", "G"],
+}
+ALL_COLOR_IDENTITIES = {**COLOR_IDENTITIES, **EXTRA_COLOR_IDENTITIES}
+
+LEGENDARY = SUPERTYPE_BITS["Legendary"]
+LAND_OR_ARTIFACT = bitmask(("Land", "Artifact"), TYPE_BITS)
+CREATURE = TYPE_BITS["Creature"]
+PLANESWALKER = TYPE_BITS["Planeswalker"]
+
+
+def color_categories(max_colors: int = 2) -> dict:
+    """Jumpstart buckets for identities of 1..`max_colors` colours, in file order."""
+    return {name: colors for name, colors in ALL_COLOR_IDENTITIES.items() if len(colors) <= max_colors}
+
+
+def category_masks(categories=COLOR_IDENTITIES) -> dict:
+    """Map of identity mask -> category name."""
+    return {identity_mask(colors): name for name, colors in categories.items()}
+
+
+DEFAULT_CATEGORY_MASKS = category_masks()
+
+
+def is_commander(card: dict) -> bool:
+    """Can be a commander and is legal in Commander (2AllCommanders.txt)."""
+    leadership = card.get("leadershipSkills") or {}
+    legality = card.get("legalities") or {}
+    return leadership.get("commander") is True and legality.get("commander") == "Legal"
+
+
+def jumpstart_category(card: dict, masks: dict = DEFAULT_CATEGORY_MASKS):
+    """3AllJumpstartCommanders.txt colour category of `card`, or None if it does not qualify."""
+    # Ensure the card is legendary
+    if not bitmask(card.get("supertypes", []), SUPERTYPE_BITS) & LEGENDARY:
+        return None
+
+    # Exclude legendary lands and artifacts
+    types = bitmask(card.get("types", []), TYPE_BITS)
+    if types & LAND_OR_ARTIFACT:
+        return None
+
+    # Must be legal in commander
+    if (card.get("legalities") or {}).get("commander") != "Legal":
+        return None
+
+    # Must be a legendary creature or planeswalker with commander text
+    if not types & CREATURE:
+        if not types & PLANESWALKER or "can be your commander" not in card.get("text", "").lower():
+            return None
+
+    return masks.get(identity_mask(card.get("colorIdentity", [])))
+
+
+def extract_commanders(cards, categories=COLOR_IDENTITIES) -> tuple:
+    """One pass over card dicts (printings or unique cards).
+    Returns (all commander names, {category: set of names}) for both catalogs.
+    """
+    masks = category_masks(categories)
+    all_commanders = set()
+    commanders_by_color = {key: set() for key in categories}
+    for card in cards:
+        name = card.get("name")
+        if not name:
+            continue
+        if is_commander(card):
+            all_commanders.add(name)
+        color_category = jumpstart_category(card, masks)
+        if color_category:
+            commanders_by_color[color_category].add(name)
+    return all_commanders, commanders_by_color
+
+
+# --- files ---
+
+def read_all_commanders(path: str = ALL_COMMANDERS_PATH) -> set:
+    with open(path, 'r', encoding='utf-8') as file:
+        return {line.strip() for line in file if line.strip() and not line.strip().endswith(":")}
+
+
+def write_all_commanders(names, path: str = ALL_COMMANDERS_PATH):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write("All Commanders:\n")
+        file.write("\n".join(sorted(names)))
+
+
+def read_jumpstart_commanders(path: str = JUMPSTART_COMMANDERS_PATH) -> dict:
+    commanders_by_color = {key: set() for key in COLOR_IDENTITIES}
+    current_category = None
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if line.endswith(":"):
+                current_category = line[:-1]
+                commanders_by_color.setdefault(current_category, set())
+            elif line and current_category:
+                commanders_by_color[current_category].add(line)
+    return commanders_by_color
+
+
+def write_jumpstart_commanders(commanders_by_color: dict, path: str = JUMPSTART_COMMANDERS_PATH):
+    with open(path, 'w', encoding='utf-8') as output_file:
+        for color_category, commanders in commanders_by_color.items():
+            output_file.write(f"{color_category}:\n")
+            output_file.write("\n".join(sorted(set(commanders))))
+            output_file.write("\n\n")
+
+
+def patch_commander_lists(card_index, names, all_commanders_path: str = ALL_COMMANDERS_PATH,
+                          jumpstart_path: str = JUMPSTART_COMMANDERS_PATH) -> tuple:
+    """Re-check `names` against the card index and patch both commander files in place.
+
+    Names missing from the index (no printing left) are dropped from both files. The
+    Jumpstart buckets already in the file are kept (including 3-/4-colour ones). A
+    missing file is regenerated from the whole index. Returns (added, removed) counts.
+    """
+    if not os.path.exists(all_commanders_path) or not os.path.exists(jumpstart_path):
+        all_commanders, commanders_by_color = extract_commanders(card_index.cards())
+        write_all_commanders(all_commanders, all_commanders_path)
+        write_jumpstart_commanders(commanders_by_color, jumpstart_path)
+        return len(all_commanders | set().union(*commanders_by_color.values())), 0
+
+    all_commanders = read_all_commanders(all_commanders_path)
+    commanders_by_color = read_jumpstart_commanders(jumpstart_path)
+    masks = category_masks({key: ALL_COLOR_IDENTITIES[key] for key in commanders_by_color if key in ALL_COLOR_IDENTITIES})
+
+    added = removed = 0
+    for name in names:
+        card = card_index.card(name)
+        was_listed = name in all_commanders or any(name in group for group in commanders_by_color.values())
+        all_commanders.discard(name)
+        for group in commanders_by_color.values():
+            group.discard(name)
+        listed = False
+        if card is not None and is_commander(card):
+            all_commanders.add(name)
+            listed = True
+        category = jumpstart_category(card, masks) if card is not None else None
+        if category:
+            commanders_by_color[category].add(name)
+            listed = True
+        added += listed and not was_listed
+        removed += was_listed and not listed
+
+    write_all_commanders(all_commanders, all_commanders_path)
+    write_jumpstart_commanders(commanders_by_color, jumpstart_path)
+    return added, removed
+
+
+def generate_commander_lists(cards, max_colors: int = 2, all_commanders_path: str = ALL_COMMANDERS_PATH,
+                             jumpstart_path: str = JUMPSTART_COMMANDERS_PATH) -> tuple:
+    """Write both catalogs from one pass over `cards`; returns (all_commanders, commanders_by_color)."""
+    with span("extraction", max_colors=max_colors) as s:
+        all_commanders, commanders_by_color = extract_commanders(cards, color_categories(max_colors))
+        s.set(commanders=len(all_commanders))
+    write_all_commanders(all_commanders, all_commanders_path)
+    write_jumpstart_commanders(commanders_by_color, jumpstart_path)
+    return all_commanders, commanders_by_color
+
+
+def local_cards(mtgjson_path: str = DEFAULT_MTGJSON_PATH, scan_json: bool = False):
+    """Card dicts from the card index (one per name), or every printing streamed from AllPrintings.json
+    (or its compressed copy)."""
+    if scan_json:
+        for _, card in iter_cards(find_mtgjson(mtgjson_path), fields=LEGEND_FIELDS):
+            yield card
+        return
+    with open_index(mtgjson_path) as card_index:
+        yield from card_index.cards()
+
+
+def downloaded_cards(source):
+    """Every printing streamed from `source`'s AllPrintings download, decompressed and parsed as it arrives."""
+    print(f"🌐 Streaming {DOWNLOAD_FILE_NAME} from {source.base}...")
+    with source.stream(DOWNLOAD_FILE_NAME) as f:
+        for _, card in iter_cards(f, fields=LEGEND_FIELDS):
+            yield card
+
+
+def main(argv=None):
+    from mtgjson_refresh import MTGJSON_BASE_URL, MTGJSONSource, refresh  # it imports this module
+
+    parser = argparse.ArgumentParser(description="Write 2AllCommanders.txt and 3AllJumpstartCommanders.txt in one pass.")
+    parser.add_argument("--mtgjson", default=DEFAULT_MTGJSON_PATH, help="local AllPrintings.json (or its card index)")
+    parser.add_argument("--scan-json", action="store_true", help="stream AllPrintings.json instead of the card index")
+    parser.add_argument("--download", action="store_true", help=f"stream {DOWNLOAD_FILE_NAME} from --source instead")
+    parser.add_argument("--refresh", action="store_true",
+                        help="patch the card index and both commander lists from changed sets only")
+    parser.add_argument("--source", default=MTGJSON_BASE_URL, help="MTGJSON API URL or local mirror directory")
+    parser.add_argument("--max-colors", type=int, choices=(2, 3, 4), default=2,
+                        help="largest identity with its own Jumpstart bucket")
+    args = parser.parse_args(argv)
+
+    started = time.time()
+    try:
+        with MTGJSONSource(args.source) as source:
+            if args.refresh:
+                refresh(args.mtgjson, source=source)
+                return
+            cards = downloaded_cards(source) if args.download else local_cards(args.mtgjson, args.scan_json)
+            all_commanders, commanders_by_color = generate_commander_lists(cards, args.max_colors)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ ERROR: Could not read from {args.source}: {e}")
+        exit(1)
+    jumpstart_count = sum(len(group) for group in commanders_by_color.values())
+    print(f"✅ {len(all_commanders)} commanders → {ALL_COMMANDERS_PATH}")
+    print(f"✅ {jumpstart_count} Jumpstart commanders in {len(commanders_by_color)} buckets → {JUMPSTART_COMMANDERS_PATH}")
+    print(f"⏱️ One pass in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""Persistent match history for 1TinyBlockAdjuster.py.
+
+Every 1decklist_* file is ingested once into 1MatchHistory.sqlite, which keeps
+per-card counters (times played, times in a winning deck, first/last week seen) so the
+weekly pool adjustment no longer depends on the files still being around:
+
+    1decklist_*.txt/.dek        one match: the decklists in the project folder
+    1matches/<match>/           an archive, one folder per match (any decklist files)
+    1matches/<match>.zip        ... or one .zip / .tar.gz of decklists per match
+                                (a name starting with YYYY-MM-DD dates the match)
+
+Decklists may be in any format decklists.py reads (Arena, MTGO, Moxfield, plain); only
+the commander, companion and main deck count as played. Card names are resolved against
+the card index in one batch per run, and names that do not resolve are reported rather
+than stored. The winning deck of a match is the file with "win" in its name, else the
+first file by name. Matches are bucketed into weeks (by name date, else file mtime);
+"now" is the week of the newest match ingested, so runs are reproducible.
+
+Files (and archives) are recognised by size/mtime and then by content hash: unchanged
+files are skipped, an edited file replaces what it contributed before, and a decklist
+deleted from its match (or a match deleted from 1matches/) is retracted. Overwriting the
+project-folder decklists in a later week records a new match rather than replacing the
+old one, so earlier weeks' project-folder matches stay after their files are gone.
+"""
+import datetime
+import hashlib
+import os
+import re
+import sqlite3
+from collections import Counter
+
+from decklists import is_archive, is_decklist, iter_archive, parse_decklist, played_names
+
+current_directory = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY_PATH = os.path.join(current_directory, "1MatchHistory.sqlite")
+DEFAULT_ARCHIVE_DIR = os.path.join(current_directory, "1matches")
+
+# Bump when the table layout changes; old stores get recreated
+SCHEMA_VERSION = 1
+
+DECKLIST_PREFIX = "1decklist_"
+LATEST_MATCH_PREFIX = "latest/"  # match ids of the project-folder decklists, one per week
+
+# Pool rules (see MatchHistory.pool)
+DEFAULT_DECAY = 0.5              # weight of a play one week older than the newest match
+DEFAULT_RETENTION_WEEKS = 1      # keep cards played in the newest N weeks (1 = newest week only)
+DEFAULT_WINNER_COOLDOWN_WEEKS = 1  # drop cards that were in a winning deck in the newest N weeks
+DEFAULT_MIN_SCORE = 0.0          # drop cards whose decayed play score is below this
+
+MATCH_DATE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})')
+
+
+def week_of(day: datetime.date) -> int:
+    """Week number (weeks since 0001-01-01, starting on Mondays)."""
+    return (day.toordinal() - 1) // 7
+
+
+def week_start(week: int) -> datetime.date:
+    return datetime.date.fromordinal(week * 7 + 1)
+
+
+def decklist_files(directory: str, prefix: str = "") -> list:
+    """Decklist files directly in `directory` whose names start with `prefix`, sorted by name."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, file_name) for file_name in os.listdir(directory)
+        if file_name.startswith(prefix) and is_decklist(file_name)
+    )
+
+
+def winning_file(paths):
+    """The winning decklist of a match: the file with "win" in its name, else the first."""
+    for path in paths:
+        if "win" in os.path.basename(path).lower():
+            return path
+    return paths[0] if paths else None
+
+
+def match_week(match_name: str, paths) -> int:
+    """Week of a match: from a leading YYYY-MM-DD in its name, else the newest file mtime."""
+    found = MATCH_DATE.match(match_name)
+    if found:
+        try:
+            return week_of(datetime.date(*map(int, found.groups())))
+        except ValueError:
+            pass
+    newest = max(os.stat(path).st_mtime for path in paths)
+    return week_of(datetime.date.fromtimestamp(newest))
+
+
+def find_matches(directory: str = current_directory, archive_dir: str = DEFAULT_ARCHIVE_DIR) -> list:
+    """[(match id, week, decklist paths or archive path)] for the project folder and the archive."""
+    matches = []
+    paths = decklist_files(directory, DECKLIST_PREFIX)
+    if paths:
+        week = match_week("", paths)
+        # Keyed by week, so next week's overwritten files count as a new match
+        matches.append((f"{LATEST_MATCH_PREFIX}{week_start(week).isoformat()}", week, paths))
+    if os.path.isdir(archive_dir):
+        for match_name in sorted(os.listdir(archive_dir)):
+            path = os.path.join(archive_dir, match_name)
+            if is_archive(path):
+                matches.append((match_name, match_week(match_name, [path]), path))
+            else:
+                paths = decklist_files(path)
+                if paths:
+                    matches.append((match_name, match_week(match_name, paths), paths))
+    return matches
+
+
+def _fingerprint(path: str) -> str:
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _reader(path: str):
+    def read():
+        with open(path, 'rb') as file:
+            return file.read()
+    return read
+
+
+def _create_schema(conn):
+    conn.executescript("""
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE decklists (
+            match TEXT NOT NULL,
+            file TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            sha256 TEXT NOT NULL,
+            week INTEGER NOT NULL,
+            won INTEGER NOT NULL,
+            PRIMARY KEY (match, file)
+        );
+        CREATE TABLE deck_cards (
+            match TEXT NOT NULL,
+            file TEXT NOT NULL,
+            name TEXT NOT NULL,
+            PRIMARY KEY (match, file, name)
+        ) WITHOUT ROWID;
+        CREATE TABLE card_weeks (
+            name TEXT NOT NULL,
+            week INTEGER NOT NULL,
+            played INTEGER NOT NULL,
+            wins INTEGER NOT NULL,
+            PRIMARY KEY (name, week)
+        ) WITHOUT ROWID;
+        CREATE TABLE cards (
+            name TEXT PRIMARY KEY,
+            played INTEGER NOT NULL,
+            wins INTEGER NOT NULL,
+            first_week INTEGER NOT NULL,
+            last_week INTEGER NOT NULL,
+            last_win_week INTEGER
+        );
+        CREATE INDEX card_weeks_week ON card_weeks (week);
+    """)
+    conn.execute("INSERT INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+
+
+class MatchHistory:
+    """Per-card play/win counters over every ingested match, stored in SQLite."""
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        version = None
+        if self.conn.execute("SELECT name FROM sqlite_master WHERE name = 'meta'").fetchone():
+            version = self.conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if version is None or version[0] != str(SCHEMA_VERSION):
+            # Unknown layout: start over (the decklists are re-ingested on the next run)
+            self.conn.close()
+            if os.path.exists(path):
+                os.remove(path)
+            self.conn = sqlite3.connect(path)
+            _create_schema(self.conn)
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- ingestion ---
+
+    def ingest(self, directory: str = current_directory, archive_dir: str = DEFAULT_ARCHIVE_DIR, resolver=None) -> dict:
+        """Ingest new or changed decklists.
+
+        `resolver` (a cardnames.NameResolver) maps spellings to card index names in one
+        batch; without it names are stored as written. Decklists that are no longer there are
+        retracted (see the module docstring). Returns {"matches", "new", "updated", "unchanged",
+        "removed"} counts and "unresolved", a Counter of unresolved name -> decklists.
+        """
+        summary = {"matches": 0, "new": 0, "updated": 0, "unchanged": 0, "removed": 0, "unresolved": Counter()}
+        pending = []
+        present = {}  # match -> its decklist file names, for matches whose files were listed
+        with self.conn:
+            for match, week, source in find_matches(directory, archive_dir):
+                summary["matches"] += 1
+                present[match] = None  # unchanged archive: its members are the stored ones
+                if isinstance(source, str):
+                    # One archive per match: skip it unopened while it is unchanged
+                    fingerprint = _fingerprint(source)
+                    stored = self.conn.execute(
+                        "SELECT DISTINCT fingerprint FROM decklists WHERE match = ?", (match,)).fetchall()
+                    if stored == [(fingerprint,)]:
+                        summary["unchanged"] += self.conn.execute(
+                            "SELECT COUNT(*) FROM decklists WHERE match = ?", (match,)).fetchone()[0]
+                        continue
+                    entries = [(member, fingerprint, lambda data=data: data) for member, data in iter_archive(source)]
+                else:
+                    entries = [(os.path.basename(path), _fingerprint(path), _reader(path)) for path in source]
+                present[match] = {file_name for file_name, _, _ in entries}
+                winner = winning_file(sorted(file_name for file_name, _, _ in entries))
+                for file_name, fingerprint, read in entries:
+                    won = int(file_name == winner)
+                    row = self.conn.execute(
+                        "SELECT fingerprint, sha256, week, won FROM decklists WHERE match = ? AND file = ?",
+                        (match, file_name),
+                    ).fetchone()
+                    if row and row[0] == fingerprint and row[2:] == (week, won):
+                        summary["unchanged"] += 1
+                        continue
+                    content = read()
+                    sha256 = hashlib.sha256(content).hexdigest()
+                    if row and row[1:] == (sha256, week, won):
+                        # Touched but not edited: just remember the new fingerprint
+                        self.conn.execute("UPDATE decklists SET fingerprint = ? WHERE match = ? AND file = ?",
+                                          (fingerprint, match, file_name))
+                        summary["unchanged"] += 1
+                        continue
+                    summary["updated" if row else "new"] += 1
+                    pending.append((match, file_name, fingerprint, sha256, week, won, row,
+                                    played_names(parse_decklist(content, file_name))))
+
+            # Resolve every new spelling in one batch
+            if resolver is not None:
+                resolved, _ = resolver.resolve({name for *_, names in pending for name in names})
+            touched = set()
+            for match, file_name, week, won in self._missing(present):
+                touched |= self._retract(match, file_name, week, won)
+                self.conn.execute("DELETE FROM decklists WHERE match = ? AND file = ?", (match, file_name))
+                summary["removed"] += 1
+            for match, file_name, fingerprint, sha256, week, won, row, raw_names in pending:
+                if row:
+                    touched |= self._retract(match, file_name, row[2], row[3])
+                if resolver is not None:
+                    summary["unresolved"].update(name for name in raw_names if name not in resolved)
+                    names = {resolved[name] for name in raw_names if name in resolved}
+                else:
+                    names = raw_names
+                self.conn.execute("INSERT OR REPLACE INTO decklists VALUES (?, ?, ?, ?, ?, ?)",
+                                  (match, file_name, fingerprint, sha256, week, won))
+                self.conn.executemany("INSERT INTO deck_cards VALUES (?, ?, ?)",
+                                      [(match, file_name, name) for name in names])
+                self.conn.executemany("""
+                    INSERT INTO card_weeks VALUES (?, ?, 1, ?)
+                    ON CONFLICT (name, week) DO UPDATE SET played = played + 1, wins = wins + excluded.wins
+                """, [(name, week, won) for name in names])
+                touched |= names
+            self._refresh_cards(touched)
+        return summary
+
+    def _missing(self, present: dict) -> list:
+        """(match, file, week, won) of stored decklists that are gone: files no longer in a
+        listed match, and archived matches no longer in the archive. Earlier weeks'
+        project-folder matches are kept (their files are overwritten every week)."""
+        missing = []
+        for match, file_name, week, won in self.conn.execute("SELECT match, file, week, won FROM decklists").fetchall():
+            if match in present:
+                files = present[match]
+                if files is not None and file_name not in files:
+                    missing.append((match, file_name, week, won))
+            elif not match.startswith(LATEST_MATCH_PREFIX):
+                missing.append((match, file_name, week, won))
+        return missing
+
+    def _retract(self, match: str, file_name: str, week: int, won: int) -> set:
+        """Undo what one decklist contributed; returns its card names."""
+        names = {name for (name,) in self.conn.execute(
+            "SELECT name FROM deck_cards WHERE match = ? AND file = ?", (match, file_name))}
+        self.conn.executemany("UPDATE card_weeks SET played = played - 1, wins = wins - ? WHERE name = ? AND week = ?",
+                              [(won, name, week) for name in names])
+        self.conn.execute("DELETE FROM card_weeks WHERE played <= 0")
+        self.conn.execute("DELETE FROM deck_cards WHERE match = ? AND file = ?", (match, file_name))
+        return names
+
+    def _refresh_cards(self, names):
+        """Recompute the lifetime counters of `names` from their weekly rows."""
+        for name in names:
+            row = self.conn.execute("""
+                SELECT SUM(played), SUM(wins), MIN(week), MAX(week), MAX(CASE WHEN wins > 0 THEN week END)
+                FROM card_weeks WHERE name = ?
+            """, (name,)).fetchone()
+            if row[0]:
+                self.conn.execute("INSERT OR REPLACE INTO cards VALUES (?, ?, ?, ?, ?, ?)", (name, *row))
+            else:
+                self.conn.execute("DELETE FROM cards WHERE name = ?", (name,))
+
+    # --- queries ---
+
+    @property
+    def current_week(self):
+        """Week of the newest ingested match, or None if the history is empty."""
+        return self.conn.execute("SELECT MAX(week) FROM decklists").fetchone()[0]
+
+    def card(self, name: str):
+        """Lifetime counters of `name` as a dict, or None if it was never played."""
+        row = self.conn.execute(
+            "SELECT played, wins, first_week, last_week, last_win_week FROM cards WHERE name = ?", (name,)
+        ).fetchone()
+        if not row:
+            return None
+        played, wins, first_week, last_week, last_win_week = row
+        return {
+            "played": played,
+            "wins": wins,
+            "first_seen": week_start(first_week).isoformat(),
+            "last_seen": week_start(last_week).isoformat(),
+            "weeks_since_seen": self.current_week - last_week,
+            "weeks_since_win": self.current_week - last_win_week if last_win_week is not None else None,
+        }
+
+    def pool(self, retention_weeks: int = DEFAULT_RETENTION_WEEKS, winner_cooldown_weeks: int = DEFAULT_WINNER_COOLDOWN_WEEKS,
+             decay: float = DEFAULT_DECAY, min_score: float = DEFAULT_MIN_SCORE) -> list:
+        """Card names to keep, best first, as [(name, score)].
+
+        Keeps cards played in the newest `retention_weeks` weeks, minus cards that were in
+        a winning deck in the newest `winner_cooldown_weeks` weeks. A card's score sums its
+        plays, each weighted by `decay` ** (weeks before the newest match); cards scoring
+        below `min_score` are dropped. Only the weekly rows inside those windows are read,
+        so the cost follows the recent pool, not the whole history or card universe.
+        """
+        now = self.current_week
+        if now is None or retention_weeks <= 0:
+            return []
+        window = max(retention_weeks, winner_cooldown_weeks)
+        scores = {}
+        recent_winners = set()
+        for name, week, played, wins in self.conn.execute(
+                "SELECT name, week, played, wins FROM card_weeks WHERE week > ?", (now - window,)):
+            age = now - week
+            if age < retention_weeks:
+                scores[name] = scores.get(name, 0.0) + played * decay ** age
+            if wins and age < winner_cooldown_weeks:
+                recent_winners.add(name)
+        kept = [(name, score) for name, score in scores.items()
+                if name not in recent_winners and score >= min_score]
+        return sorted(kept, key=lambda item: (-item[1], item[0]))
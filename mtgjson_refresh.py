@@ -0,0 +1,274 @@
+"""Incremental per-set refresh of the card index from MTGJSON.
+
+Instead of downloading the whole of AllPrintings.json (~500 MB) to pick up one new
+set, compare the local set list against the upstream manifest (Meta.json,
+SetList.json and the per-set <CODE>.json.sha256 checksums), fetch only the sets that
+are new or changed as individual <CODE>.json files, patch the card index in place
+and re-check just the touched cards in 2AllCommanders.txt and
+3AllJumpstartCommanders.txt:
+
+    python mtgjson_refresh.py                         # refresh from mtgjson.com
+    python mtgjson_refresh.py --full                  # re-fetch every set
+
+The upstream can be any directory laid out like https://mtgjson.com/api/v5/, either a
+URL or a local path. A local stand-in is written from an AllPrintings.json with
+
+    python mtgjson_refresh.py mirror AllPrintings.json --out mtgjson_mirror
+    python mtgjson_refresh.py --source mtgjson_mirror
+
+(MTGJSON_BASE_URL sets the default source.) A freshly built index does not know the
+upstream checksums yet; when its MTGJSON version matches the upstream one they are
+adopted without fetching, otherwise the first refresh re-fetches every set.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+
+from cardindex import CARD_FIELDS, DEFAULT_MTGJSON_PATH, CardIndex, default_index_path, open_index, patch_index
+from cardstream import compression_of, find_mtgjson, is_available, iter_sets, open_text, project, read_meta, text_stream
+from edhrec import make_session
+from legends import ALL_COMMANDERS_PATH, JUMPSTART_COMMANDERS_PATH, patch_commander_lists
+from tracing import span
+
+current_directory = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASE_URL = "https://mtgjson.com/api/v5"
+MTGJSON_BASE_URL = os.environ.get("MTGJSON_BASE_URL", DEFAULT_BASE_URL)
+DEFAULT_MIRROR_DIR = os.path.join(current_directory, "mtgjson_mirror")
+
+DEFAULT_CONCURRENCY = 8
+REQUEST_TIMEOUT = 60
+
+# Set fields written to mirrored set files and SetList.json
+MIRROR_SET_FIELDS = ("baseSetSize", "code", "name", "releaseDate", "totalSetSize", "type")
+
+# Set codes that are reserved file names on Windows; MTGJSON appends "_" to them
+RESERVED_FILE_NAMES = {"CON", "PRN", "AUX", "NUL"}
+
+
+def set_file_name(set_code: str) -> str:
+    return f"{set_code}_.json" if set_code.upper() in RESERVED_FILE_NAMES else f"{set_code}.json"
+
+
+class MTGJSONSource:
+    """An MTGJSON API directory: an http(s) URL or a local directory laid out the same way."""
+
+    def __init__(self, base: str = MTGJSON_BASE_URL, concurrency: int = DEFAULT_CONCURRENCY):
+        self.base = base.rstrip("/")
+        self.is_local = not self.base.startswith(("http://", "https://"))
+        self.session = None if self.is_local else make_session(concurrency)
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def read(self, file_name: str):
+        """Raw bytes of `file_name`, or None if the source does not have it."""
+        if self.is_local:
+            path = os.path.join(self.base, file_name)
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+        res = self.session.get(f"{self.base}/{file_name}", timeout=REQUEST_TIMEOUT)
+        if res.status_code == 404:
+            return None
+        res.raise_for_status()
+        return res.content
+
+    @contextmanager
+    def stream(self, file_name: str):
+        """Text stream of `file_name`, decompressed on the fly by its suffix (AllPrintings.json.xz, ...)."""
+        if self.is_local:
+            with open_text(os.path.join(self.base, file_name)) as f:
+                yield f
+            return
+        with self.session.get(f"{self.base}/{file_name}", timeout=REQUEST_TIMEOUT, stream=True) as res:
+            res.raise_for_status()
+            res.raw.decode_content = True
+            with text_stream(res.raw, compression_of(file_name)) as f:
+                yield f
+
+    def json(self, file_name: str):
+        body = self.read(file_name)
+        return json.loads(body) if body is not None else None
+
+    def meta(self) -> dict:
+        """Upstream {"date", "version"} from Meta.json."""
+        doc = self.json("Meta.json") or {}
+        return doc.get("data") or doc.get("meta") or {}
+
+    def checksum(self, set_code: str):
+        body = self.read(set_file_name(set_code) + ".sha256")
+        return body.decode("ascii").split()[0] if body else None
+
+    def manifest(self, concurrency: int = DEFAULT_CONCURRENCY) -> dict:
+        """Map of set code -> {"name", "releaseDate", "totalSetSize", "checksum"}."""
+        set_list = (self.json("SetList.json") or {}).get("data", [])
+        codes = [entry["code"] for entry in set_list]
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            checksums = list(pool.map(self.checksum, codes))
+        return {
+            entry["code"]: {
+                "name": entry.get("name"),
+                "releaseDate": entry.get("releaseDate"),
+                "totalSetSize": entry.get("totalSetSize"),
+                "checksum": checksum,
+            }
+            for entry, checksum in zip(set_list, checksums)
+        }
+
+    def fetch_set(self, set_code: str):
+        """(set_code, set dict) with the cards projected to CARD_FIELDS, like cardstream.iter_sets."""
+        with span("set_fetch", set_code=set_code) as s:
+            set_data = (self.json(set_file_name(set_code)) or {}).get("data", {})
+            s.set(cards=len(set_data.get("cards", [])))
+        return set_code, {
+            "name": set_data.get("name"),
+            "releaseDate": set_data.get("releaseDate"),
+            "totalSetSize": set_data.get("totalSetSize"),
+            "cards": [project(card, CARD_FIELDS) for card in set_data.get("cards", [])],
+        }
+
+
+def plan_refresh(local_sets: dict, upstream_sets: dict, same_version: bool, full: bool = False) -> tuple:
+    """Split the upstream manifest into (changed, removed, adopted) set codes.
+
+    A set is changed when it is new, when both sides know its checksum and they differ,
+    or, without an upstream checksum, when its release date or size differ. Local sets
+    without a checksum are adopted as-is when the MTGJSON versions match.
+    """
+    changed, adopted = [], []
+    for code, upstream in upstream_sets.items():
+        local = local_sets.get(code)
+        if full or local is None:
+            changed.append(code)
+        elif upstream["checksum"] and local["checksum"]:
+            if upstream["checksum"] != local["checksum"]:
+                changed.append(code)
+        elif upstream["checksum"] and same_version:
+            adopted.append(code)
+        elif upstream["checksum"] or (upstream["releaseDate"], upstream["totalSetSize"]) != (
+                local["releaseDate"], local["totalSetSize"]):
+            changed.append(code)
+    removed = sorted(set(local_sets) - set(upstream_sets))
+    return changed, removed, adopted
+
+
+def _fetch_sets(source: MTGJSONSource, codes, concurrency: int):
+    """Fetch `codes` concurrently, yielding in order; at most a few batches are held in memory."""
+    batch = concurrency * 4
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(0, len(codes), batch):
+            for set_code, set_data in pool.map(source.fetch_set, codes[i:i + batch]):
+                print(f"📥 {set_code}: {len(set_data['cards'])} cards")
+                yield set_code, set_data
+
+
+def refresh(mtgjson_path: str = DEFAULT_MTGJSON_PATH, index_path: str = None, source: MTGJSONSource = None,
+            full: bool = False, concurrency: int = DEFAULT_CONCURRENCY,
+            all_commanders_path: str = ALL_COMMANDERS_PATH, jumpstart_path: str = JUMPSTART_COMMANDERS_PATH) -> dict:
+    """Bring the card index and the commander lists up to date with `source`; returns a summary dict."""
+    started = time.time()
+    index_path = index_path or default_index_path(mtgjson_path)
+    source = source or MTGJSONSource(concurrency=concurrency)
+
+    local_sets, local_version = {}, ""
+    if os.path.exists(index_path) or is_available(find_mtgjson(mtgjson_path)):
+        with open_index(mtgjson_path, index_path) as card_index:
+            local_sets, local_version = card_index.sets(), card_index.meta_version
+
+    upstream_meta = source.meta()
+    same_version = bool(local_version) and local_version == upstream_meta.get("version")
+    summary = {"version": upstream_meta.get("version", ""), "changed": [], "removed": [], "adopted": 0, "cards": 0}
+    if same_version and not full and local_sets and all(s["checksum"] for s in local_sets.values()):
+        print(f"✅ Card index is up to date (MTGJSON {local_version})")
+        return summary
+
+    print(f"🌐 Comparing {len(local_sets)} local sets against {source.base} (MTGJSON {summary['version']})...")
+    upstream_sets = source.manifest(concurrency)
+    changed, removed, adopted = plan_refresh(local_sets, upstream_sets, same_version, full)
+    print(f"🔄 {len(changed)} changed, {len(removed)} removed, {len(adopted)} unchanged sets to record")
+
+    checksums = {code: upstream_sets[code]["checksum"] for code in changed + adopted if upstream_sets[code]["checksum"]}
+    with span("index_patch", changed=len(changed), removed=len(removed)) as s:
+        touched = patch_index(index_path, _fetch_sets(source, changed, concurrency), removed, checksums, upstream_meta)
+        s.set(cards=len(touched))
+
+    if touched:
+        with span("extraction", cards=len(touched)), CardIndex(index_path) as card_index:
+            added, dropped = patch_commander_lists(card_index, touched, all_commanders_path, jumpstart_path)
+        print(f"📝 Commander lists: +{added} / -{dropped}")
+
+    summary.update(changed=changed, removed=removed, adopted=len(adopted), cards=len(touched))
+    print(f"✅ Refreshed {len(changed)} sets ({len(touched)} cards) in {time.time() - started:.1f}s → {index_path}")
+    return summary
+
+
+# --- local stand-in ---
+
+def write_mirror(mtgjson_path: str, out_dir: str = DEFAULT_MIRROR_DIR) -> int:
+    """Split an AllPrintings.json into an MTGJSON-style directory (Meta.json, SetList.json,
+    <CODE>.json and <CODE>.json.sha256) that refresh() can use as its source."""
+    os.makedirs(out_dir, exist_ok=True)
+    mtgjson_path = find_mtgjson(mtgjson_path)
+    meta = read_meta(mtgjson_path)
+    set_list = []
+    for set_code, set_data in iter_sets(mtgjson_path, set_fields=MIRROR_SET_FIELDS):
+        write_set_file(out_dir, set_code, set_data, meta)
+        set_list.append({key: set_data[key] for key in MIRROR_SET_FIELDS if key in set_data})
+    with open(os.path.join(out_dir, "SetList.json"), "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "data": set_list}, f, ensure_ascii=False)
+    with open(os.path.join(out_dir, "Meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "data": meta}, f, ensure_ascii=False)
+    return len(set_list)
+
+
+def write_set_file(out_dir: str, set_code: str, set_data: dict, meta: dict):
+    """Write one mirrored set file and its checksum."""
+    body = json.dumps({"meta": meta, "data": set_data}, ensure_ascii=False).encode("utf-8")
+    file_name = set_file_name(set_code)
+    with open(os.path.join(out_dir, file_name), "wb") as f:
+        f.write(body)
+    with open(os.path.join(out_dir, file_name + ".sha256"), "w", encoding="ascii") as f:
+        f.write(hashlib.sha256(body).hexdigest())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mtgjson", default=DEFAULT_MTGJSON_PATH, help="AllPrintings.json the index belongs to")
+    parser.add_argument("--source", default=MTGJSON_BASE_URL, help="MTGJSON API URL or local mirror directory")
+    parser.add_argument("--full", action="store_true", help="re-fetch every set")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    commands = parser.add_subparsers(dest="command")
+
+    mirror = commands.add_parser("mirror", help="write a local MTGJSON stand-in from an AllPrintings.json")
+    mirror.add_argument("mtgjson_file", nargs="?", default=None, help="AllPrintings.json (default: --mtgjson)")
+    mirror.add_argument("--out", default=DEFAULT_MIRROR_DIR, help="mirror directory")
+
+    args = parser.parse_args(argv)
+    if args.command == "mirror":
+        mtgjson_path = args.mtgjson_file or args.mtgjson
+        print(f"✅ Mirrored {write_mirror(mtgjson_path, args.out)} sets into {args.out}")
+        return
+    try:
+        with MTGJSONSource(args.source, args.concurrency) as source:
+            refresh(args.mtgjson, source=source, full=args.full, concurrency=args.concurrency)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ ERROR: Could not refresh from {args.source}: {e}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
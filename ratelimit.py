@@ -0,0 +1,225 @@
+"""Adaptive request scheduling: AIMD concurrency, retries with backoff, circuit breaker.
+
+A RequestScheduler sits between a client's threads and the network (EDHRECClient
+sends every request through one). It keeps asking the upstream for as many pages a
+second as it will serve without throttling us:
+
+    limit      requests in flight. Starts at the pool size; +1 per round trip of
+               quick successes (additive increase), x0.5 on 429/503, x0.8 on other
+               failures and when latency climbs well above the fastest seen
+               (multiplicative decrease), at most once per round trip
+    pause      a Retry-After header holds back every request, not just the throttled one
+    retries    429, 5xx, timeouts and connection errors are retried with full-jitter
+               exponential backoff while the request's time budget lasts
+    breaker    after BREAKER_THRESHOLD failures in a row (5xx, timeouts, connection errors;
+               503 counts too, 429 does not) the circuit opens and requests
+               fail fast with CircuitOpenError for BREAKER_COOLDOWN seconds; one probe
+               request then closes it again or re-opens it
+
+Per-run statistics are kept in `stats` (summary() formats them) and counted in the
+trace report under "<name>.<stat>".
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from tracing import count
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+THROTTLE_STATUS = {429, 503}
+
+DEFAULT_TIME_BUDGET = 120.0  # seconds from a request's first attempt after which it is not retried
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 0.5  # first retry waits up to this long, doubling per attempt...
+BACKOFF_CAP = 30.0  # ... up to this
+LATENCY_TOLERANCE = 3.0  # latency this many times the fastest seen counts as congestion
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestScheduler:
+    """Schedules requests from many threads (see the module docstring); thread-safe."""
+
+    def __init__(self, max_concurrency: int = 8, time_budget: float = DEFAULT_TIME_BUDGET,
+                 max_attempts: int = MAX_ATTEMPTS, transient=(OSError,), name: str = "requests", rng=None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.time_budget = time_budget
+        self.max_attempts = max(1, max_attempts)
+        self.transient = transient
+        self.name = name
+        self.limit = float(self.max_concurrency)
+        self.stats = {"requests": 0, "ok": 0, "throttled": 0, "errors": 0, "retries": 0, "gave_up": 0,
+                      "rejected": 0, "breaker_trips": 0, "peak_in_flight": 0, "min_limit": self.limit}
+        self._rng = rng or random.Random()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._fastest = None  # lowest latency seen: the uncongested round trip
+        self._smoothed = None  # latency EWMA: how long "one round trip" is
+        self._last_decrease = 0.0
+        self._failures = 0  # in a row
+        self._opened_at = None
+        self._probing = False
+        self._started = None
+        self._finished = None
+
+    def _count(self, stat: str, n: int = 1):
+        self.stats[stat] += n
+        count(f"{self.name}.{stat}", n)
+
+    # --- public ---
+
+    def request(self, send):
+        """Send a request with `send()` (returns a response with .status_code and .headers).
+
+        Returns the last response, which can still carry a retryable status once the
+        attempts or the time budget run out. Re-raises the last transient exception,
+        and raises CircuitOpenError without sending while the upstream is considered down.
+        """
+        attempt = 0
+        deadline = time.monotonic() + self.time_budget
+        while True:
+            attempt += 1
+            self._acquire()
+            started = time.monotonic()
+            try:
+                response = send()
+            except self.transient:
+                self._release("error", time.monotonic() - started)
+                if not self._retry(attempt, None, deadline):
+                    raise
+                continue
+            except BaseException:
+                self._release(None, time.monotonic() - started)
+                raise
+            status = response.status_code
+            retry_after = parse_retry_after(response.headers.get("Retry-After")) if status in RETRYABLE_STATUS else None
+            if status == 503:
+                outcome = "unavailable"  # throttling or an outage: back off hard and count toward the breaker
+            elif status in THROTTLE_STATUS:
+                outcome = "throttled"
+            elif status >= 500:
+                outcome = "error"
+            else:
+                outcome = "ok"
+            self._release(outcome, time.monotonic() - started, retry_after)
+            if status not in RETRYABLE_STATUS or not self._retry(attempt, retry_after, deadline):
+                return response
+
+    def summary(self) -> str:
+        with self._cond:
+            stats = dict(self.stats)
+            elapsed = (self._finished or 0.0) - (self._started or 0.0)
+        stats["min_limit"] = round(stats["min_limit"], 1)
+        stats["limit"] = round(self.limit, 1)
+        stats["per_s"] = round(stats["ok"] / elapsed, 1) if elapsed > 0 else 0.0
+        return ", ".join(f"{key}={value}" for key, value in stats.items())
+
+    # --- limiter and breaker ---
+
+    def _acquire(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._opened_at is not None:
+                    if now - self._opened_at < BREAKER_COOLDOWN or self._probing:
+                        self._count("rejected")
+                        raise CircuitOpenError(f"{self.name}: upstream failing, circuit open")
+                    # Half-open: let exactly one probe through, whatever the limit
+                    self._probing = True
+                    break
+                if now < self._paused_until:
+                    self._cond.wait(self._paused_until - now)
+                elif self._in_flight >= int(self.limit):
+                    self._cond.wait()
+                else:
+                    break
+            self._in_flight += 1
+            self._count("requests")
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self._in_flight)
+            if self._started is None:
+                self._started = now
+
+    def _release(self, outcome, latency: float, retry_after=None):
+        with self._cond:
+            now = time.monotonic()
+            self._in_flight -= 1
+            self._finished = now
+            if outcome == "ok":
+                self._count("ok")
+                self._on_success(now, latency)
+            elif outcome in ("throttled", "unavailable"):
+                self._count("throttled")
+                if outcome == "unavailable":
+                    self._on_failure(now, 0.5)
+                else:
+                    self._decrease(now, 0.5)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+            elif outcome == "error":
+                self._count("errors")
+                self._on_failure(now, 0.8)
+            if self._probing and outcome != "ok":
+                self._probing = False
+                self._opened_at = now
+            self._cond.notify_all()
+
+    def _on_success(self, now: float, latency: float):
+        self._failures = 0
+        if self._opened_at is not None:
+            self._opened_at = None
+            self._probing = False
+        self._fastest = latency if self._fastest is None else min(self._fastest, latency)
+        self._smoothed = latency if self._smoothed is None else 0.8 * self._smoothed + 0.2 * latency
+        if latency > LATENCY_TOLERANCE * max(self._fastest, 0.001):
+            self._decrease(now, 0.8)
+        else:
+            self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+
+    def _on_failure(self, now: float, factor: float):
+        self._failures += 1
+        self._decrease(now, factor)
+        if self._failures >= BREAKER_THRESHOLD and self._opened_at is None:
+            self._opened_at = now
+            self._count("breaker_trips")
+
+    def _decrease(self, now: float, factor: float):
+        # Responses to one burst arrive together: back off once per round trip, not per response
+        if now - self._last_decrease < (self._smoothed or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(1.0, self.limit * factor)
+        self.stats["min_limit"] = min(self.stats["min_limit"], self.limit)
+
+    # --- retries ---
+
+    def _retry(self, attempt: int, retry_after, deadline: float) -> bool:
+        """Sleep before the next attempt; False when out of attempts or past the request's `deadline`."""
+        delay = self._rng.uniform(0.0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempt - 1)))
+        delay = max(delay, retry_after or 0.0)
+        with self._cond:
+            if attempt >= self.max_attempts or time.monotonic() + delay > deadline or self._opened_at is not None:
+                self._count("gave_up")
+                return False
+            self._count("retries")
+        time.sleep(delay)
+        return True
@@ -0,0 +1,117 @@
+"""Without-replacement sampling over precomputed card arrays.
+
+sample_without_replacement draws `count` distinct items in one pass, skipping
+excluded names, and simply returns fewer items when the pool runs out. It replaces
+`random.choice(list(pool))` retry loops, which are O(n²) and never terminate when the
+pool is smaller than the shortfall.
+
+stratified_sample does the same with quotas per stratum (e.g. colour identity x card
+type), so a filler can keep the cube colour-balanced at no extra cost.
+"""
+import random
+
+import numpy as np
+
+from cardtable import COLOR_BITS
+
+MONO_COLORS = ("W", "U", "B", "R", "G")
+_MASK_TO_MONO = {bit: color for color, bit in COLOR_BITS.items()}
+
+
+def sample_without_replacement(items, count: int, exclude=(), rng=random) -> list:
+    """Up to `count` distinct random items of `items` that are not in `exclude`."""
+    if count <= 0:
+        return []
+    exclude = exclude if isinstance(exclude, (set, frozenset, dict)) else set(exclude)
+    candidates = [item for item in items if item not in exclude]
+    return rng.sample(candidates, min(count, len(candidates)))
+
+
+def allocate_quotas(available: dict, weights: dict, count: int) -> dict:
+    """Split `count` across strata in proportion to `weights`, capped by `available`.
+
+    Uses largest-remainder rounding; whatever a capped stratum cannot take is handed
+    to the strata that still have room, so the total is min(count, sum(available)).
+    """
+    quotas = {key: 0 for key in available}
+    remaining = min(count, sum(available.values()))
+    open_keys = [key for key in available if available[key] > 0]
+    while remaining > 0 and open_keys:
+        total_weight = sum(weights.get(key, 0) for key in open_keys)
+        if total_weight <= 0:
+            # No weight left on the open strata: fall back to their sizes
+            weights = {key: available[key] - quotas[key] for key in open_keys}
+            total_weight = sum(weights.values())
+        shares = {key: remaining * weights.get(key, 0) / total_weight for key in open_keys}
+        floors = {key: int(share) for key, share in shares.items()}
+        leftover = remaining - sum(floors.values())
+        for key in sorted(open_keys, key=lambda k: shares[k] - floors[k], reverse=True)[:leftover]:
+            floors[key] += 1
+        for key in open_keys:
+            take = min(floors[key], available[key] - quotas[key])
+            quotas[key] += take
+            remaining -= take
+        open_keys = [key for key in open_keys if quotas[key] < available[key]]
+    return quotas
+
+
+def stratified_sample(items, strata, count: int, weights: dict = None, exclude=(), rng=random) -> list:
+    """Up to `count` distinct random items, drawn per stratum.
+
+    `strata` is parallel to `items` and gives each item's stratum key. `weights` maps a
+    stratum key to its target share (default: proportional to stratum size, i.e. plain
+    uniform sampling). The result is shuffled so strata are interleaved.
+    """
+    if count <= 0:
+        return []
+    exclude = exclude if isinstance(exclude, (set, frozenset, dict)) else set(exclude)
+    groups = {}
+    for item, key in zip(items, strata):
+        if item not in exclude:
+            groups.setdefault(key, []).append(item)
+    available = {key: len(group) for key, group in groups.items()}
+    quotas = allocate_quotas(available, weights if weights is not None else available, count)
+    sample = []
+    for key, group in groups.items():
+        sample += rng.sample(group, quotas[key])
+    rng.shuffle(sample)
+    return sample
+
+
+def color_group(identity_mask: int) -> str:
+    """"W".."G" for mono-coloured identities, "M" for multicolour, "C" for colourless."""
+    if identity_mask == 0:
+        return "C"
+    return _MASK_TO_MONO.get(int(identity_mask), "M")
+
+
+def card_strata(card_table, names) -> list:
+    """(colour group, type group) stratum key for each name in `names`."""
+    rows = np.array([card_table.row(name) for name in names], dtype=np.int64)
+    is_land = card_table.has_type("Land")[rows]
+    is_creature = card_table.has_type("Creature")[rows]
+    keys = []
+    for identity, land, creature in zip(card_table.identity[rows], is_land, is_creature):
+        keys.append((color_group(identity), "Land" if land else "Creature" if creature else "Noncreature"))
+    return keys
+
+
+def color_balanced_weights(strata) -> dict:
+    """Weights giving every mono colour the same share (the mono-colour average).
+
+    Multicolour and colourless keep their natural share, and within a colour group
+    card types keep their natural mix.
+    """
+    counts = {}
+    for key in strata:
+        counts[key] = counts.get(key, 0) + 1
+    group_totals = {}
+    for (group, _), n in counts.items():
+        group_totals[group] = group_totals.get(group, 0) + n
+    mono_totals = [group_totals[c] for c in MONO_COLORS if c in group_totals]
+    mono_target = sum(mono_totals) / len(mono_totals) if mono_totals else 0
+    weights = {}
+    for (group, kind), n in counts.items():
+        target = mono_target if group in MONO_COLORS else group_totals[group]
+        weights[(group, kind)] = target * n / group_totals[group]
+    return weights
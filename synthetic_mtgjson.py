@@ -0,0 +1,269 @@
+"""Synthetic AllPrintings.json at a configurable fraction of the real file.
+
+The real AllPrintings.json is ~500 MB (~800 sets, ~100k printings of ~30k unique
+cards), too big to ship and only available as an LFS pointer here. This writes a file
+with the same shape and roughly the same size per printing (foreign data, identifiers,
+rulings and so on), including the set codes the generators filter on, plus matching
+commander lists, CubeBasics and land bases. Same scale and seed, same bytes.
+
+    python synthetic_mtgjson.py --scale 0.1 --out bench_data/scale-0.1
+"""
+import argparse
+import json
+import os
+import random
+import string
+
+from cardindex import COLOR_ORDER
+
+# Bump when the generated data changes shape, so cached benchmark data gets rebuilt
+SYNTH_VERSION = 1
+
+# Real AllPrintings.json, roughly
+SETS_1X = 800
+PRINTINGS_1X = 100_000
+NAMES_1X = 30_000
+
+# Set codes the generators look for (commandercube / 4RandomMTGCube), so set filters have work to do
+KNOWN_SET_CODES = (
+    "C13", "C14", "C15", "C16", "C17", "C18", "C19", "C20", "C21", "C22", "C23", "CMD", "CMA", "CM2",
+    "CMR", "CLB", "ONC", "VOC", "PIP", "WHO", "DMC", "AFC", "KHC", "MOC", "MIC", "MKC", "NEC", "NCC",
+    "OTC", "SCD", "LTC", "BRC", "LCC", "40K", "WOC", "ZNC", "2XM", "2X2", "A25", "EMA", "IMA", "MM3",
+    "MM2", "MMA", "UMA", "JMP", "J22", "BBD", "CMM", "ACR", "CNS", "CN2", "DBL", "MH1", "H1R", "MH2",
+    "MH3", "AKR", "DMR", "KLR", "RVR", "TSR", "PLST", "SLX", "VMA",
+)
+
+BASIC_LANDS = {"W": "Plains", "U": "Island", "B": "Swamp", "R": "Mountain", "G": "Forest"}
+
+# (types, weight) of the non-basic cards
+TYPE_WEIGHTS = (
+    (["Creature"], 40), (["Instant"], 11), (["Sorcery"], 10), (["Enchantment"], 10), (["Artifact"], 9),
+    (["Land"], 8), (["Artifact", "Creature"], 5), (["Enchantment", "Creature"], 3), (["Planeswalker"], 2),
+    (["Battle"], 1), (["Kindred", "Instant"], 1),
+)
+# Number of colours in a colour identity, weighted
+IDENTITY_SIZE_WEIGHTS = ((0, 10), (1, 55), (2, 25), (3, 7), (4, 1), (5, 2))
+LANGUAGES = ("German", "Spanish", "French", "Italian", "Japanese", "Portuguese (Brazil)", "Russian", "Chinese Simplified")
+WORDS = (
+    "Ashen", "Warden", "Kessig", "Storm", "Crow", "Verdant", "Oracle", "Blood", "Tithe", "Emberwild", "Sphinx",
+    "Gloom", "Harbor", "Tyrant", "Silver", "Quill", "Marsh", "Revenant", "Sky", "Forge", "Hollow", "Lantern",
+    "Grave", "Bloom", "Iron", "Vow", "Thorn", "Sage", "Riot", "Tide", "Ember", "Vault", "Wild", "Shade",
+)
+RULES_TEXT = (
+    "Flying", "Trample", "Haste", "Vigilance", "Deathtouch", "Lifelink", "Ward {2}",
+    "When this creature enters, draw a card.", "{T}: Add one mana of any color.",
+    "Whenever another creature you control dies, each opponent loses 1 life.",
+    "At the beginning of your upkeep, create a 1/1 white Soldier creature token.",
+    "Counter target spell unless its controller pays {3}.", "Destroy target creature or planeswalker.",
+    "Search your library for a basic land card, put it onto the battlefield tapped, then shuffle.",
+)
+
+
+def _weighted(rng, weighted):
+    values, weights = zip(*weighted)
+    return rng.choices(values, weights)[0]
+
+
+def _uuid(rng) -> str:
+    h = "%032x" % rng.getrandbits(128)
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _set_codes(rng, count: int) -> list:
+    codes = list(KNOWN_SET_CODES[:count])
+    seen = set(codes)
+    while len(codes) < count:
+        code = "".join(rng.choice(string.ascii_uppercase + string.digits) for _ in range(3))
+        if code not in seen and code not in BASIC_LANDS.values():
+            seen.add(code)
+            codes.append(code)
+    return codes
+
+
+def _card_template(rng, i: int) -> dict:
+    """Name-level fields (shared by every printing of the name)."""
+    types = _weighted(rng, TYPE_WEIGHTS)
+    size = _weighted(rng, IDENTITY_SIZE_WEIGHTS)
+    identity = [c for c in COLOR_ORDER if c in rng.sample(COLOR_ORDER, size)]
+    if "Land" in types and size > 2:
+        identity = identity[:2]
+    supertypes = []
+    leadership = {"brawl": False, "commander": False, "oathbreaker": False}
+    text = " ".join(rng.sample(RULES_TEXT, rng.randint(1, 3)))
+    if ("Creature" in types and rng.random() < 0.18) or ("Planeswalker" in types and rng.random() < 0.5):
+        supertypes.append("Legendary")
+        if "Creature" in types or rng.random() < 0.3:
+            leadership["commander"] = True
+            if "Planeswalker" in types:
+                text += "\nThis card can be your commander."
+    elif "Land" in types and rng.random() < 0.05:
+        supertypes.append("Legendary")
+    roll = rng.random()
+    commander_legality = "Legal" if roll < 0.97 else "Banned" if roll < 0.98 else None
+    legalities = {"commander": commander_legality, "legacy": "Legal", "vintage": "Legal", "duel": "Legal"}
+    card = {
+        "name": f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+        "colorIdentity": identity,
+        "colors": [] if "Land" in types else list(identity),
+        "types": types,
+        "supertypes": supertypes,
+        "subtypes": [rng.choice(WORDS)] if "Creature" in types else [],
+        "layout": "normal" if rng.random() < 0.97 else rng.choice(("transform", "adventure", "token")),
+        "legalities": {k: v for k, v in legalities.items() if v},
+        "leadershipSkills": leadership,
+        "text": text,
+        "manaValue": float(rng.randint(0, 7)),
+        "manaCost": "".join(f"{{{c}}}" for c in identity) or "{2}",
+    }
+    if "Creature" in types:
+        card["power"], card["toughness"] = str(rng.randint(0, 6)), str(rng.randint(1, 6))
+    card["type"] = " ".join(supertypes + types) + (" — " + card["subtypes"][0] if card["subtypes"] else "")
+    return card
+
+
+def _printing(rng, template: dict, set_code: str, number: int, printed_in) -> dict:
+    """One printing: the template plus the per-printing bulk a real AllPrintings card carries."""
+    card = dict(template)
+    flavor = " ".join(rng.choice(WORDS).lower() for _ in range(16)).capitalize() + "."
+    card.update({
+        "flavorText": flavor,
+        "printings": printed_in,
+        "originalText": template["text"],
+        "originalType": template["type"],
+        "setCode": set_code,
+        "number": str(number),
+        "uuid": _uuid(rng),
+        "artist": f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+        "rarity": rng.choice(("common", "uncommon", "rare", "mythic")),
+        "availability": ["mtgo", "paper"],
+        "borderColor": "black",
+        "finishes": ["nonfoil", "foil"],
+        "frameVersion": "2015",
+        "identifiers": {key: _uuid(rng) for key in (
+            "scryfallId", "scryfallOracleId", "scryfallIllustrationId", "mtgjsonV4Id", "cardKingdomId",
+            "tcgplayerProductId", "multiverseId")},
+        "purchaseUrls": {shop: f"https://mtgjson.com/links/{rng.getrandbits(64):016x}"
+                         for shop in ("cardKingdom", "cardmarket", "tcgplayer")},
+        "foreignData": [{
+            "language": language,
+            "name": f"{template['name']} ({language[:2]})",
+            "text": template["text"],
+            "flavorText": flavor,
+            "type": template["type"],
+            "identifiers": {"multiverseId": str(rng.randint(1, 999999)), "scryfallId": _uuid(rng)},
+        } for language in LANGUAGES],
+        "rulings": [{"date": "2024-01-01", "text": rng.choice(RULES_TEXT) + " " + rng.choice(RULES_TEXT)}
+                    for _ in range(rng.randint(0, 3))],
+    })
+    return card
+
+
+def write_allprintings(path: str, scale: float = 0.1, seed: int = 0) -> dict:
+    """Write a synthetic AllPrintings.json at `scale` x the real size, one set at a time.
+    Returns {"sets", "printings", "names", "bytes"}.
+    """
+    rng = random.Random(seed)
+    set_count = max(len(KNOWN_SET_CODES) // 4, round(SETS_1X * scale))
+    name_count = max(1000, round(NAMES_1X * scale))
+    printing_count = max(name_count, round(PRINTINGS_1X * scale))
+    codes = _set_codes(rng, set_count)
+    templates = [_card_template(rng, i) for i in range(name_count)]
+    basics = [{"name": name, "colorIdentity": [c], "colors": [], "types": ["Land"], "supertypes": ["Basic"],
+               "subtypes": [name], "layout": "normal", "type": f"Basic Land — {name}",
+               "legalities": {"commander": "Legal"}, "text": f"({{T}}: Add {{{c}}}.)"}
+              for c, name in BASIC_LANDS.items()]
+
+    # Every name gets one printing, the rest are reprints; set sizes vary like real sets
+    assignments = {code: [] for code in codes}
+    for template in templates:
+        assignments[rng.choice(codes)].append(template)
+    for _ in range(printing_count - name_count):
+        assignments[rng.choice(codes)].append(rng.choice(templates))
+
+    printed_in = {}
+    for code in codes:
+        for template in assignments[code]:
+            printed_in.setdefault(template["name"], []).append(code)
+    for printed in printed_in.values():
+        printed[:] = sorted(set(printed))
+    basic_printings = sorted(codes[::10])
+
+    meta = {"date": "2026-01-01", "version": f"5.2.2+synthetic.{scale}.{seed}"}
+    printings = 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write('{"meta":' + json.dumps(meta) + ',"data":{')
+        for i, code in enumerate(codes):
+            set_templates = list({t["name"]: t for t in assignments[code]}.values())
+            if i % 10 == 0:
+                set_templates += basics
+            cards = [_printing(rng, t, code, n, printed_in.get(t["name"], basic_printings))
+                     for n, t in enumerate(set_templates, start=1)]
+            printings += len(cards)
+            set_data = {
+                "baseSetSize": len(cards), "code": code, "name": f"Synthetic Set {code}", "type": "expansion",
+                "releaseDate": f"{1993 + i * 33 // max(1, set_count)}-{1 + i % 12:02d}-01", "totalSetSize": len(cards),
+                "cards": cards, "tokens": [],
+            }
+            f.write(("," if i else "") + json.dumps(code) + ":" + json.dumps(set_data, ensure_ascii=False))
+        f.write("}}")
+    os.replace(tmp_path, path)
+    return {"sets": set_count, "printings": printings, "names": name_count + len(basics), "bytes": os.path.getsize(path)}
+
+
+def write_support_files(out_dir: str, mtgjson_path: str, seed: int = 0):
+    """2AllCommanders.txt, 3AllJumpstartCommanders.txt, 2CubeBasics.txt and 3Landbases.txt
+    for a synthetic AllPrintings.json, so every generator can run against it."""
+    from cardindex import open_index
+    from cardtable import ColorIdentityIndex, load_table
+    from jumpstart import color_identity_mapping
+    from legends import generate_commander_lists
+
+    rng = random.Random(seed)
+    with open_index(mtgjson_path) as card_index:
+        generate_commander_lists(card_index.cards(), 2,
+                                 os.path.join(out_dir, "2AllCommanders.txt"),
+                                 os.path.join(out_dir, "3AllJumpstartCommanders.txt"))
+        identity_index = ColorIdentityIndex(load_table(card_index))
+
+    with open(os.path.join(out_dir, "2CubeBasics.txt"), "w", encoding="utf-8") as f:
+        for name in rng.sample(identity_index.names("", "nonland"), min(60, len(identity_index.names("", "nonland")))):
+            f.write(f"1 {name}\n")
+
+    with open(os.path.join(out_dir, "3Landbases.txt"), "w", encoding="utf-8") as f:
+        for identity, category in color_identity_mapping.items():
+            lands = identity_index.names(set(identity), "nonbasic_land")
+            f.write(f"{category}:\n")
+            f.write("".join(f"{name}\n" for name in rng.sample(lands, min(30, len(lands)))))
+            f.write("\n")
+
+
+def prepare_dataset(out_dir: str, scale: float = 0.1, seed: int = 0) -> dict:
+    """Synthetic AllPrintings.json plus support files in `out_dir`, reused if already there."""
+    os.makedirs(out_dir, exist_ok=True)
+    mtgjson_path = os.path.join(out_dir, "AllPrintings.json")
+    info_path = os.path.join(out_dir, "dataset.json")
+    if os.path.exists(info_path) and os.path.exists(mtgjson_path):
+        with open(info_path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        if info.get("synth_version") == SYNTH_VERSION:
+            return info
+    info = write_allprintings(mtgjson_path, scale, seed)
+    write_support_files(out_dir, mtgjson_path, seed)
+    info.update(synth_version=SYNTH_VERSION, scale=scale, seed=seed)
+    with open(info_path, "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+    return info
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic AllPrintings.json and matching support files.")
+    parser.add_argument("--scale", type=float, default=0.1, help="fraction of the real AllPrintings size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="output directory (default: bench_data/scale-<scale>)")
+    args = parser.parse_args()
+
+    out_dir = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_data", f"scale-{args.scale}")
+    info = prepare_dataset(out_dir, args.scale, args.seed)
+    print(f"✅ {info['sets']} sets / {info['printings']} printings / {info['names']} names, "
+          f"{info['bytes'] / 1e6:.0f} MB → {out_dir}")
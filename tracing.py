@@ -0,0 +1,211 @@
+"""Opt-in stage tracing for the generators.
+
+Set an environment variable to get a JSON report of any run (and optionally a
+Chrome trace, viewable in chrome://tracing or https://ui.perfetto.dev):
+
+    MTG_TRACE=trace/cube.json python 2Cube10Commanders.py
+    MTG_TRACE=trace/cube.json MTG_TRACE_CHROME=trace/cube.trace.json python 3JumpstartPipeline.py
+
+The report has one entry per span (data load, index build, each EDHREC request with
+its HTTP status and size, extraction, sampling, output write, ...), per-stage totals,
+counters such as cards added per source, and the process' peak RSS. It is written when
+the process exits.
+
+Library code marks stages with
+
+    with span("filler_sampling", wanted=n) as s:
+        ...
+        s.set(drawn=len(sample))
+    count("cards_added.filler", len(sample))
+
+When tracing is off, span() returns a shared no-op object and count() returns at once,
+so instrumented code costs a function call per span.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+TRACE_ENV = "MTG_TRACE"
+TRACE_CHROME_ENV = "MTG_TRACE_CHROME"
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (0 if the platform does not expose it)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def process_peak_rss() -> int:
+    """Peak RSS of this process so far, in bytes."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _NullSpan:
+    """What span() hands out while tracing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "start", "duration", "thread", "rss")
+
+    def __init__(self, tracer, name: str, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Attach attributes known only once the stage has run (sizes, statuses, counts)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.thread = threading.get_ident()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.rss = current_rss()
+        self.tracer._record(self)
+        return False
+
+
+class Tracer:
+    """Collects spans and counters for one process; thread-safe."""
+
+    def __init__(self, report_path: str = None, chrome_path: str = None):
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+        self.spans = []
+        self.counts = {}
+        self.thread_names = {}
+        self._lock = threading.Lock()
+        self.configure(report_path, chrome_path)
+
+    def configure(self, report_path: str = None, chrome_path: str = None):
+        """Turn tracing on (either path set) or off (neither)."""
+        self.report_path = report_path
+        self.chrome_path = chrome_path
+        self.enabled = bool(report_path or chrome_path)
+
+    def span(self, name: str, **attrs):
+        return Span(self, name, attrs) if self.enabled else _NULL_SPAN
+
+    def count(self, name: str, n: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def _record(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+            if span.thread not in self.thread_names:
+                self.thread_names[span.thread] = threading.current_thread().name
+
+    # --- output ---
+
+    def report(self) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+            counts = dict(self.counts)
+        stages = {}
+        for s in spans:
+            stage = stages.setdefault(s.name, {"count": 0, "total_s": 0.0, "max_s": 0.0})
+            stage["count"] += 1
+            stage["total_s"] += s.duration
+            stage["max_s"] = max(stage["max_s"], s.duration)
+        for stage in stages.values():
+            stage["total_s"] = round(stage["total_s"], 6)
+            stage["max_s"] = round(stage["max_s"], 6)
+        return {
+            "script": os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "",
+            "argv": sys.argv[1:],
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started_at)),
+            "wall_s": round(time.perf_counter() - self.origin, 6),
+            "peak_rss_mb": round(process_peak_rss() / 2**20, 2),
+            "stages": stages,
+            "counts": counts,
+            "spans": [{
+                "name": s.name,
+                "start_s": round(s.start - self.origin, 6),
+                "duration_s": round(s.duration, 6),
+                "thread": self.thread_names.get(s.thread, str(s.thread)),
+                "rss_mb": round(s.rss / 2**20, 2),
+                "attrs": s.attrs,
+            } for s in spans],
+        }
+
+    def chrome_trace(self) -> dict:
+        """The spans as Chrome trace-event JSON (complete events, one row per thread)."""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+            counts = dict(self.counts)
+            thread_names = dict(self.thread_names)
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in thread_names.items()]
+        for s in spans:
+            events.append({
+                "name": s.name, "cat": "stage", "ph": "X", "pid": pid, "tid": s.thread,
+                "ts": round((s.start - self.origin) * 1e6, 3), "dur": round(s.duration * 1e6, 3),
+                "args": s.attrs,
+            })
+        end = round((time.perf_counter() - self.origin) * 1e6, 3)
+        events.append({"name": "counts", "ph": "C", "pid": pid, "tid": 0, "ts": end, "args": counts})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self):
+        """Write the report (and Chrome trace) to the configured paths, if tracing is on."""
+        if not self.enabled:
+            return
+        for path, doc in ((self.report_path, self.report), (self.chrome_path, self.chrome_trace)):
+            if not path:
+                continue
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(doc(), f, indent=1, default=str)
+            print(f"📈 Trace written to {path}", file=sys.stderr)
+
+
+tracer = Tracer(os.environ.get(TRACE_ENV), os.environ.get(TRACE_CHROME_ENV))
+atexit.register(tracer.write)
+
+
+def span(name: str, **attrs):
+    """Context manager timing one stage (a no-op unless tracing is on)."""
+    return tracer.span(name, **attrs)
+
+
+def count(name: str, n: int = 1):
+    """Add `n` to a counter in the trace report (a no-op unless tracing is on)."""
+    tracer.count(name, n)
+
+
+def enable(report_path: str = None, chrome_path: str = None):
+    """Turn tracing on from code, e.g. for a --trace command line flag."""
+    tracer.configure(report_path, chrome_path)